@@ -1,5 +1,8 @@
 try:
     from carball.decompile_replays import decompile_replay
     from carball.decompile_replays import analyze_replay_file
+    from carball.decompile_replays import analyze_replay_window
+    from carball.batch_analysis import analyze_replay_directory
+    from carball.analysis_cache import AnalysisCache
 except ModuleNotFoundError as e:
-    print("Not importing functions due to missing packages:", e)
\ No newline at end of file
+    print("Not importing functions due to missing packages:", e)
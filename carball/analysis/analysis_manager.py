@@ -1,16 +1,14 @@
 import logging
-import time
-from typing import Dict, Callable, Union
+from typing import Dict, Callable, List, Optional, Union
 
 import pandas as pd
 import json
 import os
 import gzip
 
-from google.protobuf.json_format import _Printer
 from typing.io import IO
 
-from .utils.json_encoder import CarballJsonEncoder
+from .utils.json_writer import message_to_json_object, write_message_json
 
 script_path = os.path.abspath(__file__)
 with open(os.path.join(os.path.dirname(script_path), 'PROTOBUF_VERSION'), 'r') as f:
@@ -24,6 +22,8 @@ from ..analysis.saltie_game.metadata.ApiTeam import ApiTeam
 from ..analysis.saltie_game.saltie_game import SaltieGame
 from ..analysis.stats.stats_manager import StatsManager
 from ..analysis.utils.pandas_manager import PandasManager
+from ..analysis.utils.parquet_manager import write_parquet_to_directory
+from ..analysis.utils.profiler import AnalysisProfiler, StageProfile
 from ..analysis.utils.proto_manager import ProtobufManager
 from ..generated.api import game_pb2
 from ..generated.api.player_pb2 import Player
@@ -33,58 +33,26 @@ from ..analysis.events.event_creator import EventsCreator
 logger = logging.getLogger(__name__)
 
 
-class AnalysisManager:
+class BaseAnalysisManager:
     """
-    AnalysisManager class takes an initialized Game object and converts the data into a Protobuf and a DataFrame. Then,
-    that data is used to perform full analysis on the replay.
+    The results of an analysis: the protobuf data, the frames and the profile, and the methods to read and write them.
     """
 
-    id_creator = None
-    timer = None
-
-    def __init__(self, game: Game):
-        self.game = game
-        self.protobuf_game = game_pb2.Game()
-        self.protobuf_game.version = PROTOBUF_VERSION
-        self.id_creator = self._create_player_id_function(game)
-        self.stats_manager = StatsManager()
-        self.events_creator = EventsCreator(self.id_creator)
-        self.should_store_frames = False
-        self.df_bytes = None
-
-    def create_analysis(self, calculate_intensive_events: bool = False, clean: bool = True):
+    def __init__(self, protobuf_game: game_pb2.Game = None, profiler: AnalysisProfiler = None):
         """
-        Sets basic metadata, and decides whether analysis can be performed and then passes required parameters
-        to perform_full_analysis(...); After, stores the DataFrame.
-
-        :param calculate_intensive_events: Indicates if expensive calculations should run to include additional stats.
-        :param clean: Indicates if useless/invalid data should be found and removed.
+        :param protobuf_game: The protobuf data, an empty one of the current version by default.
+        :param profiler: Records the time taken by each stage of the analysis.
         """
+        if protobuf_game is None:
+            protobuf_game = game_pb2.Game()
+            protobuf_game.version = PROTOBUF_VERSION
+        self.protobuf_game = protobuf_game
+        self.profiler = profiler if profiler is not None else AnalysisProfiler()
+        self.should_store_frames = False
+        self.data_frame = None
+        self._df_bytes = None
 
-        self._start_time()
-        player_map = self._get_game_metadata(self.game, self.protobuf_game)
-        self._log_time("Getting in-game frame-by-frame data...")
-        data_frame = self._initialize_data_frame(self.game)
-        self._log_time("Getting important frames (kickoff, first-touch)...")
-        kickoff_frames, first_touch_frames = self._get_kickoff_frames(self.game, self.protobuf_game, data_frame)
-        self._log_time("Setting game kickoff frames...")
-        self.game.kickoff_frames = kickoff_frames
-
-        if self._can_do_full_analysis(first_touch_frames):
-            self._perform_full_analysis(self.game, self.protobuf_game, player_map,
-                                        data_frame, kickoff_frames, first_touch_frames,
-                                        calculate_intensive_events=calculate_intensive_events,
-                                        clean=clean)
-        else:
-            self._log_time("Cannot perform analysis: invalid analysis.")
-            self.protobuf_game.game_metadata.is_invalid_analysis = True
-
-        # log before we add the dataframes
-        # logger.debug(self.protobuf_game)
-
-        self._store_frames(data_frame)
-
-    def write_json_out_to_file(self, file: IO):
+    def write_json_out_to_file(self, file: IO, compact: bool = False):
         """
         Writes the json data to the specified file, as text.
 
@@ -93,13 +61,12 @@ class AnalysisManager:
                 E.g. open(file_name, 'w')
 
         :param file: The file object (or a buffer).
+        :param compact: Write the json on a single line without spaces instead of indenting it.
         """
 
         if 'b' in file.mode:
             raise IOError("Json files can not be binary use open(path,\"w\")")
-        printer = _Printer()
-        js = printer._MessageToJsonObject(self.protobuf_game)
-        json.dump(js, file, indent=2, cls=CarballJsonEncoder)
+        write_message_json(file, self.protobuf_game, indent=None if compact else 2)
 
     def write_proto_out_to_file(self, file: IO):
         """
@@ -117,7 +84,7 @@ class AnalysisManager:
             raise IOError("Proto files must be binary use open(path,\"wb\")")
         ProtobufManager.write_proto_out_to_file(file, self.protobuf_game)
 
-    def write_pandas_out_to_file(self, file: Union[IO, gzip.GzipFile]):
+    def write_pandas_out_to_file(self, file: Union[IO, gzip.GzipFile], columnar: bool = False):
         """
         Writes the pandas data to the specified file, as bytes. File may be a GzipFile object to compress the data
         frame.
@@ -128,16 +95,34 @@ class AnalysisManager:
             The file will NOT be human-readable.
 
         :param file: The file object (or a buffer).
+        :param columnar: Write one typed array per column instead of numpy records,
+            read it back with PandasManager.read_columnar_from_file. Uncompressed files can be memory mapped.
         """
         if isinstance(file.mode, str) and 'b' not in file.mode:
             raise IOError("Data frame files must be binary use open(path,\"wb\")")
         if isinstance(file.mode, int) and file.mode != gzip.WRITE:
             raise IOError("Gzip compressed data frame files must be opened in WRITE mode.")
-        if self.df_bytes is not None:
+        if columnar and self.get_data_frame() is not None:
+            # written straight from the DataFrame, the numpy records are never created
+            PandasManager.write_columnar_to_file(file, self.get_data_frame())
+        elif not columnar and self.df_bytes is not None:
             file.write(self.df_bytes)
         elif not self.should_store_frames:
             logger.warning("pd DataFrames are not being stored anywhere")
 
+    def write_parquet_out_to_directory(self, directory: str, partition_by_replay: bool = False):
+        """
+        Writes the frames and the event tables (e.g. the hits, bumps and ball carries) to the directory as parquet
+        files, with one typed column per field. Needs pyarrow.
+
+        See carball.analysis.utils.parquet_manager for the layout of the files.
+
+        :param directory: The directory the files are written to, it is created if it does not exist.
+        :param partition_by_replay: Write each table to a partition named by the replay id,
+            so the analyses of many replays can be written to the same directory.
+        """
+        write_parquet_to_directory(directory, self.protobuf_game, self.get_data_frame(), partition_by_replay)
+
     def get_protobuf_data(self) -> game_pb2.Game:
         """
         :return: The protobuf data created by the analysis
@@ -159,9 +144,7 @@ class AnalysisManager:
         see get_protobuf_data for more details.
         The json fields are defined by https://github.com/SaltieRL/carball/tree/master/api
         """
-        printer = _Printer()
-        js = printer._MessageToJsonObject(self.protobuf_game)
-        return js
+        return message_to_json_object(self.protobuf_game)
 
     def get_data_frame(self) -> pd.DataFrame:
         """
@@ -180,6 +163,99 @@ class AnalysisManager:
         """
         return self.data_frame
 
+    @property
+    def df_bytes(self) -> Optional[bytes]:
+        """
+        :return: The DataFrame as numpy records (see PandasManager.write_numpy_to_memory), or None if there is none.
+
+        The frames are only serialized the first time this is asked for (e.g. by write_pandas_out_to_file),
+        so an analysis whose frames are never written out does not pay for it.
+        """
+        if self._df_bytes is None and self.data_frame is not None:
+            self._df_bytes = PandasManager.safe_write_pandas_to_memory(self.data_frame)
+        return self._df_bytes
+
+    def get_profile(self) -> List[StageProfile]:
+        """
+        :return: The wall time, cpu time and peak memory of each stage of the analysis, in the order they ran.
+
+        Nested stages are named by their path, e.g. 'events/hits' or 'stats/BoostStat'.
+        """
+        return self.profiler.get_report()
+
+    def write_profile_out_to_file(self, file: IO):
+        """
+        Writes the profile of the analysis to the specified file as json text, the buffer mode must be 'w'.
+
+        :param file: The file object (or a buffer).
+        """
+        if 'b' in file.mode:
+            raise IOError("Json files can not be binary use open(path,\"w\")")
+        self.profiler.write_json_out_to_file(file)
+
+
+class AnalysisManager(BaseAnalysisManager):
+    """
+    AnalysisManager class takes an initialized Game object and converts the data into a Protobuf and a DataFrame. Then,
+    that data is used to perform full analysis on the replay.
+    """
+
+    id_creator = None
+
+    def __init__(self, game: Game, profiler: AnalysisProfiler = None, stats_workers: int = 1):
+        """
+        :param game: The initialized Game.
+        :param profiler: Records the time taken by each stage of the analysis,
+            pass one in to also include the stages that ran before the analysis (e.g. parsing the replay).
+        :param stats_workers: Number of threads the stats are calculated on, the stats are the same either way.
+        """
+        super().__init__(profiler=profiler)
+        self.game = game
+        self.id_creator = self._create_player_id_function(game)
+        self.stats_manager = StatsManager(self.profiler, stats_workers)
+        self.events_creator = EventsCreator(self.id_creator, self.profiler)
+
+    def create_analysis(self, calculate_intensive_events: bool = False, clean: bool = True):
+        """
+        Sets basic metadata, and decides whether analysis can be performed and then passes required parameters
+        to perform_full_analysis(...); After, stores the DataFrame.
+
+        :param calculate_intensive_events: Indicates if expensive calculations should run to include additional stats.
+        :param clean: Indicates if useless/invalid data should be found and removed.
+        """
+
+        with self.profiler.stage('metadata'):
+            player_map = self._get_game_metadata(self.game, self.protobuf_game)
+        with self.profiler.stage('create_data_frame'):
+            data_frame = self._initialize_data_frame(self.game)
+        with self.profiler.stage('kickoff_frames'):
+            kickoff_frames, first_touch_frames = self._get_kickoff_frames(self.game, self.protobuf_game, data_frame)
+        self.game.kickoff_frames = kickoff_frames
+
+        if self._can_do_full_analysis(first_touch_frames):
+            self._perform_full_analysis(self.game, self.protobuf_game, player_map,
+                                        data_frame, kickoff_frames, first_touch_frames,
+                                        calculate_intensive_events=calculate_intensive_events,
+                                        clean=clean)
+        else:
+            logger.info("Cannot perform analysis: invalid analysis.")
+            self.protobuf_game.game_metadata.is_invalid_analysis = True
+
+        # log before we add the dataframes
+        # logger.debug(self.protobuf_game)
+
+        with self.profiler.stage('store_frames'):
+            self._store_frames(data_frame)
+
+    def create_metadata(self) -> Dict[str, Player]:
+        """
+        Only sets the metadata (game, mutators, teams, parties and players) of the protobuf, without analysing the frames.
+        Used for a Game initialized from the header of the replay, which has no frames.
+        :return: The map of the players' online IDs to the Player objects.
+        """
+        with self.profiler.stage('metadata'):
+            return self._get_game_metadata(self.game, self.protobuf_game)
+
     def _perform_full_analysis(self, game: Game, proto_game: game_pb2.Game, player_map: Dict[str, Player],
                                data_frame: pd.DataFrame, kickoff_frames: pd.DataFrame, first_touch_frames: pd.Series,
                                calculate_intensive_events: bool = False, clean: bool = True):
@@ -198,14 +274,17 @@ class AnalysisManager:
         :param clean: Indicates if useless/invalid data should be found and removed.
         """
 
-        self._get_game_time(proto_game, data_frame)
+        with self.profiler.stage('game_time'):
+            self._get_game_time(proto_game, data_frame)
         if clean:
-            clean_replay(game, data_frame, proto_game, player_map)
-        self._log_time("Creating events...")
-        self.events_creator.create_events(game, proto_game, player_map, data_frame, kickoff_frames, first_touch_frames,
-                                          calculate_intensive_events=calculate_intensive_events)
-        self._log_time("Getting stats...")
-        self._get_stats(game, proto_game, player_map, data_frame)
+            with self.profiler.stage('clean'):
+                clean_replay(game, data_frame, proto_game, player_map)
+        with self.profiler.stage('events'):
+            self.events_creator.create_events(game, proto_game, player_map, data_frame, kickoff_frames,
+                                              first_touch_frames,
+                                              calculate_intensive_events=calculate_intensive_events)
+        with self.profiler.stage('stats'):
+            self._get_stats(game, proto_game, player_map, data_frame)
 
     def _get_game_metadata(self, game: Game, proto_game: game_pb2.Game) -> Dict[str, Player]:
         """
@@ -277,7 +356,8 @@ class AnalysisManager:
             # happens when the game ends before anyone touches the ball at kickoff
             kickoff_frames = kickoff_frames[:len(first_touch_frames)]
 
-        for goal_number, goal in enumerate(game.goals):
+        # the game may not have been parsed up to the kickoffs of the last goals, see WindowAnalysisManager
+        for goal_number, goal in enumerate(game.goals[:len(kickoff_frames)]):
             data_frame.loc[kickoff_frames[goal_number]: goal.frame_number, ('game', 'goal_number')] = goal_number
 
         # Set goal_number of frames that are post last kickoff to -1 (ie non None)
@@ -308,7 +388,8 @@ class AnalysisManager:
 
     def _store_frames(self, data_frame: pd.DataFrame):
         self.data_frame = data_frame
-        self.df_bytes = PandasManager.safe_write_pandas_to_memory(data_frame)
+        # serialized by df_bytes when it is first needed
+        self._df_bytes = None
 
     def _initialize_data_frame(self, game: Game):
         data_frame = SaltieGame.create_data_df(game)
@@ -357,11 +438,3 @@ class AnalysisManager:
 
         return True
 
-    def _start_time(self):
-        self.timer = time.time()
-        logger.info("starting timer")
-
-    def _log_time(self, message=""):
-        end = time.time()
-        logger.info("Time taken for %s is %s milliseconds", message, (end - self.timer) * 1000)
-        self.timer = end
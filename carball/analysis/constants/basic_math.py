@@ -21,3 +21,7 @@ def get_distance_from_displacements(data_frame: pd.DataFrame) -> pd.Series:
 
     summed = (positions ** 2).sum(axis=1, skipna=False)
     return np.sqrt(summed)
+
+
+def get_speed_from_velocities(data_frame: pd.DataFrame) -> pd.Series:
+    return (data_frame.vel_x ** 2 + data_frame.vel_y ** 2 + data_frame.vel_z ** 2) ** 0.5
@@ -0,0 +1,71 @@
+import numpy as np
+
+# Positions are counted in range of a pad by a float32 distance, which may round down by a fraction of a unit.
+RANGE_MARGIN = 1
+
+
+class PadGrid:
+    """
+    A uniform grid over the boost pads of a map, each cell holds the pads whose pickup range reaches into it.
+
+    The pads a position may be in range of are found by looking up its cell, so only those pads are checked
+    instead of every pad of the map.
+    """
+    CELL_SIZE = 256
+
+    def __init__(self, pads: np.ndarray, radius: float, cell_size: float = CELL_SIZE):
+        """
+        :param pads: The pads as rows of (x, y, label), see FieldConstants.get_big_pads.
+        :param radius: The distance from the center of a pad it is picked up within.
+        """
+        self.pads = pads
+        self.radius = radius
+        self.cell_size = cell_size
+        reach = radius + RANGE_MARGIN
+        self.origin = pads[:, :2].min(axis=0) - reach
+        shape = np.ceil((pads[:, :2].max(axis=0) + reach - self.origin) / cell_size).astype(int)
+
+        cell_pads = [[[] for _ in range(shape[1])] for _ in range(shape[0])]
+        for index, pad in enumerate(pads):
+            first_cell = np.floor((pad[:2] - reach - self.origin) / cell_size).astype(int).clip(0)
+            last_cell = np.floor((pad[:2] + reach - self.origin) / cell_size).astype(int).clip(max=shape - 1)
+            for x in range(first_cell[0], last_cell[0] + 1):
+                for y in range(first_cell[1], last_cell[1] + 1):
+                    cell_start = self.origin + np.array([x, y]) * cell_size
+                    # the closest point of the cell to the pad
+                    closest = np.clip(pad[:2], cell_start, cell_start + cell_size)
+                    if np.hypot(*(closest - pad[:2])) <= reach:
+                        cell_pads[x][y].append(index)
+
+        # the pads of each cell, padded with -1 to the most pads any cell has
+        max_pads = max(max(len(pad_indexes) for column in cell_pads for pad_indexes in column), 1)
+        self.cells = np.full((shape[0], shape[1], max_pads), -1, dtype=np.int64)
+        for x, column in enumerate(cell_pads):
+            for y, pad_indexes in enumerate(column):
+                self.cells[x, y, :len(pad_indexes)] = pad_indexes
+
+    def get_candidates(self, positions: np.ndarray) -> np.ndarray:
+        """
+        :param positions: The x and y of each position, shape (positions, 2).
+        :return: The indexes of the pads each position may be in range of, -1 for none, shape (positions, pads).
+        """
+        cells = np.floor((positions - self.origin) / self.cell_size)
+        # nan positions are in no cell
+        in_grid = ((cells >= 0) & (cells < self.cells.shape[:2])).all(axis=1)
+        candidates = np.full((len(positions), self.cells.shape[2]), -1, dtype=np.int64)
+        cells = cells[in_grid].astype(int)
+        candidates[in_grid] = self.cells[cells[:, 0], cells[:, 1]]
+        return candidates
+
+    def get_labels(self, positions: np.ndarray) -> np.ndarray:
+        """
+        :param positions: The x and y of each position, shape (positions, 2).
+        :return: The sum of the labels of the pads each position is in range of, 0 for none.
+        """
+        labels = np.zeros(len(positions))
+        for pad_indexes in self.get_candidates(positions).T:
+            has_pad = pad_indexes >= 0
+            pads = self.pads[pad_indexes[has_pad]]
+            distances = np.sqrt(np.square(positions[has_pad] - pads[:, :2]).sum(axis=1, dtype=np.float32))
+            labels[has_pad] += pads[:, 2] * (distances <= self.radius)
+        return labels
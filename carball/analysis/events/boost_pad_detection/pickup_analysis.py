@@ -1,7 +1,10 @@
+from typing import Dict, Tuple
+
 import numpy as np
 import pandas as pd
 from carball.generated.api import game_pb2
-from carball.analysis.constants.field_constants import FieldConstants
+from carball.analysis.constants.field_constants import FieldConstants, FieldType
+from carball.analysis.events.boost_pad_detection.pad_grid import PadGrid
 
 
 class PickupAnalysis:
@@ -15,36 +18,55 @@ class PickupAnalysis:
     # Choosing how many frames to be open to setting a pickup. Back is for when the player is ahead of the server (usually smaller)
     LAG_BACK = 6
     LAG_FORWARD = 14
+    # The frames on each side of a frame that decide if a pad was picked up at it (see get_boost_collect),
+    # an analysis of only part of the frames needs this many more frames around them to find the same pickups.
+    CONTEXT_FRAMES = 2 * (LAG_BACK + LAG_FORWARD) + 2
+    # The grids of the big and small pads of each field type, built the first time they are used.
+    _pad_grids: Dict[FieldType, Tuple[PadGrid, PadGrid]] = {}
 
     @classmethod
     def add_pickups(cls, proto_game: game_pb2.Game, data_frame: pd.DataFrame):
 
         for player in proto_game.players:
-            player_vals_df = data_frame[player.name][['pos_x', 'pos_y', 'pos_z', 'boost']].copy()
-            player_vals_df['boost'] /= 2.55
-            player_vals_df['boost'] = player_vals_df['boost'].round(5)
-            player_vals_df = player_vals_df.dropna(axis=0, how='all')
-            player_vals_df = player_vals_df.fillna(0)
-            player_vals_df['boost_collect'] = cls.get_boost_collect(player_vals_df)
-            data_frame[player.name, 'boost_collect'] = player_vals_df['boost_collect']
+            data_frame[player.name, 'boost_collect'] = cls.get_player_boost_collect(data_frame[player.name])
         return
 
+    @classmethod
+    def get_player_boost_collect(cls, player_data_frame: pd.DataFrame) -> pd.Series:
+        """
+        :return: The label of the pad the player picked up, at the frames the player picked up a pad.
+        """
+        player_vals_df = player_data_frame[['pos_x', 'pos_y', 'pos_z', 'boost']].copy()
+        player_vals_df['boost'] /= 2.55
+        player_vals_df['boost'] = player_vals_df['boost'].round(5)
+        player_vals_df = player_vals_df.dropna(axis=0, how='all')
+        player_vals_df = player_vals_df.fillna(0)
+        return cls.get_boost_collect(player_vals_df)
+
+    @classmethod
+    def get_pad_grids(cls, field_type: FieldType = None) -> Tuple[PadGrid, PadGrid]:
+        """
+        :return: The grids of the big and of the small pads of the field type, the one of field_constants by default.
+        """
+        if field_type is None:
+            field_type = cls.field_constants.field_type
+        pad_grids = cls._pad_grids.get(field_type)
+        if pad_grids is None:
+            pad_grids = cls._pad_grids[field_type] = (
+                PadGrid(cls.field_constants.get_big_pads(field_type), cls.BIG_BOOST_RADIUS),
+                PadGrid(cls.field_constants.get_small_pads(field_type), cls.SMALL_BOOST_RADIUS))
+        return pad_grids
+
     @classmethod
     def get_boost_collect(cls, player_vals_df):
         # Get a series with indexes as a subset of the indexes of df, values being pad label picked up.
-        # Iterate through every pad, label each frame in the path with which boost pad it was in range of.
+        # Label each frame in the path with which boost pad it was in range of.
         df = player_vals_df.copy()
         path = df.drop(['pos_z', 'boost'], axis=1)
-        big_labels = np.zeros(len(path))
-        small_labels = np.zeros(len(path))
-        # Calculate the distances from each pad. Add label of the pad if distance <= radius
-        for pad in cls.BIG_BOOST_POSITIONS:
-            distances = np.sqrt(np.square(path.values - pad[:2]).sum(axis=1, dtype=np.float32))
-            big_labels += (pad[2] * (distances <= cls.BIG_BOOST_RADIUS))
-
-        for pad in cls.SMALL_BOOST_POSITIONS:
-            distances = np.sqrt(np.square(path.values - pad[:2]).sum(axis=1, dtype=np.float32))
-            small_labels += (pad[2] * (distances <= cls.SMALL_BOOST_RADIUS))
+        # Only the pads in the cell of each position are checked. Add label of the pad if distance <= radius
+        big_pad_grid, small_pad_grid = cls.get_pad_grids()
+        big_labels = big_pad_grid.get_labels(path.values)
+        small_labels = small_pad_grid.get_labels(path.values)
         # Add labels and exclude labels with z too high. Didn't calculate this earlier because its a flat height)
         df['pad_in_range'] = 0
         df['pad_in_range'] += small_labels
@@ -13,6 +13,7 @@ from carball.analysis.events.hit_detection.base_hit import BaseHit
 from carball.analysis.events.hit_detection.hit_analysis import SaltieHit
 from carball.analysis.events.dropshot.damage import create_dropshot_damage_events
 from carball.analysis.events.dropshot.ball import create_dropshot_ball_events
+from carball.analysis.utils.profiler import AnalysisProfiler
 from carball.generated.api import game_pb2
 from carball.generated.api.player_pb2 import Player
 from carball.json_parser.game import Game
@@ -24,8 +25,9 @@ class EventsCreator:
         Handles the creation of all events that can then be later used for stats
     """
 
-    def __init__(self, id_creator: Callable):
+    def __init__(self, id_creator: Callable, profiler: AnalysisProfiler = None):
         self.id_creator = id_creator
+        self.profiler = profiler if profiler is not None else AnalysisProfiler()
 
     def create_events(self, game: Game, proto_game: game_pb2.Game, player_map: Dict[str, Player],
                       data_frame: pd.DataFrame, kickoff_frames: pd.DataFrame, first_touch_frames: pd.Series,
@@ -35,16 +37,24 @@ class EventsCreator:
         :param calculate_intensive_events: Indicates if expensive calculations should run to include additional stats.
         """
         goal_frames = data_frame.game.goal_number.notnull()
-        self.create_boostpad_events(proto_game, data_frame)
-        self.create_hit_events(game, proto_game, player_map, data_frame, kickoff_frames, first_touch_frames)
-        self.calculate_kickoff_stats(game, proto_game, player_map, data_frame, kickoff_frames, first_touch_frames)
-        self.calculate_ball_carries(game, proto_game, player_map, data_frame[goal_frames])
-        self.create_bumps(game, proto_game, player_map, data_frame[goal_frames])
-        self.create_dropshot_events(game, proto_game, player_map)
+        with self.profiler.stage('boostpads'):
+            self.create_boostpad_events(proto_game, data_frame)
+        with self.profiler.stage('hits'):
+            self.create_hit_events(game, proto_game, player_map, data_frame, kickoff_frames, first_touch_frames)
+        with self.profiler.stage('kickoffs'):
+            self.calculate_kickoff_stats(game, proto_game, player_map, data_frame, kickoff_frames, first_touch_frames)
+        with self.profiler.stage('carries'):
+            self.calculate_ball_carries(game, proto_game, player_map, data_frame[goal_frames])
+        with self.profiler.stage('bumps'):
+            self.create_bumps(game, proto_game, player_map, data_frame[goal_frames])
+        with self.profiler.stage('dropshot'):
+            self.create_dropshot_events(game, proto_game, player_map)
 
         if calculate_intensive_events:
-            self.calculate_hit_pressure(game, proto_game, data_frame)
-            self.calculate_fifty_fifty(game, proto_game, data_frame)
+            with self.profiler.stage('hit_pressure'):
+                self.calculate_hit_pressure(game, proto_game, data_frame)
+            with self.profiler.stage('fifty_fifty'):
+                self.calculate_fifty_fifty(game, proto_game, data_frame)
             # TODO (j-wass): calculate bumps
 
     def calculate_fifty_fifty(self, game: Game, proto_game: game_pb2.Game, data_frame: pd.DataFrame):
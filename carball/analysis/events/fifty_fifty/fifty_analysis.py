@@ -4,6 +4,7 @@ import numpy as np
 from carball.generated.api.stats.events_pb2 import FiftyFifty
 from carball.generated.api.stats.events_pb2 import Hit
 from carball.generated.api import game_pb2
+from carball.analysis.saltie_game.saltie_game import SaltieGame
 from carball.json_parser.game import Game
 from carball.analysis.constants.field_constants import HEIGHT_1_LIM, STANDARD_FIELD_LENGTH_HALF, MAX_CAR_SPEED
 
@@ -45,18 +46,24 @@ class FiftyAnalysis:
             return
 
         last_hit_frame = last_hit_of_fifty.frame_number
+        ball_row_number = SaltieGame.get_frame_rows(self.game, self.data_frame,
+                                                    [last_hit_frame + self.fifty_threshold])[0]
+        if ball_row_number < 0:
+            # the frames end before the ball can be checked
+            fifty.is_neutral = True
+            return
 
         goal_pos_orange = [0, STANDARD_FIELD_LENGTH_HALF, HEIGHT_1_LIM/2]
         goal_pos_blue = [0, -1*STANDARD_FIELD_LENGTH_HALF, HEIGHT_1_LIM/2]
 
         # Get the ball position at the time of the hit.
         # Consider the vector from this position to each goal.
-        ball_row = self.data_frame.ball.iloc[last_hit_frame+self.fifty_threshold]
+        ball_row = self.data_frame.ball.iloc[ball_row_number]
         pos_vector_to_blue = [goal_pos_blue[0] - ball_row.pos_x, goal_pos_blue[1] - ball_row.pos_y, goal_pos_blue[2] - ball_row.pos_z]
         pos_vector_to_orange = [goal_pos_orange[0] - ball_row.pos_x, goal_pos_orange[1] - ball_row.pos_y, goal_pos_orange[2] - ball_row.pos_z]
 
         # Test the ball velocity slightly in the future so that it experiences no more acceleration from any hit.
-        ball_row = self.data_frame.ball.iloc[last_hit_frame+self.fifty_threshold]
+        ball_row = self.data_frame.ball.iloc[ball_row_number]
         ball_velocity = [ball_row.vel_x,ball_row.vel_y,ball_row.vel_z]
 
         # Find the component of velocity projected onto the vectors towards each goal.
@@ -207,40 +207,37 @@ class BaseHit:
         return data_frame.ball.loc[hit.frame_number, :]
 
 
-def get_rotation_matrices(data_frame: pd.DataFrame, player_name: str) -> pd.Series:
-    pitch = data_frame[player_name, 'rot_x']
-    yaw = data_frame[player_name, 'rot_y']
-    roll = data_frame[player_name, 'rot_z']
-
-    cos_roll = np.cos(roll).rename('cos_roll')
-    sin_roll = np.sin(roll).rename('sin_roll')
-    cos_pitch = np.cos(pitch).rename('cos_pitch')
-    sin_pitch = np.sin(pitch).rename('sin_pitch')
-    cos_yaw = np.cos(yaw).rename('cos_yaw')
-    sin_yaw = np.sin(yaw).rename('sin_yaw')
-
-    components: pd.DataFrame = pd.concat([cos_roll, sin_roll, cos_pitch, sin_pitch, cos_yaw, sin_yaw], axis=1)
-
-    rotation_matrix = components.apply(get_rotation_matrix_from_row, axis=1, result_type='reduce')
-    return rotation_matrix
-
-
-def get_rotation_matrix_from_row(components: pd.Series) -> np.array:
-    cos_roll, sin_roll, cos_pitch, sin_pitch, cos_yaw, sin_yaw = components.values
-    rotation_matrix = np.array(
-        [[cos_pitch * cos_yaw, cos_yaw * sin_pitch * sin_roll - cos_roll * sin_yaw,
-          -cos_roll * cos_yaw * sin_pitch - sin_roll * sin_yaw],
-         [cos_pitch * sin_yaw, sin_yaw * sin_pitch * sin_roll + cos_roll * cos_yaw,
-          -cos_roll * sin_yaw * sin_pitch + sin_roll * cos_yaw],
-         [sin_pitch, -cos_pitch * sin_roll, cos_pitch * cos_roll]])
-    return rotation_matrix
-
-
-def get_local_displacement(displacement: pd.DataFrame, rotation_matrices: pd.Series) -> pd.DataFrame:
+def get_rotation_matrices(data_frame: pd.DataFrame, player_name: str) -> np.ndarray:
+    """
+    :return: An array of shape (frames, 3, 3) with the rotation matrix of the player at each frame.
+    """
+    pitch = data_frame[player_name, 'rot_x'].values
+    yaw = data_frame[player_name, 'rot_y'].values
+    roll = data_frame[player_name, 'rot_z'].values
+
+    cos_roll = np.cos(roll)
+    sin_roll = np.sin(roll)
+    cos_pitch = np.cos(pitch)
+    sin_pitch = np.sin(pitch)
+    cos_yaw = np.cos(yaw)
+    sin_yaw = np.sin(yaw)
+
+    rotation_matrices = np.empty((len(data_frame), 3, 3))
+    rotation_matrices[:, 0, 0] = cos_pitch * cos_yaw
+    rotation_matrices[:, 0, 1] = cos_yaw * sin_pitch * sin_roll - cos_roll * sin_yaw
+    rotation_matrices[:, 0, 2] = -cos_roll * cos_yaw * sin_pitch - sin_roll * sin_yaw
+    rotation_matrices[:, 1, 0] = cos_pitch * sin_yaw
+    rotation_matrices[:, 1, 1] = sin_yaw * sin_pitch * sin_roll + cos_roll * cos_yaw
+    rotation_matrices[:, 1, 2] = -cos_roll * sin_yaw * sin_pitch + sin_roll * cos_yaw
+    rotation_matrices[:, 2, 0] = sin_pitch
+    rotation_matrices[:, 2, 1] = -cos_pitch * sin_roll
+    rotation_matrices[:, 2, 2] = cos_pitch * cos_roll
+    return rotation_matrices
+
+
+def get_local_displacement(displacement: pd.DataFrame, rotation_matrices: np.ndarray) -> pd.DataFrame:
     displacement_vectors = np.expand_dims(displacement[position_column_names].values, 2)
-    inverse_rotation_matrices: pd.Series = np.transpose(rotation_matrices)
-    inverse_rotation_array = np.stack(inverse_rotation_matrices.values)
-    local_displacement = np.matmul(inverse_rotation_array, displacement_vectors)
+    local_displacement = np.matmul(rotation_matrices, displacement_vectors)
     displacement_data_frame = pd.DataFrame(data=np.squeeze(local_displacement, 2),
                                            index=displacement.index,
                                            columns=position_column_names)
@@ -256,8 +253,5 @@ def get_player_hitboxes(game: Game) -> Dict[str, Hitbox]:
 
 
 def get_collision_distances(local_ball_displacement: pd.DataFrame, player_hitbox: Hitbox) -> pd.Series:
-    def get_distance_function_for_player(displacement: pd.Series):
-        return player_hitbox.get_collision_distance(displacement.values)
-
-    collision_distances = local_ball_displacement.apply(get_distance_function_for_player, axis=1, result_type='reduce')
-    return collision_distances
+    collision_distances = player_hitbox.get_collision_distances(local_ball_displacement[position_column_names].values)
+    return pd.Series(collision_distances, index=local_ball_displacement.index)
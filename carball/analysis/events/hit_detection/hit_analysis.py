@@ -7,7 +7,7 @@ from ....generated.api import game_pb2
 from ....generated.api.player_pb2 import Player
 from ....generated.api.stats.events_pb2 import Hit
 from carball.analysis.events.hit_detection.base_hit import BaseHit
-from carball.analysis.simulator.ball_simulator import BallSimulator
+from carball.analysis.simulator.ball_simulator import BatchBallSimulator
 from carball.analysis.simulator.map_constants import *
 from carball.analysis.constants.field_constants import *
 
@@ -106,19 +106,32 @@ class SaltieHit:
         return last_passing_hit
 
     @staticmethod
-    def get_shot(data_frame: pd.DataFrame, saltie_hit: Hit, player_map: Dict[str, Player]):
+    def simulate_shots(data_frame: pd.DataFrame, saltie_hits: List[Hit], player_map: Dict[str, Player]) -> np.ndarray:
         """
-        Finds shots using ball prediction.
-        :param game:
-        :param saltie_hit:
+        Finds shots using ball prediction, the ball after every hit is simulated at once.
+        :param data_frame:
+        :param saltie_hits:
         :param player_map:
+        :return: If each hit is a shot.
         """
-        # find shots
         # TODO: Support non-standard maps? Raise warning/don't predict for non-standard maps?
+        if len(saltie_hits) == 0:
+            return np.zeros(0, dtype=bool)
+        # missing columns (the ball never moved) become NaN, like the old per-hit lookup
+        ball_data = data_frame.ball.loc[[saltie_hit.frame_number for saltie_hit in saltie_hits], :] \
+            .reindex(columns=BatchBallSimulator.COLUMNS)
+        is_orange = [player_map[saltie_hit.player_id.id].is_orange for saltie_hit in saltie_hits]
+        return BatchBallSimulator(ball_data, is_orange).get_is_shot()
+
+    @staticmethod
+    def get_shot(saltie_hit: Hit, is_shot: bool, player_map: Dict[str, Player]):
+        """
+        Marks the hit as a shot.
+        :param saltie_hit:
+        :param is_shot: If the hit is a shot, from simulate_shots.
+        :param player_map:
+        """
         player = player_map[saltie_hit.player_id.id]
-        ball_sim = BallSimulator(BaseHit.get_ball_data(data_frame, saltie_hit),
-                                 player.is_orange)
-        is_shot = ball_sim.get_is_shot()
         if is_shot:
             saltie_hit.shot = True
             # if saltie_hit.goal:
@@ -182,9 +195,12 @@ class SaltieHit:
         """
 
         last_passing_hit = None
+        start_time = time.time()
+        shots = SaltieHit.simulate_shots(data_frame, [hit_analytics_dict[frame] for frame in sorted_frames],
+                                         player_map)
+        total_simulation_time = time.time() - start_time
         total_stat_time = 0
         total_next_hit_time = 0
-        total_simulation_time = 0
         for hit_number in range(len(sorted_frames)):
             start_time = time.time()
             hit_frame_number = sorted_frames[hit_number]
@@ -237,7 +253,7 @@ class SaltieHit:
 
             saltie_hit.distance_to_goal = SaltieHit.get_distance_to_goal(data_frame, saltie_hit, player_map)
 
-            SaltieHit.get_shot(data_frame, saltie_hit, player_map)
+            SaltieHit.get_shot(saltie_hit, shots[hit_number], player_map)
             SaltieHit.get_clear(data_frame, saltie_hit, next_saltie_hit, player_map)
 
             simulation_time = time.time()
@@ -7,6 +7,10 @@ logger = logging.getLogger(__name__)
 
 
 def read_xl() -> pd.DataFrame:
+    """
+    Reads the hitbox spreadsheet, indexed by car item id.
+    This is only used to compile hitbox_table.py (see utils/create_hitbox_table.py) and requires xlrd.
+    """
     car_item_dict = {
         "21": "Backfire", "22": "Breakout", "23": "Octane", "24": "Paladin", "25": "Road Hog", "26": "Gizmo",
         "28": "X-Devil", "29": "Hotshot", "30": "Merc", "31": "Venom", "402": "Takumi", "403": "Dominus",
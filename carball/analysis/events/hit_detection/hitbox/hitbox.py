@@ -1,22 +1,38 @@
 import logging
+from typing import Dict, Tuple
 
 import numpy as np
 
-from .car import read_xl
-
 logger = logging.getLogger(__name__)
 
+OCTANE_ITEM_ID = 23
+
+# car_item_id: (length, width, height, offset, elevation), filled in by get_car_hitbox
+_car_hitboxes: Dict[int, Tuple[float, float, float, float, float]] = {}
+
+
+def get_car_hitbox(car_item_id: int) -> Tuple[float, float, float, float, float]:
+    """
+    Looks up the hitbox dimensions of a car body, falling back onto the Octane for unknown bodies.
+    The hitbox table is only imported on first use and the result is memoized per car_item_id.
+
+    :return: (length, width, height, offset, elevation)
+    """
+    car_hitbox = _car_hitboxes.get(car_item_id)
+    if car_hitbox is None:
+        from .hitbox_table import HITBOXES
+        car_hitbox = HITBOXES.get(car_item_id)
+        if car_hitbox is None:
+            logger.debug("Cannot find car body id: %s. Falling back onto Octane." % car_item_id)
+            car_hitbox = HITBOXES[OCTANE_ITEM_ID]
+        _car_hitboxes[car_item_id] = car_hitbox
+    return car_hitbox
+
 
 class Hitbox:
-    xl = read_xl()
 
     def __init__(self, car_item_id: int):
-        column_names = ['Length', 'Width', 'Height', 'Offset', 'Elevation']
-        try:
-            car_hitbox = self.xl.loc[car_item_id, column_names].values
-        except KeyError:
-            logger.debug("Cannot find car body id: %s. Falling back onto Octane." % car_item_id)
-            car_hitbox = self.xl.loc[23, column_names].values
+        car_hitbox = get_car_hitbox(car_item_id)
 
         self.car_length, self.car_width, self.car_height, self.car_offset, self.car_elevation = car_hitbox
         self.car_x_lims = (-self.car_length / 2 + self.car_offset,
@@ -53,3 +69,23 @@ class Hitbox:
             z_dist = 0
 
         return (x_dist ** 2 + y_dist ** 2 + z_dist ** 2) ** 0.5
+
+    def get_collision_distances(self, ball_displacements: np.ndarray) -> np.ndarray:
+        """
+        Vectorised version of get_collision_distance, equal to it within float rounding.
+
+        :param ball_displacements: An array of shape (frames, 3) with the ball position relative to the car.
+        :return: An array with the collision distance at each frame, NaN where the displacement has a NaN.
+        """
+        axis_distances = np.zeros(ball_displacements.shape)
+        for axis, (lower_lim, upper_lim) in enumerate([self.car_x_lims, self.car_y_lims, self.car_z_lims]):
+            positions = ball_displacements[:, axis]
+            axis_distances[:, axis] = np.where(positions < lower_lim, np.abs(lower_lim - positions),
+                                               np.where(positions > upper_lim, np.abs(upper_lim - positions), 0))
+
+        # np.power instead of **, which numpy turns into square and sqrt for arrays, to stay close to the pow used
+        # by get_collision_distance. Depending on the numpy version the results may still differ by a few ulps.
+        squared_distances = np.power(axis_distances, 2)
+        collision_distances = np.power(squared_distances[:, 0] + squared_distances[:, 1] + squared_distances[:, 2], 0.5)
+        collision_distances[np.isnan(ball_displacements).any(axis=1)] = np.nan
+        return collision_distances
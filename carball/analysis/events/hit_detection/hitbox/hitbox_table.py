@@ -0,0 +1,48 @@
+# Generated by utils/create_hitbox_table.py from "Vehicle Specifications v1.39 - Hitboxes, Handling.xlsx", do not edit.
+
+HITBOX_TABLE_VERSION = 'v1.39'
+
+# car item id: (length, width, height, offset, elevation)
+HITBOXES = {
+    21: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Backfire
+    22: (131.4924, 80.521, 30.3, 12.5, 11.75),  # Breakout
+    23: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Octane
+    24: (128.8198, 84.67036, 29.3944, 9.008572, 12.0942),  # Paladin
+    25: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Road Hog
+    26: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Gizmo
+    28: (127.0192, 82.18787, 34.15907, 13.87566, 20.75499),  # X-Devil
+    29: (127.9268, 83.27995, 31.3, 9.0, 15.75),  # Hotshot
+    30: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Merc
+    31: (127.0192, 82.18787, 34.15907, 13.87566, 20.75499),  # Venom
+    402: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Takumi
+    403: (127.9268, 83.27995, 31.3, 9.0, 15.75),  # Dominus
+    404: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Scarab
+    523: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Zippy
+    597: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # DeLorean Time Machine
+    600: (127.9268, 83.27995, 31.3, 9.0, 15.75),  # Ripper
+    607: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Grog
+    803: (128.8198, 84.67036, 29.3944, 9.008572, 12.0942),  # Batmobile
+    1018: (127.9268, 83.27995, 31.3, 9.0, 15.75),  # Dominus GT
+    1159: (127.0192, 82.18787, 34.15907, 13.87566, 20.75499),  # X-Devil Mk2
+    1171: (127.9268, 83.27995, 31.3, 9.0, 15.75),  # Masamune
+    1172: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Marauder
+    1286: (127.9268, 83.27995, 31.3, 9.0, 15.75),  # Aftershock
+    1295: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Takumi RX-T
+    1300: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Road Hog XL
+    1317: (127.0192, 82.18787, 34.15907, 13.87566, 20.75499),  # Esper
+    1416: (131.4924, 80.521, 30.3, 12.5, 11.75),  # Breakout Type-S
+    1475: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Proteus
+    1478: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Triton
+    1533: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Vulcan
+    1568: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Octane ZSR
+    1603: (128.8198, 84.67036, 29.3944, 9.008572, 12.0942),  # Twin Mill III
+    1623: (118.0074, 84.19941, 36.15907, 13.87566, 20.75499),  # Bone Shaker
+    1624: (127.0192, 82.18787, 34.15907, 13.87566, 20.75499),  # Endo
+    1675: (127.9268, 83.27995, 31.3, 9.0, 15.75),  # Ice Charger
+    1691: (128.8198, 84.67036, 29.3944, 9.008572, 12.0942),  # Mantis
+    1856: (127.0192, 82.18787, 34.15907, 13.87566, 20.75499),  # Jäger 619 RS
+    1919: (128.8198, 84.67036, 29.3944, 9.008572, 12.0942),  # Centio V17
+    1932: (131.4924, 80.521, 30.3, 12.5, 11.75),  # Animus GP
+    2268: (127.9268, 83.27995, 31.3, 9.0, 15.75),  # '70 Dodge Charger R/T
+    2269: (127.0192, 82.18787, 34.15907, 13.87566, 20.75499),  # '99 Nissan Skyline GT-R R34
+}
@@ -1,11 +1,17 @@
 import pandas as pd
 import math
+import numpy as np
 from typing import List
 
 from carball.generated.api.stats.events_pb2 import Hit
 from carball.generated.api import game_pb2
+from carball.analysis.saltie_game.saltie_game import SaltieGame
 from carball.json_parser.game import Game
 
+# The frames (of 1/30s) after the hit that the opponents are checked at.
+ESTIMATED_FRAMES = np.arange(100) / 10
+
+
 class PressureAnalysis:
     def __init__(self, game: Game, proto_game: game_pb2, data_frame: pd.DataFrame):
         """Initialize a new instance of pressure analysis."""
@@ -25,47 +31,94 @@ class PressureAnalysis:
 
     def get_hit_pressure(self, hit: Hit):
         """Calculate pressure for the passed hit. Hit pressure determines how long it would have taken for the nearest opponent to hit the ball."""
-        highest_pressure = 0
-        teams = self.proto_game.teams
-        opposing_team = None
-        try:
-            opposing_team = next(filter(lambda x: hit.player_id not in x.player_ids, teams))
-        except StopIteration:
-            hit.pressure = 0
-            return
-        opposing_team_ids = list(map(lambda x: x.id, opposing_team.player_ids))
-        for player_id in opposing_team_ids:
-            ball_row = self.data_frame.ball.iloc[hit.frame_number]
-            player_name = None
-            try:
-                player_name = next(filter(lambda x: x.id.id == player_id, self.proto_game.players)).name
-            except StopIteration:
-                hit.pressure = 0
-                break
-            player_row = self.data_frame[player_name].iloc[hit.frame_number]
+        self.get_hits_pressure([hit])
+
+    def get_hits_pressure(self, hits: List[Hit]):
+        """Calculate pressure for all of the passed hits at once, see get_hit_pressure."""
+        player_names = {}
+        for player in self.proto_game.players:
+            player_names.setdefault(player.id.id, player.name)
+
+        # Pair each hit with the opponents that could have pressured it.
+        pair_hit_indexes = []
+        pair_player_names = []
+        for hit_index, hit in enumerate(hits):
+            opposing_team = next((team for team in self.proto_game.teams if hit.player_id not in team.player_ids),
+                                 None)
+            if opposing_team is None:
+                continue
+            for player_id in opposing_team.player_ids:
+                if player_id.id not in player_names:
+                    # The opponents after a player that is not in the game are not considered.
+                    break
+                pair_hit_indexes.append(hit_index)
+                pair_player_names.append(player_names[player_id.id])
+
+        pressures = np.zeros(len(hits), dtype=int)
+        if len(pair_hit_indexes) > 0:
+            pair_hit_indexes = np.array(pair_hit_indexes)
+            pair_player_names = np.array(pair_player_names, dtype=object)
+            frame_numbers = np.array([hit.frame_number for hit in hits])[pair_hit_indexes]
+            rows = SaltieGame.get_frame_rows(self.game, self.data_frame, frame_numbers)
+            # the hits at the last frames have no frame to read
+            in_frames = rows >= 0
+            pair_hit_indexes = pair_hit_indexes[in_frames]
+            pair_player_names = pair_player_names[in_frames]
+            rows = rows[in_frames]
 
             # Get kinematics. Divide by 30 to consider velocity as uu/frame.
-            ball_position = [ball_row.pos_x,ball_row.pos_y,ball_row.pos_z]
-            player_position = [player_row.pos_x,player_row.pos_y,player_row.pos_z]
-            player_velocity = [player_row.vel_x/30,player_row.vel_y/30,player_row.vel_z/30]
-
-            original_distance = self.get_distance(ball_position, player_position)
-            # Only consider defenders within 2000uu of hit.
-            if original_distance < 2000:
-                # Check the next 10 frames to see if the opposing player would have hit the ball.
-                for i in range(100):
-                    frame = i/10
-                    estimated_player_position = [player_position[x]+frame*player_velocity[x] for x in range(len(ball_position))]
-                    new_distance = self.get_distance(estimated_player_position,ball_position)
-                    if new_distance > original_distance and new_distance > 500:
-                        # Defender is not going towards ball, stop checking
-                        break
-                    if new_distance < 500:
-                        highest_pressure = int(max(highest_pressure, (10-frame)*10))
-                        break
-        hit.pressure = highest_pressure
+            # The distances are compared with each other, so they are all calculated in float64.
+            ball_positions = self.data_frame.ball[['pos_x', 'pos_y', 'pos_z']].to_numpy(dtype=np.float64)[rows]
+            player_positions = np.empty_like(ball_positions)
+            player_velocities = np.empty_like(ball_positions)
+            for player_name in set(pair_player_names):
+                is_player = pair_player_names == player_name
+                player_frames = self.data_frame[player_name].iloc[rows[is_player]]
+                player_positions[is_player] = player_frames[['pos_x', 'pos_y', 'pos_z']].to_numpy(dtype=np.float64)
+                player_velocities[is_player] = \
+                    player_frames[['vel_x', 'vel_y', 'vel_z']].to_numpy(dtype=np.float64) / 30
+
+            with np.errstate(invalid='ignore'):
+                pressures_by_pair = self._get_pressures(ball_positions, player_positions, player_velocities)
+            np.maximum.at(pressures, pair_hit_indexes, pressures_by_pair)
+
+        for hit, pressure in zip(hits, pressures):
+            hit.pressure = int(pressure)
+
+    @staticmethod
+    def _get_pressures(ball_positions: np.ndarray, player_positions: np.ndarray,
+                       player_velocities: np.ndarray) -> np.ndarray:
+        """
+        :return: The pressure each player puts on the ball, 0 if the player could not have hit it.
+        """
+        original_distances = PressureAnalysis._get_distances(ball_positions, player_positions)
+        # Only consider defenders within 2000uu of hit.
+        close_players = original_distances < 2000
+        original_distances = original_distances[close_players]
+
+        # Check the next 10 frames to see if the opposing player would have hit the ball.
+        estimated_player_positions = player_positions[close_players, np.newaxis, :] + \
+            ESTIMATED_FRAMES[np.newaxis, :, np.newaxis] * player_velocities[close_players, np.newaxis, :]
+        new_distances = PressureAnalysis._get_distances(estimated_player_positions,
+                                                        ball_positions[close_players, np.newaxis, :])
+        hit_ball = new_distances < 500
+        # Defender is not going towards ball, stop checking
+        going_away = (new_distances > original_distances[:, np.newaxis]) & (new_distances > 500)
+        first_checked_frames = np.argmax(hit_ball | going_away, axis=1)
+        hit_ball = hit_ball[np.arange(len(hit_ball)), first_checked_frames]
+
+        pressures = np.zeros(len(ball_positions), dtype=int)
+        pressures[np.flatnonzero(close_players)[hit_ball]] = \
+            ((10 - ESTIMATED_FRAMES[first_checked_frames[hit_ball]]) * 10).astype(int)
+        return pressures
+
+    @staticmethod
+    def _get_distances(positions1: np.ndarray, positions2: np.ndarray) -> np.ndarray:
+        """get_distance between each pair of positions (in the last axis), rounded the same way."""
+        # np.power rounds like ** 2 on a single number, ** 2 on an array does not.
+        squared_distances = np.power(positions1 - positions2, 2)
+        return np.sqrt(squared_distances[..., 0] + squared_distances[..., 1] + squared_distances[..., 2])
 
     def calculate_pressure_stats(self):
         """Will assign a pressure value to every hit in the game."""
-        for hit in self.proto_game.game_stats.hits:
-            self.get_hit_pressure(hit)
+        self.get_hits_pressure(self.proto_game.game_stats.hits)
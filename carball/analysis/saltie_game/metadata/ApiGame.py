@@ -32,12 +32,21 @@ class ApiGame:
         if game.replay_version is not None:
             proto_game.version = game.replay_version
         proto_game.time = int(game.datetime.timestamp())
-        proto_game.frames = game.frames.index.max()
+        if game.frames is not None:
+            proto_game.frames = game.frames.index.max()
+        elif 'NumFrames' in game.properties:
+            # the frames were not parsed
+            proto_game.frames = game.properties['NumFrames'] - 1
         proto_game.score.CopyFrom(ApiGameScore.create_from_game(game))
         ApiGoal.create_goals_from_game(game, proto_game.goals, id_creator)
         ApiDemo.create_demos_from_game(game, proto_game.demos, id_creator)
         if game.primary_player is not None and game.primary_player['id'] is not None:
             proto_game.primary_player.id = game.primary_player['id']
+        proto_game.team_size = game.team_size
+        if game.game_info is None:
+            # the game info is only in the network frames
+            return id_creator, proto_game
+
         try:
             proto_game.playlist = game.game_info.playlist
         except:
@@ -53,7 +62,6 @@ class ApiGame:
             proto_game.match_guid = game.id
         else:
             proto_game.match_guid = game.game_info.match_guid
-        proto_game.team_size = game.team_size
 
         return id_creator, proto_game
 
@@ -9,4 +9,7 @@ class ApiGoal:
         for goal in game.goals:
             proto_goal = proto_goal_list.add()
             proto_goal.frame_number = goal.frame_number
+            if goal.player is None and game.frames is None:
+                # without the frames there is no player for a scorer that left before the end of the game
+                continue
             id_creator(proto_goal.player_id, goal.player_name)
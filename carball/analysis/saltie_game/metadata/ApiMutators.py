@@ -7,8 +7,11 @@ class ApiMutators:
     @staticmethod
     def create_from_game(proto_mutators: mutators_pb2.Mutators,
                         game: Game, id_creator: Callable) -> mutators_pb2.Mutators:
-        proto_mutators.ball_type = game.ball_type
-        proto_mutators.game_mutator_index = game.game_info.mutator_index
+        # both are only in the network frames
+        if game.ball_type is not None:
+            proto_mutators.ball_type = game.ball_type
+        if game.game_info is not None:
+            proto_mutators.game_mutator_index = game.game_info.mutator_index
 
         return id_creator, proto_mutators
         
\ No newline at end of file
@@ -1,5 +1,6 @@
 import logging
 
+import numpy as np
 import pandas as pd
 
 from ...json_parser.game import Game
@@ -82,12 +83,21 @@ class SaltieGame:
         return reset_kickoff_index
 
     @staticmethod
-    def create_data_df(game: Game) -> pd.DataFrame:
+    def create_data_df(game: Game, first_frame: int = None, last_frame: int = None) -> pd.DataFrame:
+        """
+        :param first_frame: Only include the frames from this one on.
+        :param last_frame: Only include the frames up to this one.
+        """
         data_dict = {player.name: player.data for player in game.players}
         data_dict['ball'] = game.ball
+        frames = game.frames
+        if first_frame is not None or last_frame is not None:
+            data_dict = {name: data.loc[first_frame:last_frame] if data is not None else None
+                         for name, data in data_dict.items()}
+            frames = frames.loc[first_frame:last_frame]
         initial_df = pd.concat(data_dict, axis=1)
 
-        data_frame = pd.concat([initial_df, game.frames], axis=1)
+        data_frame = pd.concat([initial_df, frames], axis=1)
         cols = []
         for c in data_frame.columns.values:
             if isinstance(c, str):
@@ -96,3 +106,16 @@ class SaltieGame:
                 cols.append(c)
         data_frame.columns = pd.MultiIndex.from_tuples(cols)
         return data_frame
+
+    @staticmethod
+    def get_frame_rows(game: Game, data_frame: pd.DataFrame, frame_numbers) -> np.ndarray:
+        """
+        The hit pressure and 50/50 analyses read the frame numbers as row positions of the frames of the whole game.
+        The data frame of a window starts later in the game, so its rows are shifted to read the same frames.
+        :param data_frame: The data frame from create_data_df.
+        :return: The row of each frame number, -1 if it is past the end of data_frame.
+        """
+        offset = game.frames.index.get_loc(data_frame.index[0])
+        rows = np.asarray(frame_numbers, dtype=int) - offset
+        rows[(rows < 0) | (rows >= len(data_frame))] = -1
+        return rows
@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 
-from .bounce import bounce
+from .bounce import bounce, bounce_all, row_dot
 
 BALL_RADIUS = 91.25
 SIDE_WALL_DISTANCE = 4096
@@ -40,10 +40,12 @@ class BallSimulator:
     def __init__(self, ball_data, is_orange):
         self.is_orange = is_orange
         self.ball_data = ball_data
-        self.sim_vars = {'position': ball_data[['pos_x', 'pos_y', 'pos_z']].values,
-                         'velocity': ball_data[['vel_x', 'vel_y', 'vel_z']].values / 10,
-                         'rotation': ball_data[['rot_x', 'rot_y', 'rot_z']].values,
-                         'ang_vel': ball_data[['ang_vel_x', 'ang_vel_y', 'ang_vel_z']].values / 1000,
+        # the frames may be stored as float32, the ball is always simulated in float64
+        self.sim_vars = {'position': ball_data[['pos_x', 'pos_y', 'pos_z']].to_numpy(dtype=np.float64),
+                         'velocity': ball_data[['vel_x', 'vel_y', 'vel_z']].to_numpy(dtype=np.float64) / 10,
+                         'rotation': ball_data[['rot_x', 'rot_y', 'rot_z']].to_numpy(dtype=np.float64),
+                         'ang_vel':
+                             ball_data[['ang_vel_x', 'ang_vel_y', 'ang_vel_z']].to_numpy(dtype=np.float64) / 1000,
                          }
         self.is_shot = False
 
@@ -258,3 +260,154 @@ class BallSimulator:
             return True
         else:
             return False
+
+
+class BatchBallSimulator:
+    """
+    Simulates many balls at once with the same physics as BallSimulator, giving exactly the same results.
+
+    The position and velocity of every ball is a row of one (n, 6) array, so each step is a few array operations
+    over all of the balls. Balls that have gone into the goal stop being simulated.
+    """
+    COLUMNS = ['pos_x', 'pos_y', 'pos_z', 'vel_x', 'vel_y', 'vel_z', 'ang_vel_x', 'ang_vel_y', 'ang_vel_z']
+
+    def __init__(self, ball_data: pd.DataFrame, is_orange: np.ndarray):
+        """
+        :param ball_data: The ball at the start of each simulation, one row per ball.
+        :param is_orange: If each ball was hit by orange, so which goal is shot at.
+        """
+        self.is_orange = np.asarray(is_orange, dtype=bool)
+        self.x_v = np.concatenate((ball_data[['pos_x', 'pos_y', 'pos_z']].to_numpy(dtype=np.float64),
+                                   ball_data[['vel_x', 'vel_y', 'vel_z']].to_numpy(dtype=np.float64) / 10), axis=1)
+        self.ang_vel = ball_data[['ang_vel_x', 'ang_vel_y', 'ang_vel_z']].to_numpy(dtype=np.float64) / 1000
+        self.is_shot = np.zeros(len(ball_data), dtype=bool)
+
+    def get_is_shot(self) -> np.ndarray:
+        """
+        Simulates the balls and returns is_shot, if each ball went into the goal.
+        """
+        self.simulate_time(0, SIMULATION_SECONDS, 1 / SIMULATION_FPS)
+        return self.is_shot
+
+    def simulate_time(self, start_time, end_time, time_step):
+        # the balls that have not gone into the goal yet
+        remaining = np.arange(len(self.x_v))
+        x_v = self.x_v
+        ang_vel = self.ang_vel
+        is_orange = self.is_orange
+
+        simulated_time = start_time
+        with np.errstate(divide='ignore', invalid='ignore'):
+            while simulated_time < end_time and len(remaining) > 0:
+                # move by dt
+                derivatives, ang_vel = self.step_dt(x_v, ang_vel)
+                x_v = np.concatenate((x_v[:, :3], derivatives[:, :3]), axis=1) + derivatives * time_step
+                simulated_time += time_step
+
+                # CHECK IF BALL IN GOAL
+                in_goal = np.where(is_orange, x_v[:, 1] < -BACK_WALL_DISTANCE, x_v[:, 1] > BACK_WALL_DISTANCE)
+                if in_goal.any():
+                    self.is_shot[remaining[in_goal]] = True
+                    still_simulated = ~in_goal
+                    remaining = remaining[still_simulated]
+                    x_v = x_v[still_simulated]
+                    ang_vel = ang_vel[still_simulated]
+                    is_orange = is_orange[still_simulated]
+
+    def step_dt(self, x_v: np.ndarray, ang_vel: np.ndarray):
+        """
+        :return: The derivatives of the position and velocity of each ball and the new angular velocities.
+        """
+        x = x_v[:, :3]
+        v = x_v[:, 3:]
+        abs_x = np.abs(x)
+        # where the ball touches a surface, as in BallSimulator.step_dt the last surface checked is bounced off
+        normal_vectors = np.zeros_like(x)
+        collided = np.zeros(len(x_v), dtype=bool)
+
+        def check_surface(touching: np.ndarray, normal_vector):
+            if not touching.any():
+                return
+            if callable(normal_vector):
+                normal_vector = normal_vector(touching)
+            normal_vector = np.broadcast_to(np.asarray(normal_vector, dtype=float), (touching.sum(), 3))
+            normal_vectors[touching] = normal_vector
+            collided[touching] |= row_dot(normal_vector, v[touching]) < 0
+
+        def curve_normal(curve_x, curve_y, curve_z):
+            def get_normal_vector(touching: np.ndarray) -> np.ndarray:
+                surface_vector = np.zeros((touching.sum(), 3))
+                if curve_x is not None:
+                    surface_vector[:, 0] = curve_x - x[touching, 0]
+                if curve_y is not None:
+                    surface_vector[:, 1] = curve_y - x[touching, 1]
+                surface_vector[:, 2] = curve_z - x[touching, 2]
+                return surface_vector / np.sqrt(row_dot(surface_vector, surface_vector))[:, np.newaxis]
+            return get_normal_vector
+
+        # np.power goes through pow like ** 2 on a single number does, ** 2 on an array rounds differently
+        # ramps
+        # bottom y axis
+        check_surface((np.abs(x[:, 1]) > CURVE_Y_3) & (x[:, 2] < CURVE_Z_3) & (abs_x[:, 0] > GOAL_X) &
+                      (np.power(abs_x[:, 1] - CURVE_Y_3, 2) + np.power(x[:, 2] - CURVE_Z_3, 2) >
+                       (CURVE_RADIUS_3 - BALL_RADIUS) ** 2),
+                      curve_normal(None, CURVE_Y_3, CURVE_Z_3))
+        # bottom x axis
+        check_surface((abs_x[:, 0] > CURVE_X_2) & (x[:, 2] < CURVE_Z_2) &
+                      (np.power(abs_x[:, 0] - CURVE_X_2, 2) + np.power(x[:, 2] - CURVE_Z_2, 2) >
+                       (CURVE_RADIUS_2 - BALL_RADIUS) ** 2),
+                      curve_normal(CURVE_X_2, None, CURVE_Z_2))
+        # top y axis
+        check_surface((abs_x[:, 1] > CURVE_Y_1) & (x[:, 2] > CURVE_Z_1) & (abs_x[:, 0] > GOAL_X) &
+                      (np.power(abs_x[:, 1] - CURVE_Y_1, 2) + np.power(x[:, 2] - CURVE_Z_1, 2) >
+                       (CURVE_RADIUS_1 - BALL_RADIUS) ** 2),
+                      curve_normal(None, CURVE_Y_1, CURVE_Z_1))
+        # top x axis
+        top_x = (x[:, 2] > CURVE_Z_1) & \
+            (np.power(abs_x[:, 0] - CURVE_X_1, 2) + np.power(x[:, 2] - CURVE_Z_1, 2) >
+             (CURVE_RADIUS_1 - BALL_RADIUS) ** 2)
+        check_surface(top_x & (x[:, 0] > CURVE_X_1), curve_normal(CURVE_X_1, None, CURVE_Z_1))
+        check_surface(top_x & (x[:, 0] < -CURVE_X_1), curve_normal(CURVE_X_2, None, CURVE_Z_1))
+        # floor
+        check_surface(x[:, 2] < BALL_RADIUS, [0, 0, 1])
+        # ceiling
+        check_surface(x[:, 2] > CEILING_DISTANCE - BALL_RADIUS, [0, 0, -1])
+        # sides
+        check_surface(x[:, 0] < -SIDE_WALL_DISTANCE + BALL_RADIUS, [1, 0, 0])
+        check_surface(x[:, 0] > SIDE_WALL_DISTANCE - BALL_RADIUS, [-1, 0, 0])
+        # back
+        back = (BALL_RADIUS < x[:, 2]) & (x[:, 2] < CEILING_DISTANCE - BALL_RADIUS) & \
+            ((abs_x[:, 0] > GOAL_X - BALL_RADIUS) | (abs_x[:, 2] > GOAL_Z - BALL_RADIUS))
+        check_surface(back & (x[:, 1] < -BACK_WALL_DISTANCE + BALL_RADIUS), [0, 1, 0])
+        check_surface(back & (x[:, 1] > BACK_WALL_DISTANCE - BALL_RADIUS), [0, -1, 0])
+
+        # corner side
+        corner = abs_x[:, 0] + abs_x[:, 1] + BALL_RADIUS > CORNER_WALL_DISTANCE
+        over_rt2 = 1 / np.sqrt(2)
+        check_surface(corner & (x[:, 0] < 0) & (x[:, 1] < 0), [over_rt2, over_rt2, 0])
+        check_surface(corner & (x[:, 0] < 0) & (x[:, 1] > 0), [over_rt2, -over_rt2, 0])
+        check_surface(corner & (x[:, 0] > 0) & (x[:, 1] < 0), [-over_rt2, over_rt2, 0])
+        check_surface(corner & (x[:, 0] > 0) & (x[:, 1] > 0), [-over_rt2, -over_rt2, 0])
+
+        v = v.copy()
+        ang_vel = ang_vel.copy()
+        if collided.any():
+            v[collided], ang_vel[collided] = bounce_all(v[collided], ang_vel[collided], normal_vectors[collided])
+
+        # if v > max speed: v = v
+        too_fast = row_dot(v, v) > BallSimulator.ball_max_speed ** 2
+        if too_fast.any():
+            v[too_fast] = v[too_fast] / np.sqrt(row_dot(v[too_fast], v[too_fast]))[:, np.newaxis] * \
+                BallSimulator.ball_max_speed
+
+        # calculate a
+        a = np.array([0, 0, -BallSimulator.gravity]) - BallSimulator.air_resistance * v
+
+        # if ang_vel > max rotation: normalise to 6
+        spinning_too_fast = row_dot(ang_vel, ang_vel) > BallSimulator.ball_max_rotation_speed ** 2
+        if spinning_too_fast.any():
+            ang_vel[spinning_too_fast] = ang_vel[spinning_too_fast] / \
+                np.sqrt(row_dot(ang_vel[spinning_too_fast], ang_vel[spinning_too_fast]))[:, np.newaxis] * \
+                BallSimulator.ball_max_rotation_speed
+
+        return np.concatenate((v, a), axis=1), ang_vel
@@ -29,3 +29,33 @@ def bounce(state, normal=GROUND_NORMAL):
     new_state = (vel + delta_v_perp + delta_v_para,
                  ang_vel + A * R * np.cross(delta_v_para.astype(float), normal))
     return new_state
+
+
+def row_dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    The dot product of each row of a with the same row of b.
+
+    np.matmul computes each of them with the same routine as np.dot, so the results are exactly the same
+    as calling np.dot on each row (np.einsum and summing the products round differently).
+    """
+    return np.matmul(a[:, np.newaxis, :], b[:, :, np.newaxis])[:, 0, 0]
+
+
+def bounce_all(vel: np.ndarray, ang_vel: np.ndarray, normal: np.ndarray):
+    """
+    bounce for many balls at once, each argument has one row per ball.
+    """
+    v_perp = row_dot(vel, normal)[:, np.newaxis] * normal
+    v_para = vel - v_perp
+    v_spin = R * np.cross(normal, ang_vel)
+    s = v_para + v_spin
+
+    ratio = np.sqrt(row_dot(v_perp, v_perp)) / np.sqrt(row_dot(s, s))
+
+    delta_v_perp = - (1.0 + C_R) * v_perp
+    # same as min(1.0, Y * ratio), which gives 1.0 if the ratio is nan
+    scaled_ratio = Y * ratio
+    delta_v_para = (- np.where(scaled_ratio < 1.0, scaled_ratio, 1.0) * mu)[:, np.newaxis] * s
+
+    return (vel + delta_v_perp + delta_v_para,
+            ang_vel + A * R * np.cross(delta_v_para, normal))
@@ -1,8 +1,10 @@
 from typing import Dict
 
+import numpy as np
 import pandas as pd
 
 from ....analysis.stats.stats import HitStat
+from ....analysis.stats.utils.hit_table import HitTable
 from ....generated.api import game_pb2
 from ....generated.api.player_pb2 import Player
 from ....generated.api.stats.events_pb2 import Hit
@@ -26,3 +28,27 @@ class DistanceStats(HitStat):
             player.stats.distance.ball_hit_forward += hit_distance_y
         if hit_distance_y < 0:
             player.stats.distance.ball_hit_backward += abs(hit_distance_y)
+
+    def calculate_hit_table_stat(self, game: Game, proto_game: game_pb2.Game, hit_table: HitTable,
+                                 player_map: Dict[str, Player]):
+        hit_indexes = hit_table.get_pair_indexes()
+        pos_y = hit_table.ball_data.pos_y.values
+        hit_distances_y = pos_y[hit_indexes + 1] - pos_y[hit_indexes]
+        hit_distances_y[hit_table.is_orange[hit_indexes]] *= -1
+
+        forward = hit_distances_y > 0
+        backward = hit_distances_y < 0
+        forward_distances = hit_table.accumulate_by_player(
+            [player.stats.distance.ball_hit_forward for player in hit_table.players],
+            hit_indexes[forward], hit_distances_y[forward])
+        backward_distances = hit_table.accumulate_by_player(
+            [player.stats.distance.ball_hit_backward for player in hit_table.players],
+            hit_indexes[backward], np.abs(hit_distances_y[backward]))
+
+        forward_counts = hit_table.count_by_player(hit_indexes[forward])
+        backward_counts = hit_table.count_by_player(hit_indexes[backward])
+        for player_index, player in enumerate(hit_table.players):
+            if forward_counts[player_index] > 0:
+                player.stats.distance.ball_hit_forward = forward_distances[player_index]
+            if backward_counts[player_index] > 0:
+                player.stats.distance.ball_hit_backward = backward_distances[player_index]
@@ -1,8 +1,9 @@
 import logging
-from typing import Dict
+from typing import Dict, Tuple
 
 import numpy as np
 import pandas as pd
+from carball.analysis.constants.basic_math import get_speed_from_velocities
 from carball.analysis.constants.field_constants import FieldConstants
 
 from carball.analysis.stats.utils.pandas_utils import sum_deltas_by_truthy_data
@@ -15,21 +16,27 @@ from ....json_parser.game import Game
 
 logger = logging.getLogger(__name__)
 
+# The columns of a player the boost stats are calculated from.
+BOOST_COLUMNS = ['boost', 'boost_active', 'boost_collect']
+
 
 class BoostStat(BaseStat):
     field_constants = FieldConstants()
 
     def calculate_player_stat(self, player_stat_map: Dict[str, PlayerStats], game: Game, proto_game: game_pb2.Game,
                               player_map: Dict[str, Player], data_frame: pd.DataFrame):
+        features = self.get_features(data_frame)
         for player_key, stats in player_stat_map.items():
 
             proto_boost = stats.boost
             player_name = player_map[player_key].name
-            player_data_frame = data_frame[player_name].copy()
-            player_data_frame.loc[:, 'delta'] = data_frame['game'].delta
+            player_columns = data_frame[player_name]
+            player_data_frame = player_columns[[column for column in BOOST_COLUMNS if column in player_columns]]
+            player_data_frame = player_data_frame.assign(delta=data_frame['game'].delta)
             proto_boost.boost_usage = self.get_player_boost_usage(player_data_frame)
 
-            proto_boost.wasted_usage = self.get_player_boost_usage_max_speed(player_data_frame)
+            proto_boost.wasted_usage = self.get_player_boost_usage_max_speed(player_data_frame,
+                                                                             features.get_speed(player_name))
 
             proto_boost.time_full_boost = self.get_time_with_max_boost(data_frame, player_data_frame)
             proto_boost.time_low_boost = self.get_time_with_low_boost(data_frame, player_data_frame)
@@ -39,25 +46,7 @@ class BoostStat(BaseStat):
             if 'boost_collect' not in player_data_frame:
                 logger.warning('%s did not collect any boost', player_key)
             else:
-                gains_index = player_data_frame['boost'].diff().clip(0)
-                gains_index = gains_index.loc[gains_index > 0].index.to_numpy()
-                collect_frames = player_data_frame.loc[player_data_frame.index[player_data_frame['boost_collect'] > 34]]
-                # Have to loop to fuzzy match
-                wasted_big = 0
-                for index in collect_frames.index.to_numpy():
-                    idx = gains_index[(np.abs(gains_index - index).argmin())]
-                    int_idx = player_data_frame.index.get_loc(idx)
-                    wasted_big += player_data_frame['boost'].iloc[int_idx - 1] / 256 * 100
-
-                collect_frames = player_data_frame.loc[player_data_frame.index[player_data_frame['boost_collect'] <= 34]]
-                prior_vals = np.empty([0])
-                for index in collect_frames.index.to_numpy():
-                    idx = gains_index[(np.abs(gains_index - index).argmin())]
-                    int_idx = player_data_frame.index.get_loc(idx)
-                    val = player_data_frame['boost'].iloc[int_idx-1]
-                    prior_vals = np.append(prior_vals, val)
-                deltas = ((prior_vals + 30.6) - 255)
-                wasted_small = deltas[deltas > 0].sum() / 256 * 100
+                wasted_big, wasted_small = self.get_wasted_collection(player_data_frame)
 
                 collection = self.get_player_boost_collection(player_data_frame)
                 proto_boost.wasted_collection = wasted_big + wasted_small
@@ -79,6 +68,40 @@ class BoostStat(BaseStat):
         # boost_usage = _diff[_diff > 0].sum() / 255 * 100
         # return boost_usage
 
+    @staticmethod
+    def get_wasted_collection(player_dataframe: pd.DataFrame) -> Tuple[float, float]:
+        """
+        Matches every pickup to the closest frame the boost of the player went up in,
+        the boost before that frame is how much of the pickup was wasted.
+        :return: The boost wasted by the big pickups and by the small pickups.
+        """
+        boost = player_dataframe['boost'].to_numpy()
+        frames = player_dataframe.index.to_numpy()
+        # the gains are never in the first frame, so there is always a frame before them
+        gain_positions = np.flatnonzero(np.diff(boost) > 0) + 1
+        gain_frames = frames[gain_positions]
+
+        def get_prior_boost(collect_frames: np.ndarray) -> np.ndarray:
+            if len(gain_frames) == 0:
+                return np.empty(0)
+            # the gains closest before and after each pickup, the one before if both are as close
+            after = np.searchsorted(gain_frames, collect_frames)
+            before = after - 1
+            after_frames = gain_frames[after.clip(max=len(gain_frames) - 1)]
+            before_frames = gain_frames[before.clip(min=0)]
+            use_before = (after == len(gain_frames)) | \
+                         ((before >= 0) & (collect_frames - before_frames <= after_frames - collect_frames))
+            closest = np.where(use_before, before, after)
+            return boost[gain_positions[closest] - 1].astype(np.float64)
+
+        boost_collect = player_dataframe['boost_collect']
+        wasted_big = (get_prior_boost(frames[(boost_collect > 34).to_numpy()]) / 256 * 100).sum()
+
+        prior_vals = get_prior_boost(frames[(boost_collect <= 34).to_numpy()])
+        deltas = ((prior_vals + 30.6) - 255)
+        wasted_small = deltas[deltas > 0].sum() / 256 * 100
+        return wasted_big, wasted_small
+
     @staticmethod
     def get_average_boost_level(player_dataframe: pd.DataFrame) -> np.float64:
         return player_dataframe.boost.mean(skipna=True) / 255 * 100
@@ -97,12 +120,11 @@ class BoostStat(BaseStat):
         return stolen
 
     @staticmethod
-    def get_player_boost_usage_max_speed(player_dataframe: pd.DataFrame) -> np.float64:
+    def get_player_boost_usage_max_speed(player_dataframe: pd.DataFrame, speed: pd.Series = None) -> np.float64:
         _diff = -player_dataframe.boost.diff()
 
-        speed: pd.Series = (player_dataframe.vel_x ** 2 +
-                            player_dataframe.vel_y ** 2 +
-                            player_dataframe.vel_z ** 2) ** 0.5
+        if speed is None:
+            speed = get_speed_from_velocities(player_dataframe)
 
         _diff = _diff.rename('boost')
         speed = speed.rename('speed')
@@ -21,7 +21,8 @@ class KickoffStat(BaseStat):
 
         for player_id in player_stat_map:
             kickoff_stats = player_stat_map[player_id].kickoff_stats
-            kickoff_stats.average_boost_used = kickoff_stats.average_boost_used / kickoff_stats.total_kickoffs
+            if kickoff_stats.total_kickoffs > 0:
+                kickoff_stats.average_boost_used = kickoff_stats.average_boost_used / kickoff_stats.total_kickoffs
 
     def compute_totals(self, kickoff_player: KickoffPlayer,
                        player_kickoff_stats: CumulativeKickoffStats,
@@ -2,8 +2,7 @@ from typing import Dict
 
 import pandas as pd
 
-from carball.analysis.constants.basic_math import get_player_ball_displacements, get_distance_from_displacements, \
-    get_position_displacements
+from carball.analysis.constants.basic_math import get_distance_from_displacements, get_position_displacements
 from ....analysis.stats.utils.pandas_utils import sum_deltas_by_player_name
 from ....analysis.stats.stats import BaseStat
 from ....generated.api import game_pb2
@@ -20,9 +19,12 @@ class BallDistanceStat(BaseStat):
         if len(player_map) == 0:
             return
 
+        features = self.get_features(data_frame)
+        player_ball_distances = {player_id: features.get_ball_distance(player.name)
+                                 for player_id, player in player_map.items()}
         player_distances_data_frame, player_distance_times, player_distance_with_delta, \
              = self.calculate_player_distance_to_location(player_map, data_frame,
-                                                          data_frame['ball'])
+                                                          data_frame['ball'], player_ball_distances)
 
         for player_id in player_stat_map.keys():
             close_frames = player_distances_data_frame[player_id] < 500
@@ -40,22 +42,25 @@ class BallDistanceStat(BaseStat):
 
     @staticmethod
     def calculate_player_distance_to_location(player_map: Dict[str, Player], data_frame: pd.DataFrame,
-                                              location: pd.DataFrame) -> (pd.DataFrame, pd.DataFrame, pd.DataFrame):
+                                              location: pd.DataFrame, player_distances: Dict[str, pd.Series] = None
+                                              ) -> (pd.DataFrame, pd.DataFrame, pd.DataFrame):
         """
         Calculates the player distance to a particular location
         also grabbing the closest and furthest player to those locations.
         :param player_map:
         :param data_frame:
         :param location:
+        :param player_distances: The distance of each player to the location if it is already known, by player id.
         :return:
         """
 
-        player_displacements = {player_id: get_position_displacements(data_frame[player_map[player_id].name],
-                                                                      location)
-                                for player_id in player_map.keys()}
+        if player_distances is None:
+            player_distances = {player_id: get_distance_from_displacements(
+                get_position_displacements(data_frame[player_map[player_id].name], location))
+                for player_id in player_map.keys()}
 
-        player_distances = {player_id: get_distance_from_displacements(player_data_frame).rename(player_id)
-                            for player_id, player_data_frame in player_displacements.items()}
+        player_distances = {player_id: player_distance.rename(player_id)
+                            for player_id, player_distance in player_distances.items()}
 
         player_distances_data_frame = pd.concat(player_distances, axis=1)
         closest_players = player_distances_data_frame.idxmin(axis=1).rename('closest_player')
@@ -1,8 +1,10 @@
 from typing import Dict
 
+import numpy as np
 import pandas as pd
 
 from ....analysis.stats.stats import BaseStat, HitStat
+from ....analysis.stats.utils.hit_table import HitTable
 from ....generated.api import game_pb2
 from ....generated.api.player_pb2 import Player
 from ....generated.api.stats.events_pb2 import Hit
@@ -66,3 +68,44 @@ class PossessionStat(BaseStat, HitStat):
                                   saltie_hit.frame_number:next_saltie_hit.frame_number].sum()
             player.stats.possession.possession_time = player.stats.possession.possession_time + hit_possession_time
             proto_game.game_stats.neutral_possession_time = proto_game.game_stats.neutral_possession_time + hit_possession_time
+
+    def calculate_hit_table_stat(self, game: Game, proto_game: game_pb2.Game, hit_table: HitTable,
+                                 player_map: Dict[str, Player]):
+        if self.frame_possession_time_deltas is None:
+            return
+        hit_indexes = hit_table.get_pair_indexes()
+        hit_possession_times = self.get_possession_times(hit_table.frame_numbers[hit_indexes],
+                                                         hit_table.frame_numbers[hit_indexes + 1])
+
+        possession_times = hit_table.accumulate_by_player(
+            [player.stats.possession.possession_time for player in hit_table.players],
+            hit_indexes, hit_possession_times)
+        hit_counts = hit_table.count_by_player(hit_indexes)
+        for player_index, player in enumerate(hit_table.players):
+            if hit_counts[player_index] > 0:
+                player.stats.possession.possession_time = possession_times[player_index]
+
+        is_orange = hit_table.is_orange
+        is_neutral = is_orange[hit_indexes] != is_orange[hit_indexes + 1]
+        # neutral_possession_time is a float, so it is rounded when it is stored after each hit
+        for hit_possession_time in hit_possession_times[is_neutral]:
+            proto_game.game_stats.neutral_possession_time = proto_game.game_stats.neutral_possession_time + hit_possession_time
+
+    def get_possession_times(self, start_frames: np.ndarray, end_frames: np.ndarray) -> np.ndarray:
+        """
+        :return: The sum of the deltas from each start frame to each end frame (both included),
+            added up the same way as pd.Series.sum.
+        """
+        deltas = self.frame_possession_time_deltas.delta
+        index = deltas.index
+        if index.is_monotonic_increasing:
+            starts = index.searchsorted(start_frames, side='left')
+            ends = index.searchsorted(end_frames, side='right')
+        else:
+            slices = [index.slice_locs(start_frame, end_frame)
+                      for start_frame, end_frame in zip(start_frames, end_frames)]
+            starts = [start for start, end in slices]
+            ends = [end for start, end in slices]
+        # pd.Series.sum skips nan by replacing it with 0
+        values = deltas.fillna(0).values
+        return np.array([values[start:end].sum() for start, end in zip(starts, ends)], dtype=values.dtype)
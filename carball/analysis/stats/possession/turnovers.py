@@ -1,10 +1,12 @@
 from typing import Dict
 
+import numpy as np
 import pandas as pd
 
 from carball.generated.api.stats.events_pb2 import Hit
 from ....analysis.constants.field_constants import FieldConstants
 from ....analysis.stats.stats import HitStat
+from ....analysis.stats.utils.hit_table import HitTable
 from ....generated.api import game_pb2
 from ....generated.api.player_pb2 import Player
 from ....json_parser.game import Game
@@ -38,6 +40,47 @@ class TurnoverStat(HitStat):
             second_hit_player.stats.possession.won_turnovers += 1
             proto_game.teams[second_hit_player.is_orange].stats.possession.won_turnovers += 1
 
+    def calculate_hit_table_stat(self, game: Game, proto_game: game_pb2.Game, hit_table: HitTable,
+                                 player_map: Dict[str, Player]):
+        hit_indexes = hit_table.get_pair_indexes()
+        # If there is a goal between 2nd hit and 3rd hit abort check
+        hit_indexes = hit_indexes[hit_table.has_next_hit[hit_indexes + 1] & (hit_indexes + 2 < len(hit_table))]
+
+        is_orange = hit_table.is_orange
+        turnover_indexes = hit_indexes[(is_orange[hit_indexes] != is_orange[hit_indexes + 1]) &
+                                       (is_orange[hit_indexes] != is_orange[hit_indexes + 2])]
+        # if the hit occurred on the on the same half as my team
+        ball_data = hit_table.ball_data.iloc[turnover_indexes]
+        my_half = (ball_data.pos_y.values > 0) == is_orange[turnover_indexes]
+        neutral_zone = self.field_constants.get_neutral_zone(ball_data).values
+
+        counts = {
+            'turnovers': turnover_indexes,
+            'turnovers_on_my_half': turnover_indexes[my_half & ~neutral_zone],
+            'turnovers_on_their_half': turnover_indexes[~my_half & ~neutral_zone],
+        }
+        won_turnover_indexes = turnover_indexes + 1
+        for player_index, player in enumerate(hit_table.players):
+            for field, indexes in counts.items():
+                self.add_count(player.stats.possession, field, hit_table.count_by_player(indexes)[player_index])
+            self.add_count(player.stats.possession, 'won_turnovers',
+                           hit_table.count_by_player(won_turnover_indexes)[player_index])
+        for team_index in range(2):
+            for field, indexes in counts.items():
+                self.add_count_to_team(proto_game, team_index, field, np.sum(is_orange[indexes] == team_index))
+            self.add_count_to_team(proto_game, team_index, 'won_turnovers',
+                                   np.sum(is_orange[won_turnover_indexes] == team_index))
+
+    def add_count_to_team(self, proto_game: game_pb2.Game, team_index: int, field: str, count: int):
+        if count > 0:
+            self.add_count(proto_game.teams[team_index].stats.possession, field, count)
+
+    @staticmethod
+    def add_count(possession_proto, field: str, count: int):
+        # only set the counts that assign_turnover would have set
+        if count > 0:
+            setattr(possession_proto, field, getattr(possession_proto, field) + int(count))
+
     def assign_turnover(self, possession_proto, is_turnover_my_half, is_neutral):
         possession_proto.turnovers += 1
         if is_turnover_my_half and not is_neutral:
@@ -9,12 +9,13 @@ from carball.generated.api.player_pb2 import Player
 from carball.generated.api.stats.team_stats_pb2 import TeamStats
 from carball.generated.api.stats.rumble_pb2 import PowerUp
 from carball.json_parser.game import Game
-from carball.analysis.stats.rumble.rumble import is_rumble_enabled
+from carball.analysis.stats.rumble.rumble import RumbleItemStat, is_rumble_enabled
 
 log = logging.getLogger(__name__)
 
 
 class PreRumbleGoals(BaseStat):
+    depends_on = (RumbleItemStat,)
 
     def calculate_team_stat(self, team_stat_list: Dict[int, TeamStats], game: Game, proto_game: game_pb2.Game,
                             player_map: Dict[str, Player], data_frame: pd.DataFrame):
@@ -16,6 +16,12 @@ from carball.generated.api.metadata.game_metadata_pb2 import RANKED_RUMBLE, UNRA
 
 class RumbleItemStat(BaseStat):
 
+    @property
+    def depends_on(self):
+        # the team stats are calculated from the rumble items found by the player stats,
+        # a property as the class cannot name itself in its body
+        return (RumbleItemStat,)
+
     def calculate_player_stat(self, player_stat_map: Dict[str, PlayerStats], game: Game, proto_game: game_pb2.Game,
                               player_map: Dict[str, Player], data_frame: pd.DataFrame):
         if not is_rumble_enabled(game):
@@ -1,8 +1,10 @@
 import logging
-from typing import Dict
+from typing import Dict, Tuple, Type
 
 import pandas as pd
 
+from ...analysis.stats.utils.frame_features import FrameFeatures
+from ...analysis.stats.utils.hit_table import HitTable
 from ...generated.api import game_pb2
 from ...generated.api.player_pb2 import Player
 from ...generated.api.stats.events_pb2 import Hit
@@ -12,9 +14,21 @@ from ...json_parser.game import Game
 
 
 class BaseStat:
+    # the stats whose results this stat reads, when stats are calculated in parallel it waits for them to finish
+    depends_on: Tuple[Type['BaseStat'], ...] = ()
 
     def __init__(self):
         self.logger = logging.getLogger(type(self).__name__)
+        # set by the StatsManager, so all stats share the columns derived from the same frames
+        self.features: FrameFeatures = None
+
+    def get_features(self, data_frame: pd.DataFrame) -> FrameFeatures:
+        """
+        :return: The shared derived columns of data_frame, created if this stat is used on its own.
+        """
+        if self.features is None or self.features.data_frame is not data_frame:
+            self.features = FrameFeatures(data_frame)
+        return self.features
 
     def calculate_stat(self, proto_stat, game: Game, proto_game: game_pb2.Game, player_map: Dict[str, Player],
                        data_frame: pd.DataFrame):
@@ -75,3 +89,19 @@ class HitStat:
         :param hit_index: The index in the list of protobuf hits where the current hit is listed.
         """
         raise NotImplementedError()
+
+    def calculate_hit_table_stat(self, game: Game, proto_game: game_pb2.Game, hit_table: HitTable,
+                                 player_map: Dict[str, Player]):
+        """
+        Calculate stats over every hit that is followed by another hit at once.
+        By default this calls calculate_next_hit_stat for each of those hits.
+        :param game: The raw data that has been created from python.
+        :param proto_game: A protobuf that contains some parsed stats + all metadata for the game.
+        :param hit_table: The hits of proto_game as arrays.
+        :param player_map: A map of playerId to the protobuf Player object
+        """
+        hits = proto_game.game_stats.hits
+        for hit_index in hit_table.get_pair_indexes():
+            hit_index = int(hit_index)
+            self.calculate_next_hit_stat(game, proto_game, hits[hit_index], hits[hit_index + 1], player_map,
+                                         hit_index)
@@ -1,10 +1,16 @@
 import logging
 import time
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
 import pandas as pd
 
+from ...analysis.stats.stats import BaseStat
 from ...analysis.stats.stats_list import StatsList
+from ...analysis.stats.utils.frame_features import FrameFeatures
+from ...analysis.stats.utils.hit_table import HitTable
+from ...analysis.utils.profiler import AnalysisProfiler
+from ...analysis.utils.proto_manager import ProtobufManager
 from ...generated.api import game_pb2
 from ...generated.api.player_pb2 import Player
 from ...generated.api.stats.player_stats_pb2 import PlayerStats
@@ -15,74 +21,170 @@ from ...json_parser.game import Game
 logger = logging.getLogger(__name__)
 
 
-def start_time():
-    return time.time()
-
-
-def end_time(start):
-    return (time.time() - start) * 1000
+PLAYER = 'player'
+TEAM = 'team'
+GAME = 'game'
 
 
 class StatsManager:
 
+    def __init__(self, profiler: AnalysisProfiler = None, max_workers: int = 1):
+        """
+        :param profiler: Records the time taken by each stat, under the name of its class.
+        :param max_workers: Number of threads the player, team and game stats are calculated on.
+            The stats are calculated one after the other in the calling thread if this is 1.
+        """
+        self.profiler = profiler if profiler is not None else AnalysisProfiler()
+        self.max_workers = max_workers
+
     def get_stats(self, game: Game, proto_game: game_pb2.Game,
-                  player_map: Dict[str, Player], data_frame: pd.DataFrame):
+                  player_map: Dict[str, Player], data_frame: pd.DataFrame, features: FrameFeatures = None):
         """
         Calculates all basic stats.
         The stats are always calculated in this order:
             Player, Team, Game, Hit
+        :param features: The derived columns shared between the stats, created from data_frame if not given.
         """
-        self.calculate_player_stats(game, proto_game, player_map, data_frame)
-        self.calculate_team_stats(game, proto_game, proto_game.teams, player_map, data_frame)
-        self.calculate_game_stats(game, proto_game, player_map, data_frame)
-        self.calculate_hit_stats(game, proto_game, player_map, data_frame)
+        if features is None:
+            features = FrameFeatures(data_frame)
+        if self.max_workers > 1:
+            self.calculate_stats_in_parallel(game, proto_game, player_map, data_frame, features)
+        else:
+            with self.profiler.stage(PLAYER):
+                self.calculate_player_stats(game, proto_game, player_map, data_frame, features)
+            with self.profiler.stage(TEAM):
+                self.calculate_team_stats(game, proto_game, proto_game.teams, player_map, data_frame, features)
+            with self.profiler.stage(GAME):
+                self.calculate_game_stats(game, proto_game, player_map, data_frame, features)
+        with self.profiler.stage('hit'):
+            self.calculate_hit_stats(game, proto_game, player_map, data_frame)
 
-    @staticmethod
-    def calculate_player_stats(game: Game, proto_game: game_pb2.Game,
-                               player_map: Dict[str, Player], data_frame: pd.DataFrame):
+    def calculate_player_stats(self, game: Game, proto_game: game_pb2.Game,
+                               player_map: Dict[str, Player], data_frame: pd.DataFrame,
+                               features: FrameFeatures = None):
         stats_proto: Dict[str, PlayerStats] = {
             key: player.stats
             for key, player in player_map.items()
         }
         for stat_function in StatsList.get_player_stats():
-            time = start_time()
             logger.debug("Building player stat: %s", type(stat_function).__name__)
-            stat_function.calculate_player_stat(stats_proto, game, proto_game, player_map, data_frame)
-            logger.debug("Built in [%d] milliseconds", end_time(time))
+            stat_function.features = features
+            with self.profiler.stage(type(stat_function).__name__):
+                stat_function.calculate_player_stat(stats_proto, game, proto_game, player_map, data_frame)
 
-    @staticmethod
-    def calculate_team_stats(game: Game, proto_game: game_pb2.Game, teams: List[Team],
-                             player_map: Dict[str, Player], data_frame: pd.DataFrame):
+    def calculate_team_stats(self, game: Game, proto_game: game_pb2.Game, teams: List[Team],
+                             player_map: Dict[str, Player], data_frame: pd.DataFrame,
+                             features: FrameFeatures = None):
         stats_proto: Dict[int, TeamStats] = {
             int(team.is_orange): team.stats
             for team in teams
         }
         for stat_function in StatsList.get_team_stats():
-            time = start_time()
             logger.debug("Building team stat: %s", type(stat_function).__name__)
-            stat_function.calculate_team_stat(stats_proto, game, proto_game, player_map, data_frame)
-            logger.debug("Built in [%d] milliseconds", end_time(time))
+            stat_function.features = features
+            with self.profiler.stage(type(stat_function).__name__):
+                stat_function.calculate_team_stat(stats_proto, game, proto_game, player_map, data_frame)
 
-    @staticmethod
-    def calculate_game_stats(game: Game, proto_game: game_pb2.Game, player_map: Dict[str, Player],
-                             data_frame: pd.DataFrame):
+    def calculate_game_stats(self, game: Game, proto_game: game_pb2.Game, player_map: Dict[str, Player],
+                             data_frame: pd.DataFrame, features: FrameFeatures = None):
         for stat_function in StatsList.get_general_stats():
-            time = start_time()
             logger.debug("Building game stat: %s", type(stat_function).__name__)
-            stat_function.calculate_stat(proto_game.game_stats, game, proto_game, player_map, data_frame)
-            logger.debug("Built in [%d] milliseconds", end_time(time))
+            stat_function.features = features
+            with self.profiler.stage(type(stat_function).__name__):
+                stat_function.calculate_stat(proto_game.game_stats, game, proto_game, player_map, data_frame)
 
-    @staticmethod
-    def calculate_hit_stats(game: Game, proto_game: game_pb2.Game,
+    def calculate_hit_stats(self, game: Game, proto_game: game_pb2.Game,
                             player_map: Dict[str, Player], data_frame: pd.DataFrame):
         hit_stats = StatsList.get_hit_stats()
         for hit_stat in hit_stats:
             logger.debug("Building hit stat: %s", type(hit_stat).__name__)
-            hit_stat.initialize_hit_stat(game, player_map, data_frame)
-        hits = proto_game.game_stats.hits
-        for hit_index in range(len(hits) - 1):
-            current_hit = hits[hit_index]
-            if current_hit.HasField("next_hit_frame_number"):
-                next_hit = hits[hit_index + 1]
-                for hit_stat in hit_stats:
-                    hit_stat.calculate_next_hit_stat(game, proto_game, current_hit, next_hit, player_map, hit_index)
+            with self.profiler.stage(type(hit_stat).__name__):
+                hit_stat.initialize_hit_stat(game, player_map, data_frame)
+        hit_table = HitTable(proto_game, player_map)
+        for hit_stat in hit_stats:
+            with self.profiler.stage(type(hit_stat).__name__):
+                hit_stat.calculate_hit_table_stat(game, proto_game, hit_table, player_map)
+
+    def calculate_stats_in_parallel(self, game: Game, proto_game: game_pb2.Game, player_map: Dict[str, Player],
+                                    data_frame: pd.DataFrame, features: FrameFeatures = None):
+        """
+        Calculates the player, team and game stats on a pool of threads.
+
+        Each stat writes to its own copy of proto_game, the changes are then applied to proto_game in the order
+        the stats would have been calculated in one after the other, so the result is the same.
+        Stats only run together with the other stats they do not depend on (see BaseStat.depends_on),
+        they must not write to the same fields.
+        """
+        tasks = self.get_execution_plan([(PLAYER, stat) for stat in StatsList.get_player_stats()] +
+                                        [(TEAM, stat) for stat in StatsList.get_team_stats()] +
+                                        [(GAME, stat) for stat in StatsList.get_general_stats()])
+        # pandas may reorganise the memory of a frame on the first read, which must not happen on several threads
+        # at once, so the stats read a copy, which pandas creates already organised
+        frames = data_frame.copy()
+        if features is None or features.data_frame is data_frame:
+            features = FrameFeatures(frames)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for wave in tasks:
+                before = game_pb2.Game()
+                before.CopyFrom(proto_game)
+                copies = [self._copy_proto_game(before, proto_game, player_map) for _ in wave]
+                futures = [executor.submit(self._calculate_stat, category, stat, game, proto_copy, player_map_copy,
+                                           frames, features)
+                           for (category, stat), (proto_copy, player_map_copy) in zip(wave, copies)]
+                # results are collected in order so the first stat to fail (in order) raises its exception
+                for (category, stat), (proto_copy, _), future in zip(wave, copies, futures):
+                    wall_time, cpu_time = future.result()
+                    self.profiler.record(category + '/' + type(stat).__name__, wall_time, cpu_time)
+                    ProtobufManager.apply_changes(proto_game, before, proto_copy)
+
+    @staticmethod
+    def get_execution_plan(tasks: List[Tuple[str, BaseStat]]) -> List[List[Tuple[str, BaseStat]]]:
+        """
+        Splits the stats into waves that can be calculated at the same time.
+        A stat is put in the wave after the last wave of the earlier stats it depends on.
+        :param tasks: The category and stat, in the order they would be calculated one after the other.
+        :return: The waves, each holding its stats in their original order.
+        """
+        waves = []
+        task_waves = []
+        for category, stat in tasks:
+            wave_number = 0
+            for (_, earlier_stat), earlier_wave_number in zip(tasks, task_waves):
+                if isinstance(earlier_stat, stat.depends_on):
+                    wave_number = max(wave_number, earlier_wave_number + 1)
+            task_waves.append(wave_number)
+            if wave_number == len(waves):
+                waves.append([])
+            waves[wave_number].append((category, stat))
+        return waves
+
+    @staticmethod
+    def _copy_proto_game(before: game_pb2.Game, proto_game: game_pb2.Game,
+                         player_map: Dict[str, Player]) -> Tuple[game_pb2.Game, Dict[str, Player]]:
+        proto_copy = game_pb2.Game()
+        proto_copy.CopyFrom(before)
+        player_indexes = {id(player): index for index, player in enumerate(proto_game.players)}
+        player_map_copy = {key: proto_copy.players[player_indexes[id(player)]] for key, player in player_map.items()}
+        return proto_copy, player_map_copy
+
+    @staticmethod
+    def _calculate_stat(category: str, stat: BaseStat, game: Game, proto_game: game_pb2.Game,
+                        player_map: Dict[str, Player], data_frame: pd.DataFrame,
+                        features: FrameFeatures) -> Tuple[float, float]:
+        """
+        :return: The wall and cpu time taken in milliseconds.
+        """
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.thread_time()
+        logger.debug("Building %s stat: %s", category, type(stat).__name__)
+        stat.features = features
+        if category == PLAYER:
+            stats_proto = {key: player.stats for key, player in player_map.items()}
+            stat.calculate_player_stat(stats_proto, game, proto_game, player_map, data_frame)
+        elif category == TEAM:
+            stats_proto = {int(team.is_orange): team.stats for team in proto_game.teams}
+            stat.calculate_team_stat(stats_proto, game, proto_game, player_map, data_frame)
+        else:
+            stat.calculate_stat(proto_game.game_stats, game, proto_game, player_map, data_frame)
+        return (time.perf_counter() - start_wall_time) * 1000, (time.thread_time() - start_cpu_time) * 1000
@@ -1,8 +1,10 @@
 from typing import Dict
 
+import numpy as np
 import pandas
 
 from carball.analysis.stats.stats import HitStat
+from carball.analysis.stats.utils.hit_table import HitTable
 from carball.generated.api import game_pb2
 from carball.generated.api.player_pb2 import Player
 from carball.generated.api.stats import stats_pb2
@@ -10,6 +12,19 @@ from carball.generated.api.stats.events_pb2 import Hit
 from carball.json_parser.game import Game
 
 
+# the hit count of each flag of a hit
+FLAG_COUNTS = {
+    'dribble': 'total_dribbles',
+    'dribble_continuation': 'total_dribble_conts',
+    'pass_': 'total_passes',
+    'goal': 'total_goals',
+    'shot': 'total_shots',
+    'save': 'total_saves',
+    'aerial': 'total_aerials',
+    'clear': 'total_clears',
+}
+
+
 class HitCountStat(HitStat):
 
     def initialize_hit_stat(self, game: Game, player_map: Dict[str, Player], data_frame: pandas.DataFrame):
@@ -40,3 +55,27 @@ class HitCountStat(HitStat):
         self.apply_stat(player.stats.hit_counts, saltie_hit)
         team = proto_game.teams[player.is_orange]
         self.apply_stat(team.stats.hit_counts, saltie_hit)
+
+    def calculate_hit_table_stat(self, game: Game, proto_game: game_pb2.Game, hit_table: HitTable,
+                                 player_map: Dict[str, Player]):
+        hit_indexes = hit_table.get_pair_indexes()
+        hit_teams = hit_table.is_orange.astype(int)
+        player_counts = {'total_hits': hit_table.count_by_player(hit_indexes)}
+        team_counts = {'total_hits': np.bincount(hit_teams[hit_indexes], minlength=2)}
+        for flag, field in FLAG_COUNTS.items():
+            flagged_indexes = hit_indexes[hit_table.flags[flag][hit_indexes]]
+            player_counts[field] = hit_table.count_by_player(flagged_indexes)
+            team_counts[field] = np.bincount(hit_teams[flagged_indexes], minlength=2)
+
+        for player_index, player in enumerate(hit_table.players):
+            self.add_counts(player.stats.hit_counts, player_counts, player_index)
+        for team_index in range(2):
+            if team_counts['total_hits'][team_index] > 0:
+                self.add_counts(proto_game.teams[team_index].stats.hit_counts, team_counts, team_index)
+
+    @staticmethod
+    def add_counts(hit_count: stats_pb2.HitCounts, counts: Dict[str, np.ndarray], index: int):
+        for field, field_counts in counts.items():
+            # only set the counts that apply_stat would have set
+            if field_counts[index] > 0:
+                setattr(hit_count, field, getattr(hit_count, field) + int(field_counts[index]))
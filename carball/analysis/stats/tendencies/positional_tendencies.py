@@ -1,8 +1,10 @@
-from typing import Callable, Dict
+from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 
-from ....analysis.constants.field_constants import FieldConstants
+from ....analysis.constants.field_constants import FieldConstants, HEIGHT_0_BALL_LIM, HEIGHT_0_LIM, HEIGHT_1_LIM, \
+    MAP_THIRD
 from ....analysis.stats.stats import BaseStat
 from ....generated.api import game_pb2
 from ....generated.api.player_pb2 import Player
@@ -10,106 +12,96 @@ from ....generated.api.stats import stats_pb2
 from ....generated.api.stats.player_stats_pb2 import PlayerStats
 from ....json_parser.game import Game
 
+# The zones the time of an object is counted in, in the order of the arguments of set_tendency_proto.
+TENDENCY_ZONES = ['height_0', 'height_1', 'height_2',
+                  'half_0', 'half_1',
+                  'third_0', 'third_1', 'third_2',
+                  'ball_0', 'ball_1',
+                  'wall', 'on_wall', 'corner']
+
 
 class PositionalTendencies(BaseStat):
     field_constants = FieldConstants()
 
-    def __init__(self):
-        super().__init__()
-        self.field_constants = FieldConstants()
-        self.map_player_attributes_to_predicates = {
-            "height_0": self.field_constants.get_height_0,
-            "height_1": self.field_constants.get_height_1,
-            "height_2": self.field_constants.get_height_2,
-            "half_0": self.field_constants.get_half_0,
-            "half_1": self.field_constants.get_half_1,
-            "third_0": self.field_constants.get_third_0,
-            "third_1": self.field_constants.get_third_1,
-            "third_2": self.field_constants.get_third_2,
-            "ball_0": self.field_constants.get_ball_0,
-            "ball_1": self.field_constants.get_ball_1,
-            "wall": self.field_constants.get_wall_time,
-            "on_wall": self.field_constants.get_on_wall,
-            "corner": self.field_constants.get_corner_time
-        }
-
-        self.map_ball_attributes_to_predicates = {
-            "height_0": self.field_constants.get_height_0_ball,
-            "height_1": self.field_constants.get_height_1,
-            "height_2": self.field_constants.get_height_2,
-            "half_0": self.field_constants.get_half_0,
-            "half_1": self.field_constants.get_half_1,
-            "third_0": self.field_constants.get_third_0,
-            "third_1": self.field_constants.get_third_1,
-            "third_2": self.field_constants.get_third_2,
-            "ball_0": self.field_constants.get_ball_0,
-            "ball_1": self.field_constants.get_ball_1,
-            "wall": self.field_constants.get_wall_time,
-            "on_wall": lambda *args, **kwargs: [],
-            "corner": self.field_constants.get_corner_time
-        }
-
     def calculate_player_stat(self, player_stat_map: Dict[str, PlayerStats], game: Game, proto_game: game_pb2.Game,
                               player_map: Dict[str, Player], data_frame: pd.DataFrame):
-        for id, player in player_map.items():
-            self.get_player_tendencies(player, data_frame)
+        tendency_times = self.get_tendency_times(data_frame, player_map)
+        for player in player_map.values():
+            self.set_tendency_proto(player.stats.positional_tendencies, **tendency_times[player.name])
 
     def calculate_stat(self, proto_stat, game: Game, proto_game: game_pb2.Game, player_map: Dict[str, Player],
                        data_frame: pd.DataFrame):
-        ball_data_frame = data_frame['ball']
-
-        self.get_tendencies(data_frame, ball_data_frame, ball_data_frame, False,
-                            proto_stat.ball_stats.positional_tendencies, self.map_ball_attributes_to_predicates)
+        tendency_times = self.get_tendency_times(data_frame, player_map)
+        self.set_tendency_proto(proto_stat.ball_stats.positional_tendencies, **tendency_times['ball'])
 
-    def get_player_tendencies(self, player: Player, data_frame: pd.DataFrame):
-        self.get_tendencies(data_frame, data_frame[player.name], data_frame['ball'],
-                            player.is_orange, player.stats.positional_tendencies,
-                            self.map_player_attributes_to_predicates)
-
-    def get_tendencies(self, data_frame: pd.DataFrame, player_data_frame: pd.DataFrame,
-                       ball_data_frame: pd.DataFrame, is_orange: bool,
-                       positional_tendencies: stats_pb2.PositionalTendencies,
-                       predicate_map: Dict[str, Callable]):
+    def get_tendency_times(self, data_frame: pd.DataFrame,
+                           player_map: Dict[str, Player]) -> Dict[str, Dict[str, float]]:
+        """
+        Calculates the tendencies of all of the players and the ball at once,
+        the player and the game stats share them through the FrameFeatures.
+        :return: The time spent in each of the TENDENCY_ZONES by the name of the player, or 'ball'.
+        """
+        players = list(player_map.values())
+        names = [player.name for player in players] + ['ball']
+
+        def calculate():
+            times = self.calculate_tendency_times(
+                data_frame, [data_frame[name] for name in names],
+                is_orange=[player.is_orange for player in players] + [False],
+                ground_heights=[HEIGHT_0_LIM] * len(players) + [HEIGHT_0_BALL_LIM])
+            return {name: dict(zip(TENDENCY_ZONES, object_times)) for name, object_times in zip(names, times)}
+
+        key = ('positional_tendencies', tuple((player.name, player.is_orange) for player in players))
+        return self.get_features(data_frame).get_shared(key, calculate)
+
+    @classmethod
+    def calculate_tendency_times(cls, data_frame: pd.DataFrame, position_frames: List[pd.DataFrame],
+                                 is_orange: List[bool], ground_heights: List[float]) -> np.ndarray:
         """
-        Calculates the tendencies for all of the stats
+        Puts the positions of every object in the zones of the field in one pass,
+        then sums the deltas of the frames in each zone with a single bincount.
         :param data_frame: The normal data frame
-        :param player_data_frame: The frame for the positions of the player
-        :param ball_data_frame: The frame for the positions of the ball
-        :param is_orange: If we need to flip the field for defense/offense
-        :param positional_tendencies: The proto field where everything is set
-        :param predicate_map: The map of checks to call
+        :param position_frames: The positions (pos_x, pos_y, pos_z) of each object, indexed like data_frame
+        :param is_orange: If we need to flip the field for defense/offense, for each object
+        :param ground_heights: The height under which each object is on the ground
+        :return: The time spent in each of the TENDENCY_ZONES, an array of shape (objects, zones).
         """
-        player_ball_dataframes: Dict[str, pd.DataFrame] = {
-            "player_data_frame": player_data_frame,
-            "ball_data_frame": ball_data_frame,
-        }
-        if is_orange:
-            player_ball_dataframes = self.get_flipped_dataframes(player_ball_dataframes)
-
-        init_params = {
-            attr: self.get_duration_from_predicate(predicate, player_ball_dataframes, data_frame)
-            for attr, predicate in predicate_map.items()
-        }
-        self.set_tendency_proto(positional_tendencies, **init_params)
-
-    @staticmethod
-    def get_duration_from_predicate(predicate: Callable,
-                                    player_ball_dataframes: Dict[str, pd.DataFrame], data_frame: pd.DataFrame):
-        boolean_index = predicate(**player_ball_dataframes)
-        deltas = data_frame.game.delta
-        return deltas[boolean_index].sum()
-
-    def get_flipped_dataframes(self, data_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
-        new_dataframes = {
-            _k: _v.copy() for _k, _v in data_frames.items()
-        }
-
-        for data_frame in new_dataframes.values():
-            data_frame.pos_y *= -1
-            data_frame.rot_y += 65535 / 2
-            data_frame.rot_y %= 65536
-
-        return new_dataframes
+        field_constants = cls.field_constants
+        pos_x = np.stack([frames.pos_x.to_numpy() for frames in position_frames])
+        pos_y = np.stack([frames.pos_y.to_numpy() for frames in position_frames])
+        pos_z = np.stack([frames.pos_z.to_numpy() for frames in position_frames])
+        # defense is always towards negative y, the positions keep their type so the zones have the same edges
+        flip = np.where(is_orange, -1, 1).astype(pos_y.dtype)[:, np.newaxis]
+        pos_y = pos_y * flip
+        ball_y = data_frame['ball'].pos_y.to_numpy().astype(pos_y.dtype)[np.newaxis, :] * flip
+        abs_x = np.abs(pos_x)
+        abs_y = np.abs(pos_y)
+        # comparisons with nan are false, so unknown positions are in no zone but the wall one, as before
+        in_field = (abs_x < field_constants.on_wall[0]) & (abs_y < field_constants.on_wall[1])
+        zones = np.stack([
+            pos_z < np.array(ground_heights, dtype=pos_z.dtype)[:, np.newaxis],
+            (HEIGHT_0_LIM < pos_z) & (pos_z < HEIGHT_1_LIM) & in_field,
+            (pos_z > HEIGHT_1_LIM) & in_field,
+            pos_y < 0,
+            pos_y > 0,
+            pos_y < -MAP_THIRD,
+            (-MAP_THIRD < pos_y) & (pos_y < MAP_THIRD),
+            pos_y > MAP_THIRD,
+            pos_y < ball_y,
+            pos_y > ball_y,
+            ~((field_constants.rectangle_lower[0] <= pos_x) & (pos_x <= field_constants.rectangle_higher[0]) &
+              (field_constants.rectangle_lower[1] <= pos_y) & (pos_y <= field_constants.rectangle_higher[1])),
+            (abs_x > field_constants.on_wall[0]) | (abs_y > field_constants.on_wall[1]),
+            ((pos_x >= field_constants.corner[0]) | (pos_x <= -field_constants.corner[0])) &
+            ((pos_y >= field_constants.corner[1]) | (pos_y <= -field_constants.corner[1])),
+        ], axis=-1)
+
+        num_objects, num_frames, num_zones = zones.shape
+        deltas = data_frame['game', 'delta'].fillna(0).to_numpy(dtype=np.float64)
+        bins = np.broadcast_to(np.arange(num_objects * num_zones).reshape(num_objects, 1, num_zones), zones.shape)
+        weights = zones * deltas[np.newaxis, :, np.newaxis]
+        times = np.bincount(bins.ravel(), weights=weights.ravel(), minlength=num_objects * num_zones)
+        return times.reshape(num_objects, num_zones)
 
     @staticmethod
     def set_tendency_proto(proto: stats_pb2.PositionalTendencies, height_0: float, height_1: float, height_2: float,
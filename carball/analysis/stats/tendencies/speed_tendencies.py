@@ -2,6 +2,7 @@ from typing import Dict
 
 import pandas as pd
 
+from ....analysis.constants.basic_math import get_speed_from_velocities
 from ....analysis.stats.utils.pandas_utils import sum_deltas_by_truthy_data
 from ....analysis.stats.stats import BaseStat
 from ....generated.api import game_pb2
@@ -18,9 +19,7 @@ class SpeedTendencies(BaseStat):
         ball = data_frame['ball']
         if 'vel_x' not in ball:
             return
-        speed: pd.Series = (ball.vel_x ** 2 +
-                            ball.vel_y ** 2 +
-                            ball.vel_z ** 2) ** 0.5
+        speed = self.get_features(data_frame).get_speed('ball')
 
         average_speed = speed.mean()
 
@@ -29,16 +28,14 @@ class SpeedTendencies(BaseStat):
     def calculate_player_stat(self, player_stat_map: Dict[str, PlayerStats], game: Game, proto_game: game_pb2.Game,
                               player_map: Dict[str, Player], data_frame: pd.DataFrame):
 
+        features = self.get_features(data_frame)
         for key, player in player_map.items():
-            self.calculate_speed_for_data_frame(player, data_frame)
+            self.calculate_speed_for_data_frame(player, data_frame, features.get_speed(player.name))
 
     @classmethod
-    def calculate_speed_for_data_frame(cls, player: Player, data_frame: pd.DataFrame):
-        player_data_frame = data_frame[player.name]
-
-        speed: pd.Series = (player_data_frame.vel_x ** 2 +
-                            player_data_frame.vel_y ** 2 +
-                            player_data_frame.vel_z ** 2) ** 0.5
+    def calculate_speed_for_data_frame(cls, player: Player, data_frame: pd.DataFrame, speed: pd.Series = None):
+        if speed is None:
+            speed = get_speed_from_velocities(data_frame[player.name])
 
         average_speed = speed.mean()
 
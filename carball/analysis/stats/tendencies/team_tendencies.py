@@ -7,7 +7,8 @@ from carball.analysis.constants.playlist import get_team_size_from_game
 from carball.analysis.stats.possession.ball_distances import BallDistanceStat
 from carball.generated.api.team_pb2 import Team
 
-from ....analysis.stats.tendencies.positional_tendencies import PositionalTendencies
+from ....analysis.constants.field_constants import HEIGHT_0_LIM
+from ....analysis.stats.tendencies.positional_tendencies import PositionalTendencies, TENDENCY_ZONES
 from ....generated.api import game_pb2
 from ....generated.api.player_pb2 import Player
 from ....generated.api.stats.team_stats_pb2 import TeamStats
@@ -22,6 +23,8 @@ class TeamTendencies(PositionalTendencies):
 
     def calculate_team_stat(self, team_stat_list: Dict[int, TeamStats], game: Game, proto_game: game_pb2.Game,
                             player_map: Dict[str, Player], data_frame: pd.DataFrame):
+        teams = []
+        centers_of_mass = []
         for team in proto_game.teams:
             team_size = get_team_size_from_game(proto_game)
             if len(team.player_ids) <= 1 or team_size <= 1:
@@ -29,10 +32,14 @@ class TeamTendencies(PositionalTendencies):
                 continue
             player_names = [player_map[player_id.id].name for player_id in team.player_ids]
             center_of_mass = self.calculate_team_center(data_frame, player_names)
-            self.get_team_tendencies(team, data_frame, center_of_mass)
+            teams.append(team)
+            centers_of_mass.append(center_of_mass)
 
             self.calculate_displacements(team, player_map, center_of_mass, data_frame, team_size)
 
+        if len(teams) > 0:
+            self.get_team_tendencies(teams, data_frame, centers_of_mass)
+
     def calculate_team_center(self, data_frame, list_of_players) -> (pd.DataFrame, List[pd.DataFrame]):
         players = []
         for player in list_of_players:
@@ -43,10 +50,13 @@ class TeamTendencies(PositionalTendencies):
         center_position = combined.groupby(combined.index).mean()
         return center_position
 
-    def get_team_tendencies(self, team: Team, data_frame: pd.DataFrame, team_center: pd.DataFrame):
-        self.get_tendencies(data_frame, team_center, data_frame['ball'],
-                            team.is_orange, team.stats.center_of_mass.positional_tendencies,
-                            self.map_player_attributes_to_predicates)
+    def get_team_tendencies(self, teams: List[Team], data_frame: pd.DataFrame, team_centers: List[pd.DataFrame]):
+        tendency_times = self.calculate_tendency_times(
+            data_frame, [team_center.reindex(data_frame.index) for team_center in team_centers],
+            is_orange=[team.is_orange for team in teams], ground_heights=[HEIGHT_0_LIM] * len(teams))
+        for team, team_times in zip(teams, tendency_times):
+            self.set_tendency_proto(team.stats.center_of_mass.positional_tendencies,
+                                    **dict(zip(TENDENCY_ZONES, team_times)))
 
     def calculate_displacements(self, team: Team, player_map: Dict[str, Player],
                                 center_of_mass: pd.DataFrame, data_frame: pd.DataFrame, team_size: int):
@@ -104,16 +114,6 @@ class TeamTendencies(PositionalTendencies):
                 distance.time_closest_to_team_center = 0
                 distance.time_furthest_from_team_center = 0
 
-    def get_flipped_dataframes(self, data_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
-        new_dataframes = {
-            _k: _v.copy() for _k, _v in data_frames.items()
-        }
-
-        for data_frame in new_dataframes.values():
-            data_frame.pos_y *= -1
-
-        return new_dataframes
-
     def set_player_positional_stats(self, player, center_of_mass, distances_with_time):
         y_position = pd.concat([distances_with_time['pos_y'].rename('car_y'),
                                 center_of_mass['pos_y'].rename('center_y'),
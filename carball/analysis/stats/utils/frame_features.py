@@ -0,0 +1,50 @@
+from typing import Any, Callable, Dict, Hashable
+
+import pandas as pd
+
+from carball.analysis.constants.basic_math import get_distance_from_displacements, get_position_displacements, \
+    get_speed_from_velocities
+
+
+class FrameFeatures:
+    """
+    Columns derived from the frames that several stats need, shared by all of the stats of an analysis.
+
+    Each column is computed the first time it is asked for and then reused, so the returned series must not be modified.
+    Objects are named as in the data frame: a player name or 'ball'.
+    """
+
+    def __init__(self, data_frame: pd.DataFrame):
+        """
+        :param data_frame: The frames the stats are calculated on.
+        """
+        self.data_frame = data_frame
+        self._columns: Dict[Hashable, Any] = {}
+
+    def get_speed(self, name: str) -> pd.Series:
+        """
+        :return: The magnitude of the velocity of the object.
+        """
+        return self._get(('speed', name), lambda: get_speed_from_velocities(self.data_frame[name]))
+
+    def get_ball_distance(self, name: str) -> pd.Series:
+        """
+        :return: The distance between the object and the ball.
+        """
+        return self._get(('ball_distance', name), lambda: get_distance_from_displacements(
+            get_position_displacements(self.data_frame[name], self.data_frame['ball'])))
+
+    def get_shared(self, key: Hashable, calculate: Callable[[], Any]) -> Any:
+        """
+        Shares a result derived from the frames between several instances of a stat,
+        e.g. one that calculates both player and game stats in a single pass.
+        :param key: Identifies the result, it should start with the name of the stat.
+        :param calculate: Called to calculate the result the first time it is asked for.
+        """
+        return self._get(key, calculate)
+
+    def _get(self, key: Hashable, calculate: Callable[[], Any]) -> Any:
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = calculate()
+        return column
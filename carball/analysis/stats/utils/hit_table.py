@@ -0,0 +1,69 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from carball.generated.api import game_pb2
+from carball.generated.api.player_pb2 import Player
+
+HIT_FLAGS = ['dribble', 'dribble_continuation', 'pass_', 'goal', 'shot', 'save', 'aerial', 'clear']
+
+
+class HitTable:
+    """
+    The hits of a game as arrays, one element per hit in the order of proto_game.game_stats.hits.
+
+    It is built once after the hits have been analysed, so the hit stats can work on all of the hits at once
+    instead of reading the protobuf fields of every hit.
+    """
+
+    def __init__(self, proto_game: game_pb2.Game, player_map: Dict[str, Player]):
+        """
+        :raises KeyError: if a hit is by a player that is not in player_map.
+        """
+        hits = proto_game.game_stats.hits
+        self.players: List[Player] = list(player_map.values())
+        player_indexes = {player_id: index for index, player_id in enumerate(player_map)}
+
+        self.frame_numbers = np.array([hit.frame_number for hit in hits], dtype=np.int64)
+        self.player_indexes = np.array([player_indexes[hit.player_id.id] for hit in hits], dtype=np.int64)
+        self.is_orange = np.array([player.is_orange for player in self.players], dtype=bool)[self.player_indexes]
+        self.ball_data = pd.DataFrame({
+            'pos_x': [hit.ball_data.pos_x for hit in hits],
+            'pos_y': [hit.ball_data.pos_y for hit in hits],
+            'pos_z': [hit.ball_data.pos_z for hit in hits],
+        }, dtype=np.float64)
+        self.has_next_hit = np.array([hit.HasField('next_hit_frame_number') for hit in hits], dtype=bool)
+        self.flags: Dict[str, np.ndarray] = {
+            flag: np.array([getattr(hit, flag) for hit in hits], dtype=bool) for flag in HIT_FLAGS
+        }
+
+    def __len__(self):
+        return len(self.frame_numbers)
+
+    def get_pair_indexes(self) -> np.ndarray:
+        """
+        :return: The index of each hit that is followed by another hit before the next goal.
+        """
+        return np.flatnonzero(self.has_next_hit[:-1])
+
+    def count_by_player(self, hit_indexes: np.ndarray) -> np.ndarray:
+        """
+        :return: The number of the hits that were by each player in self.players.
+        """
+        return np.bincount(self.player_indexes[hit_indexes], minlength=len(self.players))
+
+    def accumulate_by_player(self, initial_values: List[float], hit_indexes: np.ndarray,
+                             values: np.ndarray) -> np.ndarray:
+        """
+        Adds each value to the total of the player of its hit, one after the other in the order of the hits,
+        so the totals are rounded exactly as if they had been added up in a loop.
+        :param initial_values: The total of each player in self.players before the values are added.
+        :return: The new total of each player.
+        """
+        totals = np.array(initial_values, dtype=np.float64)
+        hit_players = self.player_indexes[hit_indexes]
+        for player_index in np.unique(hit_players):
+            player_values = values[hit_players == player_index]
+            totals[player_index] = np.add.accumulate(np.concatenate(([totals[player_index]], player_values)))[-1]
+        return totals
@@ -31,6 +31,6 @@ def sum_deltas_by_truthy_data(data_frame: pd.DataFrame, truthy_frames: pd.Series
     :param truthy_frames: Frames that have a truth value applied to them.
     :return: The time based on delta.
     """
-    truthy_frames = truthy_frames.rename('truthy')
-    combined_data = pd.concat([truthy_frames, data_frame['game', 'delta'].rename('delta')], axis=1)
-    return combined_data.loc[combined_data['truthy'] == True].sum().loc['delta']
\ No newline at end of file
+    deltas = data_frame['game', 'delta']
+    # the frames that are not in truthy_frames are not counted
+    return deltas[truthy_frames.reindex(deltas.index) == True].sum()
\ No newline at end of file
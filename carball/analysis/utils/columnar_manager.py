@@ -0,0 +1,238 @@
+"""
+A frame file format with one contiguous typed array per column, so single columns can be memory mapped.
+
+Layout (all numbers little endian):
+    8 bytes   MAGIC
+    uint32    version
+    uint32    length of the header
+    header    utf-8 json, mapping every column to the offset and dtype of its array
+    padding   up to a multiple of ALIGNMENT
+    arrays    each starting at a multiple of ALIGNMENT, offsets are relative to the end of the padding
+
+Object columns (bools and ints mixed with None/NaN, e.g. ('P0', 'jump_active')) are stored as a float64 array of
+the values, which is what np.memmap gives back, and an int8 array of the original python types,
+so reading the whole DataFrame gives back the same objects.
+Categorical columns (e.g. ('P0', 'power_up')) are stored as their codes with the categories in the header,
+nullable integer columns (e.g. ('P0', 'ping')) as float64 with NaN for the missing values.
+"""
+import json
+import struct
+from typing import BinaryIO, Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'CBFRAMES'
+VERSION = 2
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct('<8sII')
+
+# the python type of each value in an object column
+_FLOAT = 0
+_BOOL = 1
+_INT = 2
+_NONE = 3
+
+
+def write_columnar_to_file(file: BinaryIO, data_frame: pd.DataFrame):
+    """
+    Writes the DataFrame to the file in the columnar format.
+
+    :raises TypeError: if an object column contains anything other than bools, ints, floats and None.
+    """
+    arrays = []
+    offset = 0
+
+    def add_array(array: np.ndarray) -> int:
+        nonlocal offset
+        array_offset = offset
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        arrays.append((array_offset, array))
+        offset = _align(array_offset + array.nbytes)
+        return array_offset
+
+    index = data_frame.index.values
+    header = {
+        'num_rows': len(data_frame),
+        'index': {'name': data_frame.index.name, 'dtype': index.dtype.str, 'offset': add_array(index)},
+        'columns': [],
+    }
+    for column_number, name in enumerate(data_frame.columns):
+        series = data_frame.iloc[:, column_number]
+        values = series.values
+        column = {'name': list(name) if isinstance(name, tuple) else name}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            column['categories'] = values.categories.tolist()
+            values = values.codes
+        elif pd.api.types.is_extension_array_dtype(series.dtype):
+            column['extension_dtype'] = str(series.dtype)
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        elif values.dtype == object:
+            values, types = _split_object_column(values, name)
+            column['types_offset'] = add_array(types)
+        column['dtype'] = values.dtype.str
+        column['offset'] = add_array(values)
+        header['columns'].append(column)
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    prefix = _PREFIX.pack(MAGIC, VERSION, len(header_bytes))
+    header_length = len(prefix) + len(header_bytes)
+    file.write(prefix)
+    file.write(header_bytes)
+    file.write(b'\0' * (_align(header_length) - header_length))
+
+    written = 0
+    for array_offset, array in arrays:
+        file.write(b'\0' * (array_offset - written))
+        file.write(array.tobytes())
+        written = array_offset + array.nbytes
+
+
+class ColumnarFrames:
+    """
+    Reads a file written by write_columnar_to_file.
+
+    Given a path the arrays are memory mapped, so only the columns that are used are read from disk.
+    Given bytes or a file object the arrays are views of the bytes in memory.
+    """
+
+    def __init__(self, source: Union[str, bytes, BinaryIO]):
+        """
+        :param source: Path to the file, the contents of the file or a binary file object.
+        """
+        if isinstance(source, str):
+            self._path = source
+            self._buffer = None
+            with open(source, 'rb') as f:
+                prefix = f.read(_PREFIX.size)
+                magic, version, header_length = self._read_prefix(prefix)
+                header_bytes = f.read(header_length)
+        else:
+            self._path = None
+            self._buffer = source if isinstance(source, bytes) else source.read()
+            magic, version, header_length = self._read_prefix(self._buffer[:_PREFIX.size])
+            header_bytes = self._buffer[_PREFIX.size:_PREFIX.size + header_length]
+
+        header = json.loads(header_bytes.decode('utf-8'))
+        self._data_start = _align(_PREFIX.size + header_length)
+        self.num_rows = header['num_rows']
+        self._index = header['index']
+        self._columns: Dict[Union[Tuple, str], dict] = {
+            tuple(column['name']) if isinstance(column['name'], list) else column['name']: column
+            for column in header['columns']
+        }
+
+    @property
+    def columns(self) -> List[Union[Tuple, str]]:
+        return list(self._columns.keys())
+
+    def get_index(self) -> np.ndarray:
+        return self._get_array(self._index['offset'], self._index['dtype'])
+
+    def get_column(self, name: Union[Tuple, str]) -> np.ndarray:
+        """
+        :return: The array of the column, object and nullable integer columns are given as float64 with NaN for
+            None, categorical columns as their codes.
+        :raises KeyError: if there is no such column.
+        """
+        column = self._columns[name]
+        return self._get_array(column['offset'], column['dtype'])
+
+    def to_data_frame(self, columns: Iterable[Union[Tuple, str]] = None) -> pd.DataFrame:
+        """
+        :param columns: The columns to read, a string selects every column of that object (e.g. 'ball').
+            Defaults to all columns.
+        :return: The DataFrame, the same as the one that was written.
+        """
+        names = self.columns if columns is None else self._select_columns(columns)
+        data = []
+        for name in names:
+            column = self._columns[name]
+            values = self._get_array(column['offset'], column['dtype'])
+            if 'types_offset' in column:
+                values = _join_object_column(values, self._get_array(column['types_offset'], '|i1'))
+            elif 'categories' in column:
+                values = pd.Categorical.from_codes(values, column['categories'])
+            elif 'extension_dtype' in column:
+                values = pd.array(np.array(values), dtype=column['extension_dtype'])
+            data.append(values)
+
+        index = pd.Index(np.array(self.get_index()), name=self._index['name'])
+        if len(names) > 0 and all(isinstance(name, tuple) for name in names):
+            column_index = pd.MultiIndex.from_tuples(names)
+        else:
+            column_index = pd.Index(names)
+        data_frame = pd.DataFrame(dict(enumerate(data)), index=index)
+        data_frame.columns = column_index
+        return data_frame
+
+    def _select_columns(self, columns: Iterable[Union[Tuple, str]]) -> List[Union[Tuple, str]]:
+        names = []
+        for selection in columns:
+            if selection in self._columns:
+                names.append(selection)
+            else:
+                object_names = [name for name in self._columns if isinstance(name, tuple) and name[0] == selection]
+                if len(object_names) == 0:
+                    raise KeyError(selection)
+                names.extend(object_names)
+        return names
+
+    def _get_array(self, offset: int, dtype: str) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        if self.num_rows == 0:
+            return np.empty(0, dtype=dtype)
+        if self._path is not None:
+            return np.memmap(self._path, dtype=dtype, mode='r', offset=self._data_start + offset,
+                             shape=(self.num_rows,))
+        return np.frombuffer(self._buffer, dtype=dtype, count=self.num_rows, offset=self._data_start + offset)
+
+    @staticmethod
+    def _read_prefix(prefix: bytes):
+        if len(prefix) != _PREFIX.size or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a columnar frame file")
+        magic, version, header_length = _PREFIX.unpack(prefix)
+        if version > VERSION:
+            raise ValueError("Columnar frame file version %s is newer than the supported version %s" %
+                             (version, VERSION))
+        return magic, version, header_length
+
+
+def read_columnar_from_file(source: Union[str, bytes, BinaryIO],
+                            columns: Iterable[Union[Tuple, str]] = None) -> pd.DataFrame:
+    return ColumnarFrames(source).to_data_frame(columns)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _split_object_column(values: np.ndarray, name) -> Tuple[np.ndarray, np.ndarray]:
+    types = np.empty(len(values), dtype=np.int8)
+    floats = np.empty(len(values), dtype=np.float64)
+    for i, value in enumerate(values):
+        # bool is checked first as it is a subclass of int
+        if isinstance(value, (bool, np.bool_)):
+            types[i] = _BOOL
+        elif isinstance(value, (int, np.integer)):
+            types[i] = _INT
+        elif isinstance(value, (float, np.floating)):
+            types[i] = _FLOAT
+        elif value is None or value is pd.NA:
+            types[i] = _NONE
+            value = np.nan
+        else:
+            raise TypeError("Column %s contains %s which can not be stored in a columnar frame file" %
+                            (name, type(value).__name__))
+        floats[i] = value
+    return floats, types
+
+
+def _join_object_column(floats: np.ndarray, types: np.ndarray) -> np.ndarray:
+    values = np.array(floats, dtype=object)
+    for value_type, convert in ((_BOOL, bool), (_INT, int)):
+        positions = np.flatnonzero(types == value_type)
+        values[positions] = [convert(value) for value in floats[positions]]
+    values[types == _NONE] = None
+    return values
@@ -0,0 +1,214 @@
+"""
+Converts protobuf messages to json the same way as google.protobuf.json_format's printer.
+That means the json field names, enum names, int64 as strings and floats rounded to their shortest form.
+
+The converter of each field is created once per message type, instead of looking at the descriptor of every value.
+write_message_json writes to the file while it walks the message, so the whole message is never built as a dict.
+"""
+import base64
+import json
+import math
+from typing import Callable, Dict, IO, List, Optional
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.internal import type_checkers
+from google.protobuf.message import Message
+
+# the parts are written to the file once there are this many of them
+BUFFER_SIZE = 4096
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+# protobuf before 3.8 has no ToShortestFloat, its printer gives the float as it is stored
+_to_shortest_float = getattr(type_checkers, 'ToShortestFloat', float)
+
+_INFINITY = 'Infinity'
+_NEG_INFINITY = '-Infinity'
+_NAN = 'NaN'
+
+
+class _FieldConverter:
+    __slots__ = ('name', 'key', 'is_repeated', 'message_type', 'to_object', 'to_text')
+
+    def __init__(self, field: FieldDescriptor):
+        self.name = '[%s]' % field.full_name if field.is_extension else field.json_name
+        self.key = _encode_string(self.name)
+        self.is_repeated = field.label == FieldDescriptor.LABEL_REPEATED
+        self.message_type: Optional[Descriptor] = None
+        # converts a single (not repeated) value to the object json_format would give
+        self.to_object: Callable = None
+        # converts a single scalar value to its json text
+        self.to_text: Callable[[object], str] = None
+
+        if field.message_type is not None and field.message_type.GetOptions().map_entry:
+            raise ValueError("Map field %s is not supported" % field.full_name)
+        if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+            if field.message_type.full_name.startswith('google.protobuf.'):
+                raise ValueError("Well known type field %s is not supported" % field.full_name)
+            self.message_type = field.message_type
+            self.to_object = message_to_json_object
+        elif field.cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+            names = {value.number: value.name for value in field.enum_type.values}
+            texts = {number: _encode_string(name) for number, name in names.items()}
+            self.to_object = lambda value: names.get(value, value)
+            self.to_text = lambda value: texts[value] if value in texts else str(value)
+        elif field.type == FieldDescriptor.TYPE_BYTES:
+            self.to_object = lambda value: base64.b64encode(value).decode('utf-8')
+            self.to_text = lambda value: '"%s"' % base64.b64encode(value).decode('utf-8')
+        elif field.cpp_type == FieldDescriptor.CPPTYPE_STRING:
+            self.to_object = str
+            self.to_text = _encode_string
+        elif field.cpp_type == FieldDescriptor.CPPTYPE_BOOL:
+            self.to_object = bool
+            self.to_text = lambda value: 'true' if value else 'false'
+        elif field.cpp_type in (FieldDescriptor.CPPTYPE_INT64, FieldDescriptor.CPPTYPE_UINT64):
+            self.to_object = str
+            self.to_text = lambda value: '"%d"' % value
+        elif field.cpp_type == FieldDescriptor.CPPTYPE_FLOAT:
+            self.to_object = _float_to_object
+            self.to_text = _float_to_text
+        elif field.cpp_type == FieldDescriptor.CPPTYPE_DOUBLE:
+            self.to_object = _double_to_object
+            self.to_text = _double_to_text
+        else:
+            self.to_object = int
+            self.to_text = int.__repr__
+
+
+_converters: Dict[Descriptor, Dict[FieldDescriptor, _FieldConverter]] = {}
+
+
+def _get_converters(message_type: Descriptor) -> Dict[FieldDescriptor, _FieldConverter]:
+    converters = _converters.get(message_type)
+    if converters is None:
+        converters = {field: _FieldConverter(field) for field in message_type.fields}
+        _converters[message_type] = converters
+    return converters
+
+
+def _get_converter(converters: Dict[FieldDescriptor, _FieldConverter], field: FieldDescriptor) -> _FieldConverter:
+    converter = converters.get(field)
+    if converter is None:
+        # extensions are not in the fields of the message type
+        converter = _FieldConverter(field)
+        converters[field] = converter
+    return converter
+
+
+def _double_to_object(value: float):
+    if math.isinf(value):
+        return _NEG_INFINITY if value < 0.0 else _INFINITY
+    if math.isnan(value):
+        return _NAN
+    return value
+
+
+def _float_to_object(value: float):
+    value = _double_to_object(value)
+    if isinstance(value, str):
+        return value
+    return _to_shortest_float(value)
+
+
+def _double_to_text(value: float) -> str:
+    if math.isinf(value) or math.isnan(value):
+        return _encode_string(_double_to_object(value))
+    return float.__repr__(value)
+
+
+def _float_to_text(value: float) -> str:
+    if math.isinf(value) or math.isnan(value):
+        return _encode_string(_double_to_object(value))
+    return float.__repr__(_to_shortest_float(value))
+
+
+def message_to_json_object(message: Message) -> dict:
+    """
+    :return: The same dict as google.protobuf.json_format.MessageToDict(message).
+    """
+    converters = _get_converters(message.DESCRIPTOR)
+    js = {}
+    for field, value in message.ListFields():
+        converter = _get_converter(converters, field)
+        if converter.is_repeated:
+            js[converter.name] = [converter.to_object(item) for item in value]
+        else:
+            js[converter.name] = converter.to_object(value)
+    return js
+
+
+class _JsonWriter:
+
+    def __init__(self, file: IO, indent: Optional[int]):
+        self.file = file
+        self.indent = indent
+        self.key_separator = ':' if indent is None else ': '
+        self.parts: List[str] = []
+        self._newlines: List[str] = []
+
+    def newline(self, level: int) -> str:
+        if self.indent is None:
+            return ''
+        while len(self._newlines) <= level:
+            self._newlines.append('\n' + ' ' * (self.indent * len(self._newlines)))
+        return self._newlines[level]
+
+    def write_message(self, message: Message, level: int):
+        fields = message.ListFields()
+        if len(fields) == 0:
+            self.parts.append('{}')
+            return
+        parts = self.parts
+        converters = _get_converters(message.DESCRIPTOR)
+        field_newline = self.newline(level + 1)
+        key_separator = self.key_separator
+        separator = '{'
+        for field, value in fields:
+            converter = converters.get(field)
+            if converter is None:
+                converter = _get_converter(converters, field)
+            parts.append(separator + field_newline + converter.key + key_separator)
+            if converter.is_repeated:
+                self.write_repeated(converter, value, level + 1)
+            elif converter.message_type is not None:
+                self.write_message(value, level + 1)
+            else:
+                parts.append(converter.to_text(value))
+            separator = ','
+        parts.append(self.newline(level))
+        parts.append('}')
+        if len(parts) > BUFFER_SIZE:
+            self.flush()
+
+    def write_repeated(self, converter: _FieldConverter, values, level: int):
+        parts = self.parts
+        item_newline = self.newline(level + 1)
+        separator = '['
+        for value in values:
+            parts.append(separator + item_newline)
+            if converter.message_type is not None:
+                self.write_message(value, level + 1)
+            else:
+                parts.append(converter.to_text(value))
+            separator = ','
+        if separator == '[':
+            parts.append('[]')
+            return
+        parts.append(self.newline(level))
+        parts.append(']')
+
+    def flush(self):
+        self.file.write(''.join(self.parts))
+        self.parts.clear()
+
+
+def write_message_json(file: IO, message: Message, indent: Optional[int] = 2):
+    """
+    Writes the message to the text file as json.
+    With the default indent the text is the same as json.dump(MessageToDict(message), file, indent=2).
+
+    :param indent: The number of spaces each level is indented by, None writes it on a single line without spaces.
+    """
+    writer = _JsonWriter(file, indent)
+    writer.write_message(message, 0)
+    writer.flush()
@@ -5,6 +5,7 @@ import pandas as pd
 import numpy as np
 
 from carball.analysis.constants.basic_math import positional_columns
+from carball.analysis.utils.columnar_manager import write_columnar_to_file, read_columnar_from_file
 from carball.analysis.utils.numpy_manager import write_array_to_file, read_array_from_file
 
 
@@ -46,6 +47,18 @@ class PandasManager:
         dataframe.columns = pd.MultiIndex.from_tuples(columns)
         return dataframe
 
+    @staticmethod
+    def write_columnar_to_file(file, df):
+        write_columnar_to_file(file, df)
+
+    @staticmethod
+    def read_columnar_from_file(source, columns=None):
+        """
+        :param source: Path to the file (the columns are memory mapped), its contents or a binary file object.
+        :param columns: Only read these columns, a string selects every column of that object (e.g. 'ball').
+        """
+        return read_columnar_from_file(source, columns)
+
     @staticmethod
     def write_pandas_to_buffer_for_tooling(df, players):
         columns = []
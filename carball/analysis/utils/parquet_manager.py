@@ -0,0 +1,173 @@
+"""
+Writes the frames and the events of an analysis as parquet files, so queries over many replays only read the columns
+they use. Needs pyarrow (pip install carball[parquet]).
+
+Every table is written to its own file in the directory:
+    frames.parquet       one row per frame, the column ('P0', 'pos_x') is named 'P0.pos_x', the frame number is 'frame'
+    <event>.parquet      one row per message of each field in EVENT_TABLES (e.g. hits.parquet)
+Partitioned by replay the files are written to <table>/replay_id=<id>/<id>.parquet instead,
+so the replays of a directory can be read as a single dataset with a replay_id column.
+
+The event columns are typed from the fields of the messages. Nested messages are flattened to one column per field
+(e.g. 'ball_data.pos_x'), enums are stored as their names and fields that are not set are null.
+"""
+import os
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import Message
+
+from carball.generated.api import game_pb2
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+FRAMES_TABLE = 'frames'
+FRAME_COLUMN = 'frame'
+# the repeated events of game_stats that get a table each
+EVENT_TABLES = ['hits', 'bumps', 'kickoffs', 'kickoff_stats', 'ball_carries', 'rumble_items', 'fifty_fifties']
+
+
+def write_parquet_to_directory(directory: str, proto_game: game_pb2.Game, data_frame: pd.DataFrame = None,
+                               partition_by_replay: bool = False):
+    """
+    Writes the frames (if given) and every table of EVENT_TABLES to the directory.
+
+    :param partition_by_replay: Write the tables to a partition named by the id of the replay.
+    :raises ImportError: if pyarrow is not installed.
+    """
+    _check_pyarrow()
+    tables = {name: get_event_table(proto_game, name) for name in EVENT_TABLES}
+    if data_frame is not None:
+        tables[FRAMES_TABLE] = get_frames_table(data_frame)
+
+    replay_id = proto_game.game_metadata.id
+    for name, table in tables.items():
+        if partition_by_replay:
+            path = os.path.join(directory, name, 'replay_id=%s' % replay_id, replay_id + '.parquet')
+        else:
+            path = os.path.join(directory, name + '.parquet')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(table, path)
+
+
+def get_frames_table(data_frame: pd.DataFrame) -> 'pa.Table':
+    """
+    :return: The frames as a table with a column per column of the DataFrame, see the module docstring.
+    """
+    _check_pyarrow()
+    columns = {FRAME_COLUMN: data_frame.index.values}
+    for column_number, name in enumerate(data_frame.columns):
+        series = data_frame.iloc[:, column_number]
+        if series.dtype == np.float16:
+            # parquet has no half precision floats
+            series = series.astype(np.float32)
+        elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) != 'string':
+            # bools and ints mixed with None, strings (e.g. the power up names) are kept
+            series = series.astype(np.float64)
+        columns['.'.join(name) if isinstance(name, tuple) else name] = series.values
+    return pa.Table.from_pandas(pd.DataFrame(columns), preserve_index=False)
+
+
+def read_frames_from_parquet(source, columns: Iterable[Union[Tuple, str]] = None) -> pd.DataFrame:
+    """
+    Reads the frames written by write_parquet_to_directory back to a DataFrame like the one of the analysis.
+
+    :param source: Path to frames.parquet (or a file object).
+    :param columns: Only read these columns, a string selects every column of that object (e.g. 'ball').
+    """
+    _check_pyarrow()
+    names = None
+    if columns is not None:
+        all_names = pq.read_schema(source).names
+        names = [FRAME_COLUMN]
+        for column in columns:
+            if isinstance(column, tuple):
+                names.append('.'.join(column))
+            else:
+                names += [name for name in all_names if name.rsplit('.', 1)[0] == column]
+    data_frame = pq.read_table(source, columns=names).to_pandas()
+    data_frame = data_frame.set_index(FRAME_COLUMN)
+    data_frame.index.name = None
+    data_frame.columns = pd.MultiIndex.from_tuples([tuple(name.rsplit('.', 1)) for name in data_frame.columns])
+    return data_frame
+
+
+def get_event_table(proto_game: game_pb2.Game, name: str) -> 'pa.Table':
+    """
+    :param name: The name of a repeated field of game_stats, e.g. 'hits'.
+    :return: A row per message of the field, see the module docstring.
+    """
+    _check_pyarrow()
+    field = proto_game.game_stats.DESCRIPTOR.fields_by_name[name]
+    arrow_fields = _get_arrow_fields(field.message_type)
+    rows = pa.array([_message_to_row(message) for message in getattr(proto_game.game_stats, name)],
+                    type=pa.struct(arrow_fields))
+    table = pa.Table.from_arrays(rows.flatten(), schema=pa.schema(arrow_fields))
+    while any(pa.types.is_struct(column_type) for column_type in table.schema.types):
+        table = table.flatten()
+    return table
+
+
+def _get_arrow_fields(message_type: Descriptor) -> List['pa.Field']:
+    return [pa.field(field.name, _get_arrow_type(field)) for field in message_type.fields]
+
+
+def _get_arrow_type(field: FieldDescriptor) -> 'pa.DataType':
+    if field.type == FieldDescriptor.TYPE_MESSAGE:
+        arrow_type = pa.struct(_get_arrow_fields(field.message_type))
+    elif field.type == FieldDescriptor.TYPE_ENUM:
+        arrow_type = pa.string()
+    else:
+        arrow_type = _ARROW_TYPES[field.type]()
+    if field.label == FieldDescriptor.LABEL_REPEATED:
+        return pa.list_(arrow_type)
+    return arrow_type
+
+
+_ARROW_TYPES = {
+    FieldDescriptor.TYPE_DOUBLE: lambda: pa.float64(),
+    FieldDescriptor.TYPE_FLOAT: lambda: pa.float32(),
+    FieldDescriptor.TYPE_INT64: lambda: pa.int64(),
+    FieldDescriptor.TYPE_SINT64: lambda: pa.int64(),
+    FieldDescriptor.TYPE_SFIXED64: lambda: pa.int64(),
+    FieldDescriptor.TYPE_UINT64: lambda: pa.uint64(),
+    FieldDescriptor.TYPE_FIXED64: lambda: pa.uint64(),
+    FieldDescriptor.TYPE_INT32: lambda: pa.int32(),
+    FieldDescriptor.TYPE_SINT32: lambda: pa.int32(),
+    FieldDescriptor.TYPE_SFIXED32: lambda: pa.int32(),
+    FieldDescriptor.TYPE_UINT32: lambda: pa.uint32(),
+    FieldDescriptor.TYPE_FIXED32: lambda: pa.uint32(),
+    FieldDescriptor.TYPE_BOOL: lambda: pa.bool_(),
+    FieldDescriptor.TYPE_STRING: lambda: pa.string(),
+    FieldDescriptor.TYPE_BYTES: lambda: pa.binary(),
+}
+
+
+def _message_to_row(message: Message) -> Dict:
+    row = {}
+    for field, value in message.ListFields():
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            row[field.name] = [_value_to_arrow(field, item) for item in value]
+        else:
+            row[field.name] = _value_to_arrow(field, value)
+    return row
+
+
+def _value_to_arrow(field: FieldDescriptor, value):
+    if field.type == FieldDescriptor.TYPE_MESSAGE:
+        return _message_to_row(value)
+    if field.type == FieldDescriptor.TYPE_ENUM:
+        return field.enum_type.values_by_number[value].name
+    return value
+
+
+def _check_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is needed for the parquet export, install it with pip install carball[parquet]")
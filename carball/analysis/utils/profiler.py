@@ -0,0 +1,142 @@
+import json
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional
+
+from typing.io import IO
+
+logger = logging.getLogger(__name__)
+
+
+class StageProfile(NamedTuple):
+    """
+    The time spent in a single stage of the analysis.
+
+    name is the path of the stage, nested stages are joined with '/' (e.g. 'stats/BoostStat').
+    A stage that runs more than once (e.g. a hit stat, which runs once per hit) is summed up over its calls.
+    peak_memory is the largest number of bytes allocated during any call, it is None unless memory is traced.
+    """
+    name: str
+    calls: int
+    wall_time_ms: float
+    cpu_time_ms: float
+    peak_memory: Optional[int] = None
+
+
+class AnalysisProfiler:
+    """
+    Records the wall time, cpu time and optionally the peak memory allocation of each stage of the analysis.
+
+    Timing a stage only reads two clocks, so it is cheap enough to always be on.
+    Tracing memory uses tracemalloc, which slows the analysis down a lot.
+    Before python 3.9 tracemalloc can not reset its peak, so the peak of a stage is only exact when it is the highest
+    peak of the analysis so far. The peak of a stage that stays below an earlier peak is taken as the larger of
+    the memory allocated at its start and at its end.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        :param trace_memory: Also record the peak memory allocated by each stage.
+        """
+        self.trace_memory = trace_memory
+        self._stages: Dict[str, List] = {}
+        self._stack: List[str] = []
+        # the peak memory seen by each open stage while its nested stages ran
+        self._peaks: List[int] = []
+        # the memory and the peak of tracemalloc at the last reset of the peak, when it can not be reset
+        self._reset_memory = 0
+        self._reset_peak_memory = -1
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Records the time spent inside the with block as a stage, stages may be nested.
+        """
+        if len(self._stack) > 0:
+            name = self._stack[-1] + '/' + name
+        self._stack.append(name)
+        # reserve the stage now, so stages are reported in the order they started
+        self._stages.setdefault(name, [0, 0.0, 0.0, None])
+
+        started_tracing = False
+        start_memory = None
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+                self._reset_peak_memory = -1
+            start_memory = tracemalloc.get_traced_memory()[0]
+            self._update_peak(self._reset_peak())
+            self._peaks.append(start_memory)
+
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = (time.perf_counter() - start_wall_time) * 1000
+            cpu_time = (time.process_time() - start_cpu_time) * 1000
+
+            peak_memory = None
+            if self.trace_memory:
+                peak = max(self._peaks.pop(), self._reset_peak())
+                peak_memory = peak - start_memory
+                self._update_peak(peak)
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self._stack.pop()
+            self._add(name, wall_time, cpu_time, peak_memory)
+            logger.debug("Time taken for %s is %s milliseconds", name, wall_time)
+
+    def record(self, name: str, wall_time_ms: float, cpu_time_ms: float):
+        """
+        Records a stage that was timed elsewhere (e.g. on another thread) as nested in the current stage.
+        """
+        if len(self._stack) > 0:
+            name = self._stack[-1] + '/' + name
+        self._stages.setdefault(name, [0, 0.0, 0.0, None])
+        self._add(name, wall_time_ms, cpu_time_ms, None)
+
+    def get_report(self) -> List[StageProfile]:
+        """
+        :return: The stages in the order they were first started.
+        """
+        return [StageProfile(name, *values) for name, values in self._stages.items()]
+
+    def get_json_data(self) -> List[dict]:
+        return [stage._asdict() for stage in self.get_report()]
+
+    def write_json_out_to_file(self, file: IO):
+        json.dump(self.get_json_data(), file, indent=2)
+
+    def _add(self, name: str, wall_time: float, cpu_time: float, peak_memory: Optional[int]):
+        values = self._stages[name]
+        values[0] += 1
+        values[1] += wall_time
+        values[2] += cpu_time
+        if peak_memory is not None:
+            values[3] = peak_memory if values[3] is None else max(values[3], peak_memory)
+
+    def _update_peak(self, peak: int):
+        if len(self._peaks) > 0:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+
+    def _reset_peak(self) -> int:
+        """
+        :return: The peak memory since the last reset, the peak is reset to the memory currently allocated.
+        """
+        memory, peak = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+            return peak
+
+        # the peak of tracemalloc only went up since the last reset if it happened after the reset
+        reset_peak_memory = peak
+        if peak <= self._reset_peak_memory:
+            peak = max(self._reset_memory, memory)
+        self._reset_memory = memory
+        self._reset_peak_memory = reset_peak_memory
+        return peak
@@ -1,3 +1,8 @@
+import math
+
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message
+
 from carball.generated.api import game_pb2
 
 
@@ -12,3 +17,86 @@ class ProtobufManager:
         proto_game = game_pb2.Game()
         proto_game.ParseFromString(file.read())
         return proto_game
+
+    @staticmethod
+    def apply_changes(target: Message, before: Message, after: Message):
+        """
+        Applies every change that turned before into after onto target.
+
+        Fields that did not change are left alone, so the changes made to several copies of the same message
+        can be combined, as long as the copies changed different fields.
+        The messages of a repeated field that kept its length are changed one by one,
+        other repeated fields that changed are replaced as a whole.
+
+        :param target: The message that is changed.
+        :param before: A copy of the message before the changes were made.
+        :param after: The copy the changes were made to.
+        """
+        for field in after.DESCRIPTOR.fields:
+            name = field.name
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                after_values = getattr(after, name)
+                before_values = getattr(before, name)
+                target_values = getattr(target, name)
+                if field.type == FieldDescriptor.TYPE_MESSAGE and \
+                        len(after_values) == len(before_values) == len(target_values):
+                    for target_value, before_value, after_value in zip(target_values, before_values, after_values):
+                        ProtobufManager.apply_changes(target_value, before_value, after_value)
+                elif not _is_same_list(after_values, before_values):
+                    del target_values[:]
+                    if field.type == FieldDescriptor.TYPE_MESSAGE:
+                        for value in after_values:
+                            target_values.add().CopyFrom(value)
+                    else:
+                        target_values.extend(after_values)
+                continue
+
+            if not after.HasField(name):
+                if before.HasField(name):
+                    target.ClearField(name)
+                continue
+
+            if field.type == FieldDescriptor.TYPE_MESSAGE:
+                target_value = getattr(target, name)
+                if not before.HasField(name):
+                    target_value.SetInParent()
+                ProtobufManager.apply_changes(target_value, getattr(before, name), getattr(after, name))
+            elif not before.HasField(name) or not _is_same(getattr(after, name), getattr(before, name)):
+                setattr(target, name, getattr(after, name))
+
+    @staticmethod
+    def add_values(target: Message, values: Message):
+        """
+        Adds every number that is set in values to the same field of target, the messages in values are added
+        field by field. Fields that are not set in values are left alone.
+        Repeated fields are not supported.
+
+        :param target: The message that is changed.
+        :param values: The message holding the numbers to add.
+        """
+        for field, value in values.ListFields():
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                raise ValueError("Can not add the values of repeated field " + field.full_name)
+            if field.type == FieldDescriptor.TYPE_MESSAGE:
+                target_value = getattr(target, field.name)
+                target_value.SetInParent()
+                ProtobufManager.add_values(target_value, value)
+            else:
+                setattr(target, field.name, getattr(target, field.name) + value)
+
+
+def _is_same(value, other_value) -> bool:
+    # 0.0 == -0.0 but they are serialized differently, nan is never the same so it is always copied
+    if isinstance(value, float):
+        return value == other_value and math.copysign(1.0, value) == math.copysign(1.0, other_value)
+    return value == other_value
+
+
+def _is_same_list(values, other_values) -> bool:
+    if len(values) != len(other_values):
+        return False
+    if len(values) == 0 or not isinstance(values[0], Message):
+        return all(_is_same(value, other_value) for value, other_value in zip(values, other_values))
+    # messages holding nan are never equal, so they are compared serialized
+    return values == other_values or all(value.SerializeToString() == other_value.SerializeToString()
+                                         for value, other_value in zip(values, other_values))
@@ -0,0 +1,221 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import pandas as pd
+
+from carball.analysis.analysis_manager import BaseAnalysisManager, PROTOBUF_VERSION
+from carball.analysis.utils.pandas_manager import PandasManager
+from carball.analysis.utils.profiler import AnalysisProfiler
+from carball.generated.api import game_pb2
+
+logger = logging.getLogger(__name__)
+
+PROTO_EXTENSION = '.pts'
+FRAMES_EXTENSION = '.frames'
+
+DEFAULT_MAX_SIZE = 1024 ** 3
+
+
+def get_carball_version() -> str:
+    """
+    :return: The carball version, read from CARBALL_VERSION in a source checkout, else from the installed package.
+    """
+    version_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'CARBALL_VERSION')
+    if os.path.isfile(version_path):
+        with open(version_path, 'r') as f:
+            return str(json.loads(f.read()))
+    try:
+        import pkg_resources
+        return pkg_resources.get_distribution('carball').version
+    except Exception:
+        logger.warning("Could not find the carball version, cached analyses will not be invalidated on upgrade")
+        return 'unknown'
+
+
+class AnalysisCache:
+    """
+    Content addressed on-disk cache of finished analyses.
+
+    Entries are keyed on the replay bytes, the protobuf and carball versions and the analysis options,
+    so an entry is never reused by a different version of carball or with different options.
+    Each entry stores the serialized game_pb2.Game and the serialized frames.
+    Once the cache grows past max_size bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        :param directory: Where the entries are stored, it is created if it does not exist.
+        :param max_size: Maximum total size of the entries in bytes.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self._version = None
+        os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, replay_bytes: bytes, calculate_intensive_events: bool = False, clean: bool = True,
+                full_precision: bool = False) -> str:
+        """
+        :return: The key of the analysis of this replay with these options.
+        """
+        if self._version is None:
+            self._version = '%s.%s' % (PROTOBUF_VERSION, get_carball_version())
+        options = json.dumps({
+            'version': self._version,
+            'calculate_intensive_events': calculate_intensive_events,
+            'clean': clean,
+            'full_precision': full_precision,
+        }, sort_keys=True)
+        key = hashlib.sha256(replay_bytes)
+        key.update(options.encode('utf-8'))
+        return key.hexdigest()
+
+    def load(self, key: str, profiler: AnalysisProfiler = None) -> Optional['CachedAnalysisManager']:
+        """
+        :param profiler: Becomes the profiler of the cached analysis.
+        :return: The cached analysis, or None if there is no entry for this key.
+        """
+        proto_path = self._get_path(key, PROTO_EXTENSION)
+        try:
+            with open(proto_path, 'rb') as f:
+                proto_bytes = f.read()
+        except FileNotFoundError:
+            return None
+
+        df_bytes = None
+        frames_path = self._get_path(key, FRAMES_EXTENSION)
+        try:
+            with open(frames_path, 'rb') as f:
+                df_bytes = f.read()
+        except FileNotFoundError:
+            pass
+
+        protobuf_game = game_pb2.Game()
+        try:
+            protobuf_game.ParseFromString(proto_bytes)
+        except Exception:
+            logger.warning("Discarding corrupt cache entry %s", key)
+            self._remove(key)
+            return None
+
+        # the modification time is used as the last access time for eviction
+        # another process may evict the entry at any time, so files can disappear
+        for path in (proto_path, frames_path):
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        logger.debug("Loaded analysis %s from the cache", key)
+        return CachedAnalysisManager(protobuf_game, df_bytes, profiler)
+
+    def store(self, key: str, analysis_manager: BaseAnalysisManager):
+        """
+        Stores the analysis, then evicts the least recently used entries if the cache is too big.
+        """
+        # the frames are written first, an entry only exists once its proto has been written
+        if analysis_manager.df_bytes is not None:
+            self._write(self._get_path(key, FRAMES_EXTENSION), analysis_manager.df_bytes)
+        else:
+            try:
+                os.remove(self._get_path(key, FRAMES_EXTENSION))
+            except FileNotFoundError:
+                pass
+        self._write(self._get_path(key, PROTO_EXTENSION), analysis_manager.get_protobuf_data().SerializeToString())
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache is no bigger than max_size.
+        """
+        entries = {}
+        total_size = 0
+        with os.scandir(self.directory) as files:
+            for file in files:
+                key, extension = os.path.splitext(file.name)
+                if extension not in (PROTO_EXTENSION, FRAMES_EXTENSION) or not file.is_file():
+                    continue
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    # removed since the directory was listed
+                    continue
+                last_used, size = entries.get(key, (0, 0))
+                entries[key] = (max(last_used, stat.st_mtime), size + stat.st_size)
+                total_size += stat.st_size
+
+        for key in sorted(entries, key=lambda key: entries[key][0]):
+            if total_size <= self.max_size:
+                break
+            logger.debug("Evicting analysis %s from the cache", key)
+            self._remove(key)
+            total_size -= entries[key][1]
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        with os.scandir(self.directory) as files:
+            keys = {os.path.splitext(file.name)[0] for file in files
+                    if os.path.splitext(file.name)[1] in (PROTO_EXTENSION, FRAMES_EXTENSION)}
+        for key in keys:
+            self._remove(key)
+
+    def _get_path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+
+    def _write(self, path: str, data: bytes):
+        # write to a temporary file then rename it, so other processes never read a partly written entry
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def _remove(self, key: str):
+        # the proto goes first so a half removed entry is never loaded
+        for extension in (PROTO_EXTENSION, FRAMES_EXTENSION):
+            try:
+                os.remove(self._get_path(key, extension))
+            except FileNotFoundError:
+                pass
+
+
+class CachedAnalysisManager(BaseAnalysisManager):
+    """
+    An analysis loaded from an AnalysisCache.
+
+    It has the same read and write methods as the AnalysisManager it was created from,
+    but no Game and no create_analysis as the replay was never parsed.
+    The DataFrame is only deserialized when it is asked for.
+    """
+
+    def __init__(self, protobuf_game: game_pb2.Game, df_bytes: Optional[bytes], profiler: AnalysisProfiler = None):
+        super().__init__(protobuf_game, profiler)
+        self._df_bytes = df_bytes
+        self._data_frame = None
+
+    def get_data_frame(self) -> Optional[pd.DataFrame]:
+        if self._data_frame is None and self.df_bytes is not None:
+            self._data_frame = PandasManager.read_numpy_from_memory(io.BytesIO(self.df_bytes))
+            # match the DataFrame of the analysis that was stored
+            self._data_frame.index.name = None
+        return self._data_frame
+
+    @property
+    def data_frame(self) -> Optional[pd.DataFrame]:
+        return self.get_data_frame()
+
+    @data_frame.setter
+    def data_frame(self, data_frame: Optional[pd.DataFrame]):
+        self._data_frame = data_frame
+
+    @property
+    def df_bytes(self) -> Optional[bytes]:
+        return self._df_bytes
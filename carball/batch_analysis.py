@@ -0,0 +1,195 @@
+import glob
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from multiprocessing.connection import wait
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from carball.decompile_replays import analyze_replay_file
+
+logger = logging.getLogger(__name__)
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of analysing a single replay as part of a batch.
+
+    Exactly one of proto_bytes and error is set.
+    proto_bytes is the serialized game_pb2.Game, data_frame_bytes is only set if the frames were requested.
+    """
+    replay_path: str
+    proto_bytes: Optional[bytes] = None
+    data_frame_bytes: Optional[bytes] = None
+    error: Optional[str] = None
+
+
+def analyze_replay_directory(directory: str, pattern: str = '*.replay', recursive: bool = False,
+                             **kwargs) -> Iterator[BatchResult]:
+    """
+    Analyzes every replay in a directory over a pool of worker processes.
+
+    :param directory: The directory containing the replays.
+    :param pattern: Glob pattern that replay file names must match.
+    :param recursive: If True, sub directories are searched as well.
+    :param kwargs: Passed through to analyze_replay_files.
+    :return: An iterator of BatchResult, in order of completion.
+    """
+    if recursive:
+        replay_glob = os.path.join(directory, '**', pattern)
+    else:
+        replay_glob = os.path.join(directory, pattern)
+    replay_paths = sorted(glob.iglob(replay_glob, recursive=recursive))
+    return analyze_replay_files(replay_paths, **kwargs)
+
+
+def analyze_replay_files(replay_paths: Iterable[str], max_workers: int = None, timeout: float = None,
+                         include_data_frame: bool = False, **analysis_kwargs) -> Iterator[BatchResult]:
+    """
+    Analyzes many replays over a pool of worker processes and streams back the results as they complete.
+
+    Each worker handles one replay at a time, so at most max_workers replays are in flight and replay_paths is
+    consumed lazily. A worker that crashes or runs past the timeout is killed and replaced,
+    the replay it was working on is reported as an error and the rest of the batch carries on.
+
+    :param replay_paths: Paths to the replay files, may be a lazy iterable.
+    :param max_workers: Number of worker processes, defaults to the number of cpus.
+    :param timeout: Maximum number of seconds a single replay may take, None for no limit.
+    :param include_data_frame: If True, the serialized frames are sent back alongside the protobuf.
+    :param analysis_kwargs: Passed through to analyze_replay_file (e.g. calculate_intensive_events, clean).
+    :return: An iterator of BatchResult, in order of completion.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    replay_paths = iter(replay_paths)
+    context = multiprocessing.get_context()
+    workers = []
+    has_more_replays = True
+
+    try:
+        while True:
+            # hand out new replays to idle workers, starting workers lazily
+            while has_more_replays:
+                worker = next((worker for worker in workers if worker.replay_path is None), None)
+                if worker is None:
+                    if len(workers) >= max_workers:
+                        break
+                    worker = _Worker(context, analysis_kwargs, include_data_frame)
+                    workers.append(worker)
+                replay_path = next(replay_paths, None)
+                if replay_path is None:
+                    has_more_replays = False
+                    break
+                worker.submit(replay_path, timeout)
+
+            busy_workers = [worker for worker in workers if worker.replay_path is not None]
+            if len(busy_workers) == 0:
+                break
+
+            wait_time = None
+            if timeout is not None:
+                wait_time = max(0.0, min(worker.deadline for worker in busy_workers) - time.monotonic())
+            ready_connections = wait([worker.connection for worker in busy_workers], timeout=wait_time)
+
+            for worker in busy_workers:
+                replay_path = worker.replay_path
+                if worker.connection in ready_connections:
+                    try:
+                        proto_bytes, data_frame_bytes, error = worker.receive()
+                    except (EOFError, OSError):
+                        exit_code = worker.restart()
+                        logger.error("Worker crashed while analysing %s (exit code %s)", replay_path, exit_code)
+                        yield BatchResult(replay_path, error='Worker crashed with exit code %s' % exit_code)
+                        continue
+                    yield BatchResult(replay_path, proto_bytes, data_frame_bytes, error)
+                elif worker.deadline is not None and time.monotonic() >= worker.deadline:
+                    worker.restart()
+                    logger.error("Timed out analysing %s after %s seconds", replay_path, timeout)
+                    yield BatchResult(replay_path, error='Timed out after %s seconds' % timeout)
+    finally:
+        for worker in workers:
+            worker.close()
+
+
+class _Worker:
+    """
+    A single worker process and the pipe used to talk to it.
+    """
+
+    def __init__(self, context, analysis_kwargs: dict, include_data_frame: bool):
+        self.context = context
+        self.analysis_kwargs = analysis_kwargs
+        self.include_data_frame = include_data_frame
+        self.replay_path = None
+        self.deadline = None
+        self._start()
+
+    def _start(self):
+        self.connection, child_connection = self.context.Pipe()
+        self.process = self.context.Process(target=_worker_loop,
+                                            args=(child_connection, self.analysis_kwargs, self.include_data_frame),
+                                            daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def submit(self, replay_path: str, timeout: Optional[float]):
+        self.replay_path = replay_path
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.connection.send(replay_path)
+
+    def receive(self):
+        result = self.connection.recv()
+        self.replay_path = None
+        self.deadline = None
+        return result
+
+    def restart(self) -> Optional[int]:
+        """
+        Kills the process and starts a fresh one in its place.
+
+        :return: The exit code of the killed process.
+        """
+        exit_code = self._kill()
+        self.replay_path = None
+        self.deadline = None
+        self._start()
+        return exit_code
+
+    def close(self):
+        if self.replay_path is None and self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.process.join(1)
+        self._kill()
+
+    def _kill(self) -> Optional[int]:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+        return self.process.exitcode
+
+
+def _worker_loop(connection, analysis_kwargs: dict, include_data_frame: bool):
+    while True:
+        try:
+            replay_path = connection.recv()
+        except EOFError:
+            return
+        if replay_path is None:
+            return
+
+        try:
+            analysis_manager = analyze_replay_file(replay_path, **analysis_kwargs)
+            proto_bytes = analysis_manager.get_protobuf_data().SerializeToString()
+            data_frame_bytes = analysis_manager.df_bytes if include_data_frame else None
+            result = (proto_bytes, data_frame_bytes, None)
+        except Exception:
+            result = (None, None, traceback.format_exc())
+        connection.send(result)
@@ -1,21 +1,58 @@
 import argparse
+import io
+import os
+
 import carball
 import logging
 import gzip
 
+from carball.analysis.utils.json_writer import write_message_json
+from carball.analysis.utils.pandas_manager import PandasManager
+from carball.analysis.utils.parquet_manager import write_parquet_to_directory
+from carball.generated.api import game_pb2
+
 
 def main(program_args=None):
     parser = argparse.ArgumentParser(description='Rocket League replay parsing and analysis.')
     parser.add_argument('-i', '--input', type=str, required=True,
                         help='Path to replay file that will be analyzed. Carball expects a raw replay file unless '
-                             '--skip-decompile is provided.')
+                             '--skip-decompile is provided. If this is a directory every replay in it is analyzed '
+                             'and --proto, --json and --gzip name output directories instead of files.')
     parser.add_argument('--proto', type=str, required=False,
                         help='The result of the analysis will be saved to this file in protocol buffers format.')
     parser.add_argument('--json', type=str, required=False,
                         help='The result of the analysis will be saved to this file in json file format.')
+    parser.add_argument('--compact-json', action='store_true', default=False,
+                        help='Write the --json output on a single line without indentation.')
     parser.add_argument('--gzip', type=str, required=False,
                         help='The pandas data frame containing the replay frames will be saved to this file in a '
                              'compressed gzip format.')
+    parser.add_argument('--columnar', action='store_true', default=False,
+                        help='Save the --gzip output uncompressed in the columnar frame format, so single columns '
+                             'can be memory mapped. Read it with PandasManager.read_columnar_from_file.')
+    parser.add_argument('--parquet', type=str, required=False,
+                        help='The frames and the event tables (hits, bumps, ...) will be saved to this directory as '
+                             'parquet files. Needs pyarrow.')
+    parser.add_argument('--partition-by-replay', action='store_true', default=False,
+                        help='Save the --parquet tables partitioned by replay id, so the output of many runs can '
+                             'share a directory. Always used when the input is a directory.')
+    parser.add_argument('--profile', type=str, required=False,
+                        help='The time taken by each stage of the analysis will be saved to this file in json '
+                             'format. Not used when the input is a directory.')
+    parser.add_argument('-w', '--workers', type=int, required=False,
+                        help='Number of worker processes used when the input is a directory. '
+                             'Defaults to the number of cpus.')
+    parser.add_argument('--timeout', type=float, required=False,
+                        help='Maximum number of seconds a single replay may take when the input is a directory.')
+    parser.add_argument('--cache', type=str, required=False,
+                        help='Directory of an on-disk cache of analyses. Replays that were already analyzed with the '
+                             'same version of carball are loaded from it instead of being parsed again.')
+    parser.add_argument('--full-precision', action='store_true', default=False,
+                        help='Keep every number of the frames as float64 instead of the compact dtypes, '
+                             'which use about half the memory.')
+    parser.add_argument('--metadata-only', action='store_true', default=False,
+                        help='Only read the header of the replay and output the metadata (players, teams, score, '
+                             'goals), which is much faster. There are no stats or frames.')
     parser.add_argument('-v', '--verbose', action='count', default=0,
                         help='Set the logging level to INFO. To set the logging level to DEBUG use -vv.')
     parser.add_argument('-s', '--silent', action='store_true', default=False,
@@ -27,8 +64,8 @@ def main(program_args=None):
     else:
         args = parser.parse_args()
 
-    if not args.proto and not args.json and not args.gzip and not args.dry_run:
-        parser.error('at least one of the following arguments are required: --proto, --json, --gzip')
+    if not args.proto and not args.json and not args.gzip and not args.parquet and not args.dry_run:
+        parser.error('at least one of the following arguments are required: --proto, --json, --gzip, --parquet')
 
     log_level = logging.WARNING
 
@@ -42,17 +79,77 @@ def main(program_args=None):
     else:
         logging.basicConfig(handlers=[logging.StreamHandler()], level=log_level)
 
-    manager = carball.analyze_replay_file(args.input)
+    cache = carball.AnalysisCache(args.cache) if args.cache else None
+
+    if os.path.isdir(args.input):
+        analyze_directory(args, cache)
+        return
+
+    manager = carball.analyze_replay_file(args.input, cache=cache, full_precision=args.full_precision,
+                                          metadata_only=args.metadata_only)
 
     if args.proto:
         with open(args.proto, 'wb') as f:
             manager.write_proto_out_to_file(f)
     if args.json:
         with open(args.json, 'w') as f:
-            manager.write_json_out_to_file(f)
-    if args.gzip:
+            manager.write_json_out_to_file(f, compact=args.compact_json)
+    if args.profile:
+        with open(args.profile, 'w') as f:
+            manager.write_profile_out_to_file(f)
+    if args.gzip and args.columnar:
+        with open(args.gzip, 'wb') as f:
+            manager.write_pandas_out_to_file(f, columnar=True)
+    elif args.gzip:
         with gzip.open(args.gzip, 'wb') as f:
             manager.write_pandas_out_to_file(f)
+    if args.parquet:
+        manager.write_parquet_out_to_directory(args.parquet, partition_by_replay=args.partition_by_replay)
+
+
+def analyze_directory(args, cache=None):
+    for output_dir in [args.proto, args.json, args.gzip]:
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    failures = 0
+    results = carball.analyze_replay_directory(args.input, max_workers=args.workers, timeout=args.timeout,
+                                               include_data_frame=bool(args.gzip or args.parquet), cache=cache,
+                                               full_precision=args.full_precision,
+                                               metadata_only=args.metadata_only)
+    for result in results:
+        if result.error is not None:
+            failures += 1
+            logging.error("Failed to analyze %s: %s", result.replay_path, result.error)
+            continue
+
+        file_name = os.path.splitext(os.path.basename(result.replay_path))[0]
+        if args.proto:
+            with open(os.path.join(args.proto, file_name + '.pts'), 'wb') as f:
+                f.write(result.proto_bytes)
+        if args.json or args.parquet:
+            proto_game = game_pb2.Game()
+            proto_game.ParseFromString(result.proto_bytes)
+        if args.json:
+            with open(os.path.join(args.json, file_name + '.json'), 'w') as f:
+                write_message_json(f, proto_game, indent=None if args.compact_json else 2)
+        if args.gzip and result.data_frame_bytes is not None and args.columnar:
+            data_frame = PandasManager.read_numpy_from_memory(io.BytesIO(result.data_frame_bytes))
+            data_frame.index.name = None
+            with open(os.path.join(args.gzip, file_name + '.frames'), 'wb') as f:
+                PandasManager.write_columnar_to_file(f, data_frame)
+        elif args.gzip and result.data_frame_bytes is not None:
+            with gzip.open(os.path.join(args.gzip, file_name + '.gzip'), 'wb') as f:
+                f.write(result.data_frame_bytes)
+        if args.parquet:
+            data_frame = None
+            if result.data_frame_bytes is not None:
+                data_frame = PandasManager.read_numpy_from_memory(io.BytesIO(result.data_frame_bytes))
+                data_frame.index.name = None
+            write_parquet_to_directory(args.parquet, proto_game, data_frame, partition_by_replay=True)
+
+    if failures > 0:
+        logging.warning("%s replays could not be analyzed", failures)
 
 
 if __name__ == '__main__':
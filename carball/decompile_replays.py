@@ -3,9 +3,14 @@ import os
 from boxcars_py import parse_replay
 
 from carball.analysis.analysis_manager import AnalysisManager
+from carball.analysis.utils.profiler import AnalysisProfiler
+from carball.analysis_cache import AnalysisCache
 from carball.controls.controls import ControlsCreator
 from carball.extras.per_goal_analysis import PerGoalAnalysis
+from carball.extras.window_analysis import WindowAnalysisManager, get_goal_window, get_first_frame_to_parse, \
+    get_last_frame_to_parse, get_time_window, SECONDS_BEFORE_GOAL, SECONDS_AFTER_GOAL
 from carball.json_parser.game import Game
+from carball.json_parser.replay_header import parse_replay_header
 from carball.json_parser.sanity_check.sanity_check import SanityChecker
 
 BASE_DIR = os.path.dirname(__file__)
@@ -23,11 +28,28 @@ def decompile_replay(replay_path):
     return parse_replay(buf)
 
 
+def decompile_replay_header(replay_path):
+    """
+    Takes a path to the replay and outputs the header of that replay, without decoding the network frames.
+
+    :param replay_path: Path to a specific replay.
+    :return: The header of the object created from boxcars (its versions and properties).
+    """
+    with open(replay_path, 'rb') as f:
+        buf = f.read()
+    return parse_replay_header(buf)
+
+
 def analyze_replay_file(replay_path: str, controls: ControlsCreator = None,
                         sanity_check: SanityChecker = None, analysis_per_goal=False,
                         logging_level=logging.NOTSET,
                         calculate_intensive_events: bool = False,
-                        clean: bool = True):
+                        clean: bool = True,
+                        cache: AnalysisCache = None,
+                        trace_memory: bool = False,
+                        stats_workers: int = 1,
+                        full_precision: bool = False,
+                        metadata_only: bool = False):
     """
     Decompile and analyze a replay file.
 
@@ -39,27 +61,139 @@ def analyze_replay_file(replay_path: str, controls: ControlsCreator = None,
     :param logging_level: Sets the logging level globally across carball
     :param calculate_intensive_events: Indicates if expensive calculations should run to include additional stats.
     :param clean: Indicates if useless/invalid data should be found and removed.
-    :return: AnalysisManager of game with analysis.
+    :param cache: If set, a cached analysis of the same replay with the same options is returned without parsing
+        the replay, and new analyses are stored in it. It is not used with controls, sanity_check or analysis_per_goal
+        as those need the parsed game.
+    :param trace_memory: Also record the peak memory allocated by each stage in the profile of the analysis.
+        This slows the analysis down a lot.
+    :param stats_workers: Number of threads the stats are calculated on, the stats are the same either way.
+    :param full_precision: Keep every number of the frames as float64, instead of the compact dtypes that use about
+        half the memory. The events are the same either way, but the averages and distances only match to about
+        5 significant digits, and the stats that compare the players with each other (e.g. the time closest to
+        the team center) can differ where two players are about as far.
+    :param metadata_only: Only read the header of the replay and create the metadata, this is much faster than
+        decompiling the whole replay. The players, teams, score, goals, map and date are set,
+        but not what is only in the network frames: the playlist, server, match guid, mutators, loadouts, parties,
+        demos and the stats. The players are only in the header of replays of finished games, and it can miss some
+        of them, then the teams only have the players it lists.
+        The analysis has no frames and controls, sanity_check, analysis_per_goal and cache are ignored.
+    :return: AnalysisManager of game with analysis, or a CachedAnalysisManager if it was loaded from the cache.
     """
 
     if logging_level != logging.NOTSET:
         logging.getLogger('carball').setLevel(logging_level)
 
-    _json = decompile_replay(replay_path)
+    if cache is not None and (controls is not None or sanity_check is not None or analysis_per_goal):
+        cache = None
+
+    profiler = AnalysisProfiler(trace_memory=trace_memory)
+    with open(replay_path, 'rb') as f:
+        buf = f.read()
+    if metadata_only:
+        with profiler.stage('decompile_header'):
+            header = parse_replay_header(buf)
+        game = Game()
+        with profiler.stage('initialize'):
+            game.initialize(loaded_json=header, parse_replay=False)
+        analysis = AnalysisManager(game, profiler)
+        analysis.create_metadata()
+        return analysis
+
+    if cache is not None:
+        cache_key = cache.get_key(buf, calculate_intensive_events=calculate_intensive_events, clean=clean,
+                                  full_precision=full_precision)
+        with profiler.stage('load_from_cache'):
+            analysis = cache.load(cache_key, profiler)
+        if analysis is not None:
+            return analysis
+
+    with profiler.stage('decompile'):
+        _json = parse_replay(buf)
+    del buf
     game = Game()
-    game.initialize(loaded_json=_json)
+    with profiler.stage('parse_frames'):
+        # nothing else uses the json, so frames can be released as they are parsed
+        game.initialize(loaded_json=_json, release_frames=True, full_precision=full_precision)
     # get_controls(game)  # TODO: enable and optimise.
     if sanity_check is not None:
         sanity_check.check_game(game)
     if analysis_per_goal:
-        analysis = PerGoalAnalysis(game)
+        analysis = PerGoalAnalysis(game, profiler, stats_workers)
     else:
-        analysis = AnalysisManager(game)
+        analysis = AnalysisManager(game, profiler, stats_workers)
     analysis.create_analysis(calculate_intensive_events=calculate_intensive_events, clean=clean)
 
     if controls is not None:
         controls.get_controls(game)
 
+    if cache is not None:
+        with profiler.stage('store_in_cache'):
+            cache.store(cache_key, analysis)
+
+    return analysis
+
+
+def analyze_replay_window(replay_path: str, start_frame: int = None, end_frame: int = None,
+                          start_time: float = None, end_time: float = None,
+                          goal_index: int = None, seconds_before: float = SECONDS_BEFORE_GOAL,
+                          seconds_after: float = SECONDS_AFTER_GOAL,
+                          logging_level=logging.NOTSET,
+                          calculate_intensive_events: bool = False,
+                          clean: bool = True,
+                          trace_memory: bool = False,
+                          stats_workers: int = 1,
+                          full_precision: bool = False) -> WindowAnalysisManager:
+    """
+    Decompile a replay file and analyze only a window of it, see WindowAnalysisManager.
+    The window is either given by frames, by times or by a goal.
+
+    :param replay_path: Path to replay file
+    :param start_frame: The first frame of the window, defaults to the first frame of the replay.
+        The frames of the players are only kept from the play the window starts in (and a small margin).
+    :param end_frame: The last frame of the window, defaults to the last frame of the replay.
+        The frames after it (and a small margin) are not parsed.
+    :param start_time: The time of the replay (in seconds, the time column of the frames) the window starts at.
+    :param end_time: The time the window ends at. The whole replay is parsed for a window by time.
+    :param goal_index: The window is around this goal (negative indexes count from the last goal).
+    :param seconds_before: The seconds before the goal in the window.
+    :param seconds_after: The seconds after the goal in the window.
+    :param logging_level: Sets the logging level globally across carball
+    :param calculate_intensive_events: Indicates if expensive calculations should run to include additional stats.
+    :param clean: Indicates if useless/invalid data should be found and removed.
+    :param trace_memory: Also record the peak memory allocated by each stage in the profile of the analysis.
+    :param stats_workers: Number of threads the stats are calculated on, the stats are the same either way.
+    :param full_precision: Keep every number of the frames as float64.
+    :return: WindowAnalysisManager of game with the analysis of the window.
+    :raises ValueError: if the window is given by more than one of frames, times and a goal.
+    """
+    by_frames = start_frame is not None or end_frame is not None
+    by_time = start_time is not None or end_time is not None
+    if by_frames + by_time + (goal_index is not None) > 1:
+        raise ValueError("The window can only be given by one of frames, times or a goal")
+
+    if logging_level != logging.NOTSET:
+        logging.getLogger('carball').setLevel(logging_level)
+
+    profiler = AnalysisProfiler(trace_memory=trace_memory)
+    with profiler.stage('decompile'):
+        _json = decompile_replay(replay_path)
+    if goal_index is not None:
+        start_frame, end_frame = get_goal_window(_json['properties'], goal_index, seconds_before, seconds_after)
+    first_frame = get_first_frame_to_parse(_json['properties'], start_frame) if start_frame is not None else 0
+    last_frame = get_last_frame_to_parse(end_frame) if end_frame is not None else None
+    game = Game()
+    with profiler.stage('parse_frames'):
+        game.initialize(loaded_json=_json, release_frames=True, full_precision=full_precision,
+                        first_frame=first_frame, last_frame=last_frame)
+    if by_time:
+        start_frame, end_frame = get_time_window(game, start_time, end_time)
+    if start_frame is None:
+        start_frame = int(game.frames.index[0])
+    if end_frame is None:
+        end_frame = int(game.frames.index[-1])
+
+    analysis = WindowAnalysisManager(game, start_frame, end_frame, profiler, stats_workers)
+    analysis.create_analysis(calculate_intensive_events=calculate_intensive_events, clean=clean)
     return analysis
 
 
@@ -0,0 +1,303 @@
+import logging
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from carball.analysis.analysis_manager import AnalysisManager, BaseAnalysisManager
+from carball.analysis.events.boost_pad_detection.pickup_analysis import PickupAnalysis
+from carball.analysis.events.hit_detection.base_hit import BaseHit
+from carball.analysis.stats.boost.boost import BoostStat
+from carball.analysis.stats.possession.possession import PossessionStat
+from carball.analysis.stats.tendencies.positional_tendencies import PositionalTendencies
+from carball.analysis.stats.tendencies.speed_tendencies import SpeedTendencies
+from carball.analysis.stats.utils.frame_features import FrameFeatures
+from carball.analysis.utils.profiler import AnalysisProfiler
+from carball.analysis.utils.proto_manager import ProtobufManager
+from carball.generated.api import game_pb2
+from carball.json_parser.game import Game
+
+logger = logging.getLogger(__name__)
+
+# A pickup is only known once the frames after it have been seen, see PickupAnalysis.get_boost_collect.
+# These are counted in the frames the player is in, the frames while the player is demolished are skipped.
+PICKUP_DELAY = PickupAnalysis.LAG_BACK + PickupAnalysis.LAG_FORWARD
+# The number of earlier frames of each player the new frames are analysed with.
+CONTEXT_FRAMES = PickupAnalysis.CONTEXT_FRAMES
+# The earlier frames kept for a player that has not been in the game for a while are limited to this.
+MAX_CONTEXT_FRAMES = 10 * CONTEXT_FRAMES
+PICKUP_COLUMNS = ['pos_x', 'pos_y', 'pos_z', 'boost']
+VELOCITY_COLUMNS = ['vel_x', 'vel_y', 'vel_z']
+
+
+class IncrementalAnalysisManager(BaseAnalysisManager):
+    """
+    Analyses a game while it is being played, from its frames given to add_frames a chunk at a time.
+
+    Only the new frames of a chunk are analysed (with the last few earlier frames as context),
+    what they add is then added to the running totals. This keeps up to date:
+        the kickoffs, the hits (without the analysis of SaltieHit) and the boost pickups,
+        the boost, positional and speed stats of the players, the positional and speed stats of the ball,
+        the possession time of the teams and the length of the game.
+    The other events and stats need the whole game (e.g. passes, shots or the per possession stats),
+    run an AnalysisManager on the replay once the game is over to get them.
+
+    The results are close to those of a full analysis, but not always the same:
+        a pickup is only found PICKUP_DELAY frames after it happened (or once finish() is called),
+        the hits of a chunk are not filtered against the hits of the chunk before,
+        the goals are not known yet, so the frames from a goal to the next countdown count towards the stats,
+        and the totals are added up chunk by chunk, so they may differ in the last digits.
+    """
+
+    def __init__(self, game: Game, profiler: AnalysisProfiler = None):
+        """
+        :param game: The game initialized with the players and teams of the match, its frames are not used.
+        """
+        # the metadata is set as for a full analysis, the frames are then analysed as they are added
+        analysis_manager = AnalysisManager(game, profiler)
+        super().__init__(analysis_manager.get_protobuf_data(), analysis_manager.profiler)
+        self.game = game
+        self.id_creator = analysis_manager.id_creator
+        self.player_map = analysis_manager.create_metadata()
+        self._chunks: List[pd.DataFrame] = []
+        # the last frames that were added, the next frames are analysed with them
+        self._context: pd.DataFrame = None
+
+        self._kickoff_count = 0
+        self._is_in_play = False
+        self._kickoff_start_frame = None
+        self._first_touch_frames: List[int] = []
+
+        self._pickups: Dict[str, List[pd.Series]] = {}
+        # the pickups of each player have been found up to this frame
+        self._last_pickup_frames: Dict[str, int] = {}
+        # the sum and count of the values the averages are taken over
+        self._averages: Dict[str, List[float]] = {}
+
+    def add_frames(self, frames: pd.DataFrame) -> game_pb2.Game:
+        """
+        Analyses the frames that come after the frames added so far, and updates the protobuf data with them.
+
+        :param frames: The next frames, in the format of get_data_frame (see SaltieGame.create_data_df).
+            The frames that were added before are skipped.
+        :return: The protobuf data of all of the frames added so far.
+        """
+        if self._context is not None:
+            frames = frames.loc[frames.index > self._context.index[-1]]
+        if len(frames) == 0:
+            return self.protobuf_game
+        frames = frames.copy()
+
+        with self.profiler.stage('kickoff_frames'):
+            self._add_kickoffs(frames)
+        window = frames if self._context is None else pd.concat([self._context, frames])
+        first_new_frame = frames.index[0]
+        with self.profiler.stage('hits'):
+            self._add_hits(window.iloc[max(len(window) - len(frames) - 1, 0):])
+        with self.profiler.stage('boostpads'):
+            pickups = self._add_pickups(window, PICKUP_DELAY)
+        with self.profiler.stage('stats'):
+            self._add_stats(window, first_new_frame, pickups)
+
+        self._chunks.append(frames)
+        self._context = window.loc[window.index >= self._get_context_start(window)]
+        return self.protobuf_game
+
+    def finish(self) -> game_pb2.Game:
+        """
+        Adds the pickups of the last frames, call it once all of the frames of the game have been added.
+
+        :return: The protobuf data of all of the frames.
+        """
+        if self._context is not None:
+            pickups = self._add_pickups(self._context, 0)
+            self._add_stats(self._context, np.inf, pickups)
+        return self.protobuf_game
+
+    def get_data_frame(self) -> pd.DataFrame:
+        """
+        :return: The frames added so far, with the boost pickups found so far. None if no frames were added.
+        """
+        if len(self._chunks) == 0:
+            return None
+        data_frame = pd.concat(self._chunks)
+        for player_name, pickups in self._pickups.items():
+            data_frame[player_name, 'boost_collect'] = pd.concat(pickups)
+        return data_frame
+
+    def _add_kickoffs(self, frames: pd.DataFrame):
+        """
+        Finds the kickoffs and first touches in the new frames, and sets their goal_number.
+        The frames between a kickoff and the next countdown are in play, the other frames have no goal_number.
+        """
+        game_frames = frames['game']
+        last_frame = None if self._context is None else self._context['game'].iloc[-1]
+
+        countdown = game_frames['replicated_seconds_remaining']
+        last_countdown = countdown.shift(1)
+        if last_frame is not None:
+            last_countdown.iloc[0] = last_frame['replicated_seconds_remaining']
+        is_kickoff = (countdown == 0) & (last_countdown.fillna(-1) > 0)
+
+        if 'ball_has_been_hit' in game_frames:
+            ball_has_been_hit = game_frames['ball_has_been_hit'].fillna(False).astype(bool)
+            last_ball_has_been_hit = ball_has_been_hit.shift(1, fill_value=False)
+            if last_frame is not None:
+                last_ball_has_been_hit.iloc[0] = last_frame['ball_has_been_hit'] == True
+            is_first_touch = ball_has_been_hit & ~last_ball_has_been_hit
+        else:
+            logger.debug("No ball_has_been_hit?! Is this really old or what.")
+            has_hit_team = frames['ball', 'hit_team_no'].notnull()
+            last_has_hit_team = has_hit_team.shift(1, fill_value=False)
+            if last_frame is not None:
+                last_has_hit_team.iloc[0] = pd.notnull(self._context['ball', 'hit_team_no'].iloc[-1])
+            is_first_touch = has_hit_team & ~last_has_hit_team
+
+        kickoff_counts = self._kickoff_count + is_kickoff.cumsum()
+        play_changes = pd.Series(np.nan, index=frames.index)
+        play_changes[countdown > 0] = 0
+        play_changes[is_kickoff] = 1
+        is_in_play = play_changes.ffill().fillna(float(self._is_in_play)).astype(bool)
+        frames['game', 'goal_number'] = (kickoff_counts - 1).where(is_in_play).astype(float)
+        self._kickoff_count = int(kickoff_counts.iloc[-1])
+        self._is_in_play = bool(is_in_play.iloc[-1])
+
+        for frame_number in frames.index[is_kickoff | is_first_touch]:
+            if is_kickoff[frame_number]:
+                self._kickoff_start_frame = frame_number
+            if is_first_touch[frame_number]:
+                self._first_touch_frames.append(frame_number)
+                if self._kickoff_start_frame is not None:
+                    kickoff = self.protobuf_game.game_stats.kickoffs.add()
+                    kickoff.start_frame_number = self._kickoff_start_frame
+                    kickoff.end_frame_number = frame_number
+                    self._kickoff_start_frame = None
+
+    def _add_hits(self, frames: pd.DataFrame):
+        """
+        Adds the hits in the new frames.
+        :param frames: The new frames, after the frame before them.
+        """
+        first_touch_frames = np.array([frame_number for frame_number in self._first_touch_frames
+                                       if frames.index[0] <= frame_number <= frames.index[-1]], dtype=np.int64)
+        hits_game = game_pb2.Game()
+        BaseHit.get_hits_from_game(self.game, hits_game, self.id_creator, frames, first_touch_frames)
+        for hit in hits_game.game_stats.hits:
+            if hit.frame_number > frames.index[0] or self._context is None:
+                self.protobuf_game.game_stats.hits.add().CopyFrom(hit)
+
+    def _add_pickups(self, frames: pd.DataFrame, delay: int) -> Dict[str, pd.Series]:
+        """
+        Finds the pickups after the pickups found so far.
+        :param delay: The number of the last frames of each player that can not have their pickups found yet.
+        :return: The new pickups of each player, by the name of the player.
+        """
+        pickups = {}
+        for player in self.protobuf_game.players:
+            player_frames = frames[player.name]
+            in_game_frames = player_frames.index[player_frames[PICKUP_COLUMNS].notnull().any(axis=1)]
+            first_pickup_frame = self._last_pickup_frames.get(player.name, -1)
+            last_pickup_frame = in_game_frames[-delay - 1] if len(in_game_frames) > delay else first_pickup_frame
+
+            boost_collect = PickupAnalysis.get_player_boost_collect(player_frames)
+            boost_collect = boost_collect.loc[(boost_collect.index > first_pickup_frame) &
+                                              (boost_collect.index <= last_pickup_frame)]
+            pickups[player.name] = boost_collect
+            self._pickups.setdefault(player.name, []).append(boost_collect)
+            self._last_pickup_frames[player.name] = max(first_pickup_frame, last_pickup_frame)
+        return pickups
+
+    def _get_context_start(self, frames: pd.DataFrame) -> int:
+        """
+        :return: The first of the frames that is needed to analyse the frames after them,
+            the last CONTEXT_FRAMES frames of each player are kept, up to MAX_CONTEXT_FRAMES frames.
+        """
+        context_start = frames.index[max(len(frames) - CONTEXT_FRAMES, 0)]
+        for player in self.protobuf_game.players:
+            player_frames = frames[player.name]
+            in_game_frames = player_frames.index[player_frames[PICKUP_COLUMNS].notnull().any(axis=1)]
+            if len(in_game_frames) > 0:
+                context_start = min(context_start, in_game_frames[max(len(in_game_frames) - CONTEXT_FRAMES, 0)])
+        return max(context_start, frames.index[max(len(frames) - MAX_CONTEXT_FRAMES, 0)])
+
+    def _add_stats(self, frames: pd.DataFrame, first_new_frame: float, pickups: Dict[str, pd.Series]):
+        """
+        Calculates the stats of the new frames and the new pickups, and adds them to the totals.
+
+        The earlier frames are only there for the stats that look at the frames around a frame,
+        like the frames that are not in play they are left out of the times by zeroing their delta
+        and out of the speeds by clearing their velocities.
+        """
+        stats_frames = frames.copy()
+        is_in_play = stats_frames.game.goal_number.notnull()
+        is_counted = (stats_frames.index >= first_new_frame) & is_in_play
+        stats_frames.loc[~is_counted, ('game', 'delta')] = 0
+        for name in [player.name for player in self.protobuf_game.players] + ['ball']:
+            for column in VELOCITY_COLUMNS:
+                if (name, column) in stats_frames:
+                    stats_frames.loc[~is_counted, (name, column)] = np.nan
+            if name in pickups:
+                stats_frames[name, 'boost_collect'] = pickups[name].loc[is_in_play[pickups[name].index]]
+
+        # the stats of the new frames are calculated on a copy of the players and teams, then added to the totals
+        chunk_game = game_pb2.Game()
+        for player in self.protobuf_game.players:
+            chunk_player = chunk_game.players.add()
+            chunk_player.id.CopyFrom(player.id)
+            chunk_player.name = player.name
+            chunk_player.is_orange = player.is_orange
+        for team in self.protobuf_game.teams:
+            chunk_game.teams.add().is_orange = team.is_orange
+        chunk_player_map = {key: chunk_player for key, chunk_player in zip(self.player_map, chunk_game.players)}
+
+        features = FrameFeatures(stats_frames)
+        player_stats = {key: chunk_player.stats for key, chunk_player in chunk_player_map.items()}
+        for stat in [BoostStat(), PositionalTendencies(), SpeedTendencies()]:
+            stat.features = features
+            stat.calculate_player_stat(player_stats, self.game, chunk_game, chunk_player_map, stats_frames)
+        for stat in [PositionalTendencies(), SpeedTendencies()]:
+            stat.features = features
+            stat.calculate_stat(chunk_game.game_stats, self.game, chunk_game, chunk_player_map, stats_frames)
+        team_stats = {int(team.is_orange): team.stats for team in chunk_game.teams}
+        PossessionStat().calculate_team_stat(team_stats, self.game, chunk_game, chunk_player_map, stats_frames)
+
+        for player, chunk_player in zip(self.protobuf_game.players, chunk_game.players):
+            chunk_player.stats.boost.ClearField('average_boost_level')
+            chunk_player.stats.averages.ClearField('average_speed')
+            ProtobufManager.add_values(player.stats, chunk_player.stats)
+            self._set_average(player.name + '/average_boost_level', player.stats.boost, 'average_boost_level',
+                              stats_frames.loc[is_counted, (player.name, 'boost')] / 255 * 100)
+            self._set_average(player.name + '/average_speed', player.stats.averages, 'average_speed',
+                              features.get_speed(player.name))
+        for team, chunk_team in zip(self.protobuf_game.teams, chunk_game.teams):
+            ProtobufManager.add_values(team.stats, chunk_team.stats)
+        chunk_game.game_stats.ball_stats.averages.ClearField('average_speed')
+        ProtobufManager.add_values(self.protobuf_game.game_stats.ball_stats, chunk_game.game_stats.ball_stats)
+        if 'vel_x' in stats_frames['ball']:
+            self._set_average('ball/average_speed', self.protobuf_game.game_stats.ball_stats.averages, 'average_speed',
+                              features.get_speed('ball'))
+
+        self._add_game_time(stats_frames)
+
+    def _set_average(self, key: str, proto, field: str, values: pd.Series):
+        """
+        Adds the values to the values the average of the field is taken over, and sets the average.
+        :param key: The name of the average, the values of each average are kept under their own key.
+        """
+        total = self._averages.setdefault(key, [0.0, 0])
+        total[0] += values.sum()
+        total[1] += values.count()
+        if total[1] > 0:
+            setattr(proto, field, total[0] / total[1])
+
+    def _add_game_time(self, stats_frames: pd.DataFrame):
+        """
+        Adds the time of the new frames to the length of the game and to the time in game of the players.
+        """
+        metadata = self.protobuf_game.game_metadata
+        metadata.length = metadata.length + stats_frames.game.delta.sum()
+        for player in self.protobuf_game.players:
+            is_in_game = stats_frames[player.name].pos_x.notnull()
+            player.time_in_game = player.time_in_game + stats_frames.game.delta[is_in_game].sum()
+            if not player.HasField('first_frame_in_game') and is_in_game.any():
+                player.first_frame_in_game = stats_frames.index[is_in_game.values][0]
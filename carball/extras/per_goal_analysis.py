@@ -4,12 +4,13 @@ from carball.generated.api import game_pb2
 from carball.json_parser.game import Game
 
 from carball.analysis.analysis_manager import AnalysisManager
+from carball.analysis.utils.profiler import AnalysisProfiler
 
 
 class PerGoalAnalysis(AnalysisManager):
 
-    def __init__(self, game: Game):
-        super().__init__(game)
+    def __init__(self, game: Game, profiler: AnalysisProfiler = None, stats_workers: int = 1):
+        super().__init__(game, profiler, stats_workers)
         self.protobuf_games = []
 
     def _perform_full_analysis(self, game: Game, proto_game: game_pb2.Game, player_map,
@@ -0,0 +1,212 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from carball.analysis.analysis_manager import AnalysisManager
+from carball.analysis.cleaner.cleaner import clean_replay
+from carball.analysis.events.boost_pad_detection.pickup_analysis import PickupAnalysis
+from carball.analysis.saltie_game.saltie_game import SaltieGame
+from carball.analysis.utils.profiler import AnalysisProfiler
+from carball.generated.api import game_pb2
+from carball.json_parser.game import Game
+
+logger = logging.getLogger(__name__)
+
+# The frames on each side of the window the events are found with, so the hits and pickups at its edges are found.
+MARGIN_FRAMES = PickupAnalysis.CONTEXT_FRAMES
+# Frame rate of replays that have no RecordFPS property.
+DEFAULT_FPS = 30
+SECONDS_BEFORE_GOAL = 15.0
+SECONDS_AFTER_GOAL = 5.0
+
+# The frame of each event of game_stats that decides if it is in the window.
+EVENT_FRAME_FIELDS = {
+    'hits': 'frame_number',
+    'bumps': 'frame_number',
+    'kickoffs': 'start_frame_number',
+    'kickoff_stats': 'start_frame',
+    'ball_carries': 'start_frame_number',
+    'rumble_items': 'frame_number_get',
+    'fifty_fifties': 'starting_frame',
+}
+
+
+class WindowAnalysisManager(AnalysisManager):
+    """
+    Analyses only the frames from start_frame to end_frame (both included) of a game, e.g. the seconds around a goal.
+
+    The metadata is that of the whole game, but the goals and demos are only those in the window
+    and the length is the time played in the window.
+    The events are found with MARGIN_FRAMES more frames on each side of the window, and only those in it are kept.
+    The play the window starts in is analysed from its kickoff, as the hit that scored the goal and the kickoff stats
+    need it. The stats are calculated over the frames of the window, which are also the frames of the analysis.
+
+    The game only has to be parsed up to get_last_frame_to_parse(end_frame), and the frames of the players only have
+    to be kept from get_first_frame_to_parse(properties, start_frame), see Game.initialize.
+    """
+
+    def __init__(self, game: Game, start_frame: int, end_frame: int, profiler: AnalysisProfiler = None,
+                 stats_workers: int = 1):
+        """
+        :param start_frame: The first frame of the window.
+        :param end_frame: The last frame of the window.
+        """
+        if start_frame > end_frame:
+            raise ValueError("The window starts at frame %s after it ends at frame %s" % (start_frame, end_frame))
+        super().__init__(game, profiler, stats_workers)
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+
+    def create_analysis(self, calculate_intensive_events: bool = False, clean: bool = True):
+        game = self.game
+        proto_game = self.protobuf_game
+        with self.profiler.stage('metadata'):
+            player_map = self._get_game_metadata(game, proto_game)
+
+        all_kickoff_frames = SaltieGame.get_kickoff_frames(game)
+        first_frame = self._get_first_frame(all_kickoff_frames)
+        last_frame = self.end_frame + MARGIN_FRAMES
+        with self.profiler.stage('create_data_frame'):
+            data_frame = SaltieGame.create_data_df(game, first_frame, last_frame)
+            # set by _get_kickoff_frames, but only if a play is in the frames
+            data_frame['game', 'goal_number'] = np.nan
+        with self.profiler.stage('kickoff_frames'):
+            kickoff_frames, first_touch_frames = self._get_kickoff_frames(game, proto_game, data_frame)
+        game.kickoff_frames = kickoff_frames
+
+        # only the kickoffs and goals from the first kickoff after first_frame are in the frames,
+        # the events match the n-th goal to the n-th kickoff
+        first_kickoff = int(np.searchsorted(kickoff_frames, first_frame))
+        last_kickoff = first_kickoff
+        while (last_kickoff < len(first_touch_frames) and
+               first_touch_frames[last_kickoff] <= data_frame.index[-1]):
+            last_kickoff += 1
+        window_kickoff_frames = list(kickoff_frames[first_kickoff:last_kickoff])
+        window_first_touch_frames = first_touch_frames[first_kickoff:last_kickoff]
+        goals = proto_game.game_metadata.goals
+        del goals[:first_kickoff]
+        self._remove_outside(goals, 'frame_number', first_frame, last_frame)
+
+        if not data_frame['game', 'goal_number'].notnull().any():
+            logger.info("Cannot perform analysis: the ball is not in play in the window.")
+            proto_game.game_metadata.is_invalid_analysis = True
+        elif self._can_do_full_analysis(first_touch_frames):
+            self._perform_full_analysis(game, proto_game, player_map, data_frame,
+                                        window_kickoff_frames, window_first_touch_frames,
+                                        calculate_intensive_events=calculate_intensive_events, clean=clean)
+        else:
+            logger.info("Cannot perform analysis: invalid analysis.")
+            proto_game.game_metadata.is_invalid_analysis = True
+
+        with self.profiler.stage('store_frames'):
+            self._store_frames(data_frame.loc[self.start_frame:self.end_frame])
+
+    def _perform_full_analysis(self, game: Game, proto_game: game_pb2.Game, player_map,
+                               data_frame: pd.DataFrame, kickoff_frames, first_touch_frames,
+                               calculate_intensive_events: bool = False, clean: bool = True):
+        window_frames = data_frame.loc[self.start_frame:self.end_frame]
+        with self.profiler.stage('game_time'):
+            self._get_game_time(proto_game, window_frames)
+        if clean:
+            with self.profiler.stage('clean'):
+                clean_replay(game, data_frame, proto_game, player_map)
+        self._restrict_dropshot_events(game)
+        with self.profiler.stage('events'):
+            self.events_creator.create_events(game, proto_game, player_map, data_frame, kickoff_frames,
+                                              first_touch_frames,
+                                              calculate_intensive_events=calculate_intensive_events)
+        self._remove_events_outside_of_window(game, proto_game)
+        with self.profiler.stage('stats'):
+            # the columns dropped by clean_replay are also dropped from the window
+            self._get_stats(game, proto_game, player_map, data_frame.loc[self.start_frame:self.end_frame])
+
+    def _get_first_frame(self, kickoff_frames) -> int:
+        """
+        :return: The first frame the events are found from,
+            the kickoff of the play the window starts in if that play has not ended before the window.
+        """
+        first_frame = self.start_frame - MARGIN_FRAMES
+        play_kickoffs = [frame for frame in kickoff_frames if frame <= self.start_frame]
+        if len(play_kickoffs) == 0:
+            return max(first_frame, 0)
+        play = len(play_kickoffs) - 1
+        if play >= len(self.game.goals) or self.game.goals[play].frame_number >= self.start_frame:
+            first_frame = min(first_frame, play_kickoffs[-1] - 1)
+        return max(first_frame, 0)
+
+    def _restrict_dropshot_events(self, game: Game):
+        if game.dropshot is None:
+            return
+        game.dropshot = dict(game.dropshot)
+        for key in ['ball_events', 'damage_events']:
+            if key in game.dropshot:
+                game.dropshot[key] = [event for event in game.dropshot[key]
+                                      if self.start_frame <= event['frame_number'] <= self.end_frame]
+
+    def _remove_events_outside_of_window(self, game: Game, proto_game: game_pb2.Game):
+        for name, frame_field in EVENT_FRAME_FIELDS.items():
+            self._remove_outside(getattr(proto_game.game_stats, name), frame_field, self.start_frame, self.end_frame)
+        self._remove_outside(proto_game.game_metadata.goals, 'frame_number', self.start_frame, self.end_frame)
+        self._remove_outside(proto_game.game_metadata.demos, 'frame_number', self.start_frame, self.end_frame)
+        if game.demos is not None:
+            game.demos = [demo for demo in game.demos if self.start_frame <= demo['frame_number'] <= self.end_frame]
+
+    @staticmethod
+    def _remove_outside(events, frame_field: str, first_frame: int, last_frame: int):
+        for index in reversed(range(len(events))):
+            if not first_frame <= getattr(events[index], frame_field) <= last_frame:
+                del events[index]
+
+
+def get_first_frame_to_parse(properties: dict, start_frame: int) -> int:
+    """
+    :param properties: The properties of the replay (Game.properties), only the header is needed.
+    :return: The first frame of the players a game needs for a WindowAnalysisManager of a window starting at
+        start_frame. The play the window starts in may have started before it, but not before the goal before it.
+    """
+    goal_frames = [goal['frame'] for goal in properties.get('Goals', []) if goal['frame'] < start_frame]
+    play_start = max(goal_frames, default=0)
+    return max(min(start_frame - MARGIN_FRAMES, play_start), 0)
+
+
+def get_last_frame_to_parse(end_frame: int) -> int:
+    """
+    :return: The last frame a game needs to be parsed up to for a WindowAnalysisManager of a window ending at end_frame.
+    """
+    return end_frame + MARGIN_FRAMES
+
+
+def get_goal_window(properties: dict, goal_index: int, seconds_before: float = SECONDS_BEFORE_GOAL,
+                    seconds_after: float = SECONDS_AFTER_GOAL) -> Tuple[int, int]:
+    """
+    :param properties: The properties of the replay (Game.properties), only the header is needed.
+    :param goal_index: The index of the goal in the goals of the replay, negative indexes count from the last goal.
+    :return: The first and last frame of the window around the goal.
+    :raises IndexError: if the replay has no such goal.
+    """
+    goal_frame = properties.get('Goals', [])[goal_index]['frame']
+    fps = properties.get('RecordFPS', DEFAULT_FPS)
+    return max(goal_frame - int(round(seconds_before * fps)), 0), goal_frame + int(round(seconds_after * fps))
+
+
+def get_time_window(game: Game, start_time: float = None, end_time: float = None) -> Tuple[int, int]:
+    """
+    :param game: The parsed game.
+    :param start_time: The time of the replay (the time column of the frames) the window starts at,
+        defaults to the start of the replay.
+    :param end_time: The time the window ends at, defaults to the end of the replay.
+    :return: The first and last frame in the window.
+    :raises ValueError: if there are no frames in the window.
+    """
+    times = game.frames['time']
+    in_window = times.notnull()
+    if start_time is not None:
+        in_window &= times >= start_time
+    if end_time is not None:
+        in_window &= times <= end_time
+    frames = times.index[in_window]
+    if len(frames) == 0:
+        raise ValueError("There are no frames from %s to %s" % (start_time, end_time))
+    return int(frames[0]), int(frames[-1])
@@ -25,7 +25,7 @@ class BallHandler(BaseActorHandler):
             self.parser.game.ball_type = BALL_TYPES.get(actor['TypeName'], mutators.DEFAULT)
 
         ball_data = BallActor.get_data_dict(actor)
-        self.parser.ball_data[frame_number] = ball_data
+        self.parser.ball_data.set_row(frame_number, ball_data)
 
         if self.parser.game.ball_type == mutators.BREAKOUT:
             damage_index = actor.get('TAGame.Ball_Breakout_TA:DamageIndex', 0)
@@ -37,4 +37,4 @@ class BallHandler(BaseActorHandler):
                     'team': team
                 })
             self.parser.dropshot['ball_state'] = damage_index
-            self.parser.ball_data[frame_number]['dropshot_phase'] = damage_index
+            self.parser.ball_data.set(frame_number, 'dropshot_phase', damage_index)
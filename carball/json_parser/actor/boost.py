@@ -45,8 +45,8 @@ class BoostHandler(BaseActorHandler):
         else:
             boost_amount = actor.get('TAGame.CarComponent_Boost_TA:ReplicatedBoostAmount', None)
 
-        self.parser.player_data[player_actor_id][frame_number]['boost'] = boost_amount
-        self.parser.player_data[player_actor_id][frame_number]['boost_active'] = boost_is_active
+        self.parser.player_data[player_actor_id].set(frame_number, 'boost', boost_amount)
+        self.parser.player_data[player_actor_id].set(frame_number, 'boost_active', boost_is_active)
 
 
 class BoostPickupHandler(BaseActorHandler):
@@ -61,27 +61,15 @@ class BoostPickupHandler(BaseActorHandler):
             car_actor_id = boost_actor['instigator_id']
             if car_actor_id in self.parser.car_player_ids:
                 player_actor_id = self.parser.car_player_ids[car_actor_id]
-                if frame_number in self.parser.player_data[player_actor_id]:
-                    actor = self.parser.player_data[player_actor_id]
-                    frame_number_look_back = frame_number - 1
-                    previous_boost_data = None
-                    while frame_number_look_back >= 0:
-                        try:
-                            previous_boost_data = actor[frame_number_look_back]['boost']
-                        except KeyError:
-                            previous_boost_data = None
-                        if previous_boost_data is not None:
-                            break
-                        frame_number_look_back -= 1
-                    try:
-                        current_boost_data = actor[frame_number]['boost']
-                    except KeyError:
-                        current_boost_data = None
+                player_data = self.parser.player_data[player_actor_id]
+                if frame_number in player_data:
+                    previous_boost_data = player_data.get_last_value('boost', frame_number)
+                    current_boost_data = player_data.get(frame_number, 'boost')
 
                     # Ignore any phantom boosts
                     if (previous_boost_data is not None and current_boost_data is not None and
                             (255 > previous_boost_data < current_boost_data)):
-                        actor[frame_number]['boost_collect'] = True
+                        player_data.set(frame_number, 'boost_collect', True)
                         # set to false after acknowledging it's turned True
                         # it does not turn back false immediately although boost is only collected once.
                         # using actor_id!=-1
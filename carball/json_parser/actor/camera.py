@@ -16,7 +16,7 @@ class CameraSettingsHandler(BaseActorHandler):
         # add ball cam to inputs
         ball_cam = actor.get('TAGame.CameraSettingsActor_TA:bUsingSecondaryCamera', None)
         try:
-            self.parser.player_data[player_actor_id][frame_number]['ball_cam'] = ball_cam
+            self.parser.player_data[player_actor_id].set(frame_number, 'ball_cam', ball_cam)
         except KeyError:
             # key error due to frame_number not in inputs
             # ignore as no point knowing
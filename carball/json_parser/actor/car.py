@@ -30,7 +30,7 @@ class CarHandler(BaseActorHandler):
 
             data_dict = CarActor.get_data_dict(actor)
             # save data from here
-            self.parser.player_data[player_actor_id][frame_number].update(data_dict)
+            self.parser.player_data[player_actor_id].update(frame_number, data_dict)
 
         # get demo data
         self.add_demo(actor, frame_number)
@@ -20,4 +20,4 @@ class GameEventHandler(BaseActorHandler):
             'is_overtime': actor.get('TAGame.GameEvent_Soccar_TA:bOverTime', None),
             'ball_has_been_hit': actor.get('TAGame.GameEvent_Soccar_TA:bBallHasBeenHit', None)
         }
-        self.parser.frames_data[frame_number] = frame_data
+        self.parser.frames_data.set_row(frame_number, frame_data)
@@ -15,7 +15,7 @@ class ActiveHandler(BaseActorHandler):
                 jump_is_active = actor.get(
                     COMPONENT_ACTIVE_KEY,
                     actor.get(COMPONENT_REPLICATED_ACTIVE_KEY, False))
-                self.parser.player_data[player_actor_id][frame_number][self.data_key] = jump_is_active
+                self.parser.player_data[player_actor_id].set(frame_number, self.data_key, jump_is_active)
 
 
 class JumpHandler(ActiveHandler):
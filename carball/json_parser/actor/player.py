@@ -1,5 +1,6 @@
 import logging
 from .base import *
+from ..frame_data import FrameDataTable
 
 logger = logging.getLogger(__name__)
 
@@ -62,24 +63,24 @@ class PlayerHandler(BaseActorHandler):
             self.parser.player_dicts[actor_id] = player_dict
 
             logger.debug('Found player actor: %s (id: %s)' % (player_dict['name'], actor_id))
-            self.parser.player_data[actor_id] = {}
+            self.parser.player_data[actor_id] = FrameDataTable(self.parser.num_frames, self.parser.first_frame)
 
-        self.parser.player_data[actor_id][frame_number] = {}
+        player_data = self.parser.player_data[actor_id]
+        player_data.new_row(frame_number)
 
         # update player_dicts
         for _k, _v in {**actor, **player_dict}.items():
             self.parser.player_dicts[actor_id][_k] = _v
 
         if delta != 0:
-            self.parser.player_data[actor_id][frame_number]['ping'] = \
-                actor.get("Engine.PlayerReplicationInfo:Ping", None)
+            player_data.set(frame_number, 'ping', actor.get("Engine.PlayerReplicationInfo:Ping", None))
             if 'TAGame.PRI_TA:CameraSettings' in actor:
                 # oldstyle camera settings
                 if actor_id not in self.parser.cameras_data:
                     self.parser.cameras_data[actor_id] = actor['TAGame.PRI_TA:CameraSettings']
                 ball_cam = actor.get('TAGame.CameraSettingsActor_TA:bUsingSecondaryCamera', None)
-                self.parser.player_data[actor_id][frame_number]['ball_cam'] = ball_cam
+                player_data.set(frame_number, 'ball_cam', ball_cam)
 
             if 'TAGame.PRI_TA:TimeTillItem' in actor:
                 time_till_item = actor['TAGame.PRI_TA:TimeTillItem']
-                self.parser.player_data[actor_id][frame_number]['time_till_power_up'] = time_till_item
+                player_data.set(frame_number, 'time_till_power_up', time_till_item)
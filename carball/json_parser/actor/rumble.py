@@ -19,5 +19,5 @@ class RumbleItemHandler(BaseActorHandler):
             # item is active when this is odd
             item_active = actor.get(COMPONENT_REPLICATED_ACTIVE_KEY, 0) % 2 == 1
 
-            self.parser.player_data[player_actor_id][frame_number]['power_up'] = item_name
-            self.parser.player_data[player_actor_id][frame_number]['power_up_active'] = item_active
+            self.parser.player_data[player_actor_id].set(frame_number, 'power_up', item_name)
+            self.parser.player_data[player_actor_id].set(frame_number, 'power_up_active', item_active)
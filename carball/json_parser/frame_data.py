@@ -0,0 +1,185 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# marks frames that have no value for a column, pandas reads it as NaN just like the gaps from_dict fills in
+_MISSING = float('nan')
+
+
+class FrameDataTable:
+    """
+    Columnar store for the frame-by-frame data of a single object (a player, the ball or the game itself).
+
+    The actor handlers write values straight into one preallocated list per key, indexed by frame number.
+    Building the DataFrame then only has to select the frames that have data,
+    instead of converting hundreds of thousands of small per-frame dicts.
+
+    The DataFrame has the same index, columns and dtypes as pd.DataFrame.from_dict(..., orient='index')
+    on the old {frame_number: {key: value}} dicts.
+    The frames before first_frame are not stored, the DataFrame then has the same columns and dtypes as if they were
+    and its rows are those from first_frame on.
+    """
+
+    def __init__(self, num_frames: int = 0, first_frame: int = 0):
+        """
+        :param num_frames: Expected number of frames, the columns grow if more frames are written.
+        :param first_frame: The first frame that is stored, the columns only hold the frames from this one on.
+        """
+        self.first_frame = first_frame
+        self._capacity = max(num_frames - first_frame, 1)
+        self._rows = set()
+        self._columns: Dict[str, List[Any]] = {}
+        # what the frames before first_frame would have added to the columns
+        self._skipped_columns: Dict[str, _SkippedColumn] = {}
+        self._skipped_rows = 0
+        self._last_skipped_frame = None
+
+    def __contains__(self, frame_number: int) -> bool:
+        return frame_number in self._rows
+
+    def new_row(self, frame_number: int):
+        """
+        Creates the row for this frame, any values already written to the row are cleared.
+        """
+        if frame_number < self.first_frame:
+            return
+        row = frame_number - self.first_frame
+        if row >= self._capacity:
+            self._grow(row + 1)
+        if frame_number in self._rows:
+            for values in self._columns.values():
+                values[row] = _MISSING
+        else:
+            self._rows.add(frame_number)
+
+    def set_row(self, frame_number: int, data_dict: dict):
+        """
+        Replaces the row for this frame with the values in data_dict.
+        """
+        self.new_row(frame_number)
+        self.update(frame_number, data_dict)
+
+    def set(self, frame_number: int, key: str, value: Any):
+        """
+        Writes a single value, the row must have been created with new_row first.
+
+        :raises KeyError: if the row does not exist.
+        """
+        if frame_number < self.first_frame:
+            self._skip(frame_number, key, value)
+            return
+        if frame_number not in self._rows:
+            raise KeyError(frame_number)
+        values = self._columns.get(key)
+        if values is None:
+            values = self._columns[key] = [_MISSING] * self._capacity
+        values[frame_number - self.first_frame] = value
+
+    def update(self, frame_number: int, data_dict: dict):
+        for key, value in data_dict.items():
+            self.set(frame_number, key, value)
+
+    def get(self, frame_number: int, key: str, default: Any = None) -> Any:
+        """
+        :return: The value written for key at this frame, or default if nothing (or None) was written.
+        """
+        values = self._columns.get(key)
+        if values is None or frame_number not in self._rows:
+            return default
+        value = values[frame_number - self.first_frame]
+        if value is _MISSING or value is None:
+            return default
+        return value
+
+    def get_last_value(self, key: str, frame_number: int, default: Any = None) -> Any:
+        """
+        :return: The most recent value that is not None written for key before this frame, or default.
+        """
+        values = self._columns.get(key)
+        if values is None:
+            return default
+        for row in range(min(frame_number - self.first_frame, self._capacity) - 1, -1, -1):
+            value = values[row]
+            if value is not _MISSING and value is not None:
+                return value
+        return default
+
+    def to_data_frame(self) -> pd.DataFrame:
+        # the columns written to before first_frame appeared first
+        columns = {key: skipped.first_frame for key, skipped in self._skipped_columns.items()}
+        for key, values in self._columns.items():
+            if key in columns:
+                continue
+            first_row = next((row for row, value in enumerate(values) if value is not _MISSING), None)
+            if first_row is not None:
+                columns[key] = self.first_frame + first_row
+        if len(columns) == 0:
+            return pd.DataFrame.from_dict({}, orient='index')
+
+        # rows without any values are dropped
+        index = sorted(frame_number for frame_number in self._rows
+                       if any(key in self._columns and self._columns[key][frame_number - self.first_frame]
+                              is not _MISSING for key in columns))
+        rows = [frame_number - self.first_frame for frame_number in index]
+
+        data = {}
+        # columns are ordered by the first frame they appear in, then by the order they were first written
+        for key in sorted(columns, key=columns.get):
+            values = self._columns.get(key)
+            column = [_MISSING] * len(rows) if values is None else [values[row] for row in rows]
+            samples = self._get_skipped_samples(key)
+            if len(samples) > 0:
+                # pandas infers the dtype with the values of the frames before first_frame, which are then dropped
+                column = pd.Series(samples + column).values[len(samples):]
+            # pandas infers the dtypes exactly as from_dict does (e.g. ints with gaps -> float64, only bools -> bool)
+            data[key] = column
+        return pd.DataFrame(data, index=pd.Index(np.array(index, dtype=np.int64)))
+
+    def _skip(self, frame_number: int, key: str, value: Any):
+        if frame_number != self._last_skipped_frame:
+            self._last_skipped_frame = frame_number
+            self._skipped_rows += 1
+        skipped = self._skipped_columns.get(key)
+        if skipped is None:
+            skipped = self._skipped_columns[key] = _SkippedColumn(frame_number)
+        skipped.add(frame_number, value)
+
+    def _get_skipped_samples(self, key: str) -> List[Any]:
+        """
+        :return: Values with the types of the values of the column before first_frame.
+        """
+        skipped = self._skipped_columns.get(key)
+        if skipped is None:
+            return [_MISSING] if self._skipped_rows > 0 else []
+        samples = list(skipped.samples.values())
+        if skipped.num_frames < self._skipped_rows:
+            samples.append(_MISSING)
+        return samples
+
+    def _grow(self, min_capacity: int):
+        capacity = max(min_capacity, self._capacity * 2)
+        for values in self._columns.values():
+            values.extend([_MISSING] * (capacity - self._capacity))
+        self._capacity = capacity
+
+
+class _SkippedColumn:
+    """
+    The values written to a column of a FrameDataTable before its first_frame, only as much of them as decides
+    the order and the dtype of the column.
+    """
+    __slots__ = ('first_frame', 'num_frames', 'samples', '_last_frame')
+
+    def __init__(self, first_frame: int):
+        self.first_frame = first_frame
+        self.num_frames = 0
+        # a value of each type, and every string as they become the categories of the compact schema
+        self.samples: Dict[Any, Any] = {}
+        self._last_frame = None
+
+    def add(self, frame_number: int, value: Any):
+        if frame_number != self._last_frame:
+            self._last_frame = frame_number
+            self.num_frames += 1
+        self.samples.setdefault(value if isinstance(value, str) else type(value), value)
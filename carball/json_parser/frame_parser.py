@@ -1,4 +1,5 @@
 from .actor import *
+from .frame_data import FrameDataTable
 
 REPLICATED_RB_STATE_KEY = 'TAGame.RBActor_TA:ReplicatedRBState'
 
@@ -33,8 +34,14 @@ _0_DELTA_HANDLERS = [
 ]
 
 
-def parse_frames(game):
+def parse_frames(game, release_frames: bool = False, first_frame: int = 0, last_frame: int = None):
     """
+    :param game: The game, its replay_data may be a list of network frames or any iterable yielding them.
+    :param release_frames: If True and the network frames are a list, each frame is removed from the list
+        as soon as it has been parsed, so the JSON of the parsed frames does not stay in memory.
+    :param first_frame: The frames of the players are only stored from this one on,
+        the earlier frames are still parsed for the actors (e.g. the players and their cars).
+    :param last_frame: If set, the frames after this one are not parsed.
     :return: all_data = {
         'player_ball_data': player_ball_data,
         'player_dicts': player_dicts,
@@ -46,14 +53,12 @@ def parse_frames(game):
 
     player_ball_data format:
     {
-    'ball': {frame_number: {pos_x, pos_y ...}, f_no2: {...} ...,}
-    player_actor_id: {
-        frame_number: {
+    'ball': FrameDataTable(pos_x, pos_y ...),
+    player_actor_id: FrameDataTable(
             pos_x, pos_y ...,
             throttle, steer, ...,
             ping, ball_cam
-        },
-        f_no2: {...} ...,
+        ),
     }
 
     currently implemented:
@@ -62,12 +67,13 @@ def parse_frames(game):
 
     player_dicts  = {player_actor_id : {actor_data}, player_actor_id_2: {actor_data_2}}
     team_dicts = {team_actor_id: {actor_data, 'colour':'blue'/'orange', also includes name}
-    frames_data = {frame_number: {time, delta, seconds_remaining, is_overtime, ball_has_been_hit}
+    frames_data = FrameDataTable(time, delta, seconds_remaining, is_overtime, ball_has_been_hit)
     cameras_data = {player_actor_id: actor_data}
     demos_data = {frame_number: demolish_data}
 
     """
-    parser = FrameParser(game.replay_data, game)
+    parser = FrameParser(game.replay_data, game, release_frames=release_frames, first_frame=first_frame,
+                         last_frame=last_frame)
     parser.parse_frames()
 
     player_ball_data = parser.player_data
@@ -90,8 +96,12 @@ def parse_frames(game):
 
 class FrameParser(object):
 
-    def __init__(self, replay_frames, game):
+    def __init__(self, replay_frames, game, release_frames: bool = False, first_frame: int = 0,
+                 last_frame: int = None):
         self.replay_frames = replay_frames
+        self.release_frames = release_frames
+        self.first_frame = first_frame
+        self.last_frame = last_frame
         self.game = game
         self.replay_version = game.replay_version
         self.objects = game.replay['objects']
@@ -101,9 +111,15 @@ class FrameParser(object):
         self.game_info_actor = None
         self.soccar_game_event_actor = None
 
-        self.frames_data = {}
-        self.ball_data = {}
-        self.player_data = {}
+        # frame-by-frame data, each is stored in a FrameDataTable with one row per frame
+        # streamed frames have no length, the tables grow as frames come in
+        self.num_frames = len(replay_frames) if hasattr(replay_frames, '__len__') else 0
+        if last_frame is not None:
+            self.num_frames = min(self.num_frames, last_frame + 1)
+        # the frames of the game and the ball are kept from the start, the kickoffs are found from them
+        self.frames_data = FrameDataTable(self.num_frames)
+        self.ball_data = FrameDataTable(self.num_frames)
+        self.player_data = {}  # player_actor_id: FrameDataTable
 
         # dictionaries to contain data in frames
         self.parties = {}
@@ -122,6 +138,9 @@ class FrameParser(object):
 
         self.actors = {}
 
+        # object_id: (class_name, handler_entry), filled in the first time an object is seen, see _get_actor_type
+        self._actor_types = {}
+
         self.dropshot = {
             'tile_states': {},
             'damage_events': {},
@@ -136,9 +155,14 @@ class FrameParser(object):
         handlers = [dict() for _ in range(len(_PRIORITY_HANDLERS) + 1)]
         handled_actors = set()
 
+        actors = self.actors
+        objects = self.objects
+
         current_goal_number = 0
 
-        for i, frame in enumerate(self.replay_frames):
+        for i, frame in enumerate(self._iterate_frames()):
+            if self.last_frame is not None and i > self.last_frame:
+                break
             time = frame['time']
             delta = frame['delta']
 
@@ -148,40 +172,31 @@ class FrameParser(object):
                 handled_actors.discard(actor_id)
                 self.player_car_ids.pop(actor_id, None)
                 self.car_player_ids.pop(actor_id, None)
-                self.actors.pop(actor_id, None)
+                actors.pop(actor_id, None)
 
             for new_actor in frame['new_actors']:
                 actor_id = new_actor['actor_id']
-                object_name = self.objects[new_actor['object_id']]
-                self.actors[actor_id] = {
+                object_id = new_actor['object_id']
+                class_name, handler_entry = self._get_actor_type(object_id)
+                actors[actor_id] = {
                     'Id': actor_id,
-                    'TypeName': object_name,
-                    'ClassName': OBJECT_CLASSES.get(object_name, None),
+                    'TypeName': objects[object_id],
+                    'ClassName': class_name,
                     'Name': self.names[new_actor['name_id']],
                 }
 
-                handler = next(filter(lambda handler_cls: handler_cls.can_handle(self.actors[actor_id]),
-                                      _HANDLERS), None)
-
-                if handler is not None:
-                    try:
-                        priority = _PRIORITY_HANDLERS.index(handler)
-                    except ValueError:
-                        priority = len(_PRIORITY_HANDLERS)
-
-                    handlers[priority][actor_id] = handler(self), handler in _0_DELTA_HANDLERS
+                if handler_entry is not None:
+                    handler, priority, handles_0_delta = handler_entry
+                    handlers[priority][actor_id] = handler(self), handles_0_delta
                     handled_actors.add(actor_id)
 
             for updated in frame['updated_actors']:
-                actor_id = updated['actor_id']
-
-                if actor_id not in self.actors:
+                actor = actors.get(updated['actor_id'])
+                if actor is None:
                     continue
 
-                actor = self.actors[actor_id]
-                prop_name = self.objects[updated['object_id']]
                 # update property
-                actor[prop_name] = find_actual_value(updated['attribute'])
+                actor[objects[updated['object_id']]] = find_actual_value(updated['attribute'])
 
             # stop data collection after goal
             try:
@@ -189,7 +204,7 @@ class FrameParser(object):
                     # set all players to sleeping after goal
                     for car_actor_id in self.car_player_ids:
                         try:
-                            car = self.actors[car_actor_id]
+                            car = actors[car_actor_id]
                             car[REPLICATED_RB_STATE_KEY]['Sleeping'] = True
                         except KeyError as e:
                             # Ignore the case where the car does not have a REPLICATED_RB_STATE_KEY
@@ -206,17 +221,62 @@ class FrameParser(object):
 
                     # skip 0 delta frames, except for these two handlers (matches old implementation)
                     if handler_tuple[1] or delta != 0:
-                        handler.update(self.actors[actor_id], i, time, delta)
+                        handler.update(actors[actor_id], i, time, delta)
 
             self.current_car_ids_to_collect.clear()
 
+    def _iterate_frames(self):
+        """
+        Yields the network frames, dropping each one from replay_frames once it has been parsed if release_frames is set.
+        The actors keep the latest value of every attribute they were sent, which may be a part of an earlier frame,
+        everything else in the frame is freed right away.
+        """
+        if not self.release_frames or not isinstance(self.replay_frames, list):
+            yield from self.replay_frames
+            return
+
+        frames = self.replay_frames
+        for i in range(len(frames)):
+            frame = frames[i]
+            frames[i] = None
+            yield frame
+            del frame
+        frames.clear()
+
+    def _get_actor_type(self, object_id: int):
+        """
+        Handlers only look at the TypeName and ClassName of an actor, which both follow from its object id.
+        So the handler is looked up once per object id and reused for every actor of that object.
+
+        :return: (class_name, handler_entry) where handler_entry is (handler, priority, handles_0_delta)
+            or None if no handler can handle the actor.
+        """
+        actor_type = self._actor_types.get(object_id)
+        if actor_type is None:
+            object_name = self.objects[object_id]
+            class_name = OBJECT_CLASSES.get(object_name, None)
+            actor = {'TypeName': object_name, 'ClassName': class_name}
+            handler = next(filter(lambda handler_cls: handler_cls.can_handle(actor), _HANDLERS), None)
+
+            handler_entry = None
+            if handler is not None:
+                try:
+                    priority = _PRIORITY_HANDLERS.index(handler)
+                except ValueError:
+                    priority = len(_PRIORITY_HANDLERS)
+                handler_entry = handler, priority, handler in _0_DELTA_HANDLERS
+
+            actor_type = self._actor_types[object_id] = class_name, handler_entry
+        return actor_type
+
+
+_FLAGGED_ATTRIBUTE_TYPES = {'Flagged', 'FlaggedByte'}
+
 
 def find_actual_value(attribute: dict):
-    item = list(attribute.items())[0]
-    attribute_type = item[0]
-    attribute_value = item[1]
+    attribute_type, attribute_value = next(iter(attribute.items()))
 
-    if attribute_type == 'Flagged' or attribute_type == 'FlaggedByte':
+    if attribute_type in _FLAGGED_ATTRIBUTE_TYPES:
         return attribute_value[1]
     return attribute_value
 
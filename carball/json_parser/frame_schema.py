@@ -0,0 +1,45 @@
+"""
+The dtypes of the frames of the players and the ball.
+
+As parsed every number is a float64 and the flags that are missing in some frames are python objects.
+The compact schema stores them in the smallest dtype that holds the values the replay can have:
+    positions, velocities, rotations and inputs as float32 (the replay itself stores them with less precision),
+    flags as float16, which holds the component states (0-255) exactly and NaN for the frames without a car,
+    the power up names as categories and the ping as a nullable integer.
+Columns that are not in the schema keep their dtype.
+"""
+import numpy as np
+import pandas as pd
+
+FLOAT_COLUMNS = ['pos_x', 'pos_y', 'pos_z',
+                 'vel_x', 'vel_y', 'vel_z',
+                 'ang_vel_x', 'ang_vel_y', 'ang_vel_z',
+                 'rot_x', 'rot_y', 'rot_z',
+                 'quat_w', 'quat_x', 'quat_y', 'quat_z',
+                 'throttle', 'steer', 'boost']
+FLAG_COLUMNS = ['ball_cam', 'boost_active', 'dodge_active', 'double_jump_active', 'handbrake', 'jump_active',
+                'power_up_active']
+CATEGORY_COLUMNS = ['power_up']
+INTEGER_COLUMNS = ['ping']
+
+
+def apply_compact_schema(data_frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    :param data_frame: The frames of a single player or of the ball.
+    :return: The frames with the dtypes of the compact schema, data_frame is not changed.
+    """
+    dtypes = {}
+    for column in data_frame.columns:
+        if column in FLOAT_COLUMNS:
+            dtypes[column] = np.float32
+        elif column in FLAG_COLUMNS:
+            # columns without missing frames are already bools
+            if data_frame[column].dtype != bool:
+                dtypes[column] = np.float16
+        elif column in CATEGORY_COLUMNS:
+            dtypes[column] = 'category'
+        elif column in INTEGER_COLUMNS:
+            dtypes[column] = 'Int16'
+    if len(dtypes) == 0:
+        return data_frame
+    return data_frame.astype(dtypes)
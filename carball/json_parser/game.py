@@ -4,13 +4,12 @@ import re
 from datetime import datetime
 from typing import List
 
-import pandas as pd
-
 from .goal import Goal
 from .player import Player
 from .team import Team
 from .game_info import GameInfo
 from .frame_parser import parse_frames
+from .frame_schema import apply_compact_schema
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +35,7 @@ class Game:
         self.replay_data = None
 
         self.teams: List[Team] = None  # Added in parse_all_data
+        self.game_info: GameInfo = None  # Added in parse_all_data
         self.players: List[Player] = None
         self.goals: List[Goal] = None
         self.primary_player: dict = None
@@ -49,14 +49,23 @@ class Game:
         self.parties = None
         self.dropshot = None
 
-    def initialize(self, file_path='', loaded_json=None, parse_replay: bool = True, clean_player_names: bool = False):
+    def initialize(self, file_path='', loaded_json=None, parse_replay: bool = True, clean_player_names: bool = False,
+                   release_frames: bool = False, full_precision: bool = False, first_frame: int = 0,
+                   last_frame: int = None):
         """
         Initializes the Game object by processing the replay's json file, which finds and copies all relevant data.
 
         :param file_path: The (string) path to the replay's json file.
-        :param loaded_json: The replay's json file.
+        :param loaded_json: The replay's json file. Its network frames may also be an iterator, to stream them in.
         :param parse_replay: Boolean - should the replay be parsed?
         :param clean_player_names: Boolean - should the player names be cleared?
+        :param release_frames: Boolean - should each network frame be released as soon as it is parsed?
+            This empties the network frames of loaded_json, but keeps memory use low on long replays.
+        :param full_precision: Boolean - should the frames keep every number as float64?
+            By default they are stored compactly, see frame_schema.
+        :param first_frame: Only keep the frames of the players from this one on, e.g. for an analysis of the end
+            of the replay. The frames of the ball and the game are kept for all of the frames parsed.
+        :param last_frame: Only parse the frames up to this one, e.g. for an analysis of the start of the replay.
         """
 
         self.file_path = file_path
@@ -68,7 +77,8 @@ class Game:
 
         logger.debug('Loaded JSON')
 
-        self.replay_data = self.replay['network_frames']['frames']
+        # the header of the replay (see replay_header) has no network frames
+        self.replay_data = self.replay['network_frames']['frames'] if 'network_frames' in self.replay else None
 
         # set properties
         self.properties = self.replay['properties']
@@ -102,9 +112,12 @@ class Game:
         self.primary_player: dict = self.get_primary_player()
 
         if parse_replay:
-            self.all_data = parse_frames(self)
-            self.parse_all_data(self.all_data, clean_player_names)
+            self.all_data = parse_frames(self, release_frames=release_frames, first_frame=first_frame,
+                                         last_frame=last_frame)
+            self.parse_all_data(self.all_data, clean_player_names, full_precision)
             logger.info("Finished parsing %s" % self)
+        else:
+            self.create_teams_from_properties()
 
     def __repr__(self):
         team_0_name = self.teams[0].name
@@ -123,6 +136,29 @@ class Game:
             pass
         return players
 
+    def create_teams_from_properties(self):
+        """
+        Creates the teams from the scores and the players of the properties, for when the frames are not parsed.
+        Everything else that is only in the network frames (e.g. the game info, the demos and the parties) is left empty.
+        The PlayerStats of the header can miss players (e.g. only half of them in some replays),
+        the teams then only have the players it lists.
+        """
+        if len(self.players) < 2 * self.team_size:
+            logger.warning('The header only lists %s players of the %s in a %sv%s game, '
+                           'the others are only in the network frames.',
+                           len(self.players), 2 * self.team_size, self.team_size, self.team_size)
+        self.teams = []
+        for is_orange in [False, True]:
+            team = Team()
+            team.is_orange = is_orange
+            team.score = self.properties.get('Team1Score' if is_orange else 'Team0Score', 0)
+            for player in self.players:
+                if player.is_orange == is_orange:
+                    team.add_player(player)
+            self.teams.append(team)
+        self.demos = []
+        self.parties = {}
+
     def get_primary_player(self):
         owner_name = self.properties.get('PlayerName')
         if owner_name is not None:
@@ -153,11 +189,12 @@ class Game:
         return goals_list
 
 
-    def parse_all_data(self, all_data, clean_player_names: bool) -> None:
+    def parse_all_data(self, all_data, clean_player_names: bool, full_precision: bool = False) -> None:
         """
         Finishes parsing after frame-parsing is done.
         E.g. Adds players not found in MatchStats metadata
         :param all_data: Dict returned by parse_replay
+        :param full_precision: Keep every number of the frames as float64 instead of applying the compact schema.
         :return:
         """
         # GAME INFO
@@ -205,7 +242,7 @@ class Game:
                     if not goal.player and goal.player_name == found_player.name:
                         goal.player = found_player
 
-            found_player.parse_data(all_data['player_ball_data'][_player_actor_id])
+            found_player.parse_data(all_data['player_ball_data'][_player_actor_id], full_precision)
             # camera_settings might not exist (see 0AF8AC734890E6D3995B829E474F9924)
             found_player.get_camera_settings(all_data['cameras_data'].get(_player_actor_id, {}))
             found_player.get_data_from_car(all_data['car_dicts'].get(_player_actor_id, None))
@@ -227,10 +264,12 @@ class Game:
                 goal.player = goal.get_player(self)
 
         # BALL
-        self.ball = pd.DataFrame.from_dict(self.all_data['player_ball_data']['ball'], orient='index')
+        self.ball = self.all_data['player_ball_data']['ball'].to_data_frame()
+        if not full_precision:
+            self.ball = apply_compact_schema(self.ball)
 
         # FRAMES
-        self.frames = pd.DataFrame.from_dict(self.all_data['frames_data'], orient='index')
+        self.frames = self.all_data['frames_data'].to_data_frame()
 
         # DEMOS
         self.demos = []
@@ -1,11 +1,11 @@
 import logging
 from typing import TYPE_CHECKING, List
 
-import pandas as pd
-
 from carball.json_parser.bots import get_bot_map, get_online_id_for_bot
+from carball.json_parser.frame_schema import apply_compact_schema
 
 if TYPE_CHECKING:
+    from .frame_data import FrameDataTable
     from .team import Team
 
 logger = logging.getLogger(__name__)
@@ -209,42 +209,47 @@ class Player:
                 })
         logger.debug('Loadout for %s: %s', self.name, self.loadout)
 
-    def parse_data(self, _dict: dict):
+    def parse_data(self, frame_data: 'FrameDataTable', full_precision: bool = False):
         """
         ['ping', 'pos_x', 'pos_y', 'pos_z', 'rot_x', 'rot_y', 'rot_z', 'vel_x',
         'vel_y', 'vel_z', 'ang_vel_x', 'ang_vel_y', 'ang_vel_z', 'throttle',
         'steer', 'handbrake', 'ball_cam', 'dodge_active', 'double_jump_active',
         'jump_active', 'boost', 'boost_active', 'power_up', 'power_up_active']
 
-        {'ang_vel_x': dtype('float64'),
-         'ang_vel_y': dtype('float64'),
-         'ang_vel_z': dtype('float64'),
-         'ball_cam': dtype('O'),
-         'boost': dtype('float64'),
-         'boost_active': dtype('O'),
-         'dodge_active': dtype('O'),
-         'double_jump_active': dtype('O'),
-         'handbrake': dtype('O'),
-         'jump_active': dtype('O'),
-         'ping': dtype('int64'),
-         'pos_x': dtype('float64'),
-         'pos_y': dtype('float64'),
-         'pos_z': dtype('float64'),
-         'rot_x': dtype('float64'),
-         'rot_y': dtype('float64'),
-         'rot_z': dtype('float64'),
-         'steer': dtype('float64'),
-         'throttle': dtype('float64'),
-         'vel_x': dtype('float64'),
-         'vel_y': dtype('float64'),
-         'vel_z': dtype('float64'),
-         'power_up': dtype('O'),
-         'power_up_active': dtype('O')}
+        {'ang_vel_x': dtype('float32'),
+         'ang_vel_y': dtype('float32'),
+         'ang_vel_z': dtype('float32'),
+         'ball_cam': dtype('float16'),
+         'boost': dtype('float32'),
+         'boost_active': dtype('float16'),
+         'dodge_active': dtype('float16'),
+         'double_jump_active': dtype('float16'),
+         'handbrake': dtype('float16'),
+         'jump_active': dtype('float16'),
+         'ping': Int16Dtype(),
+         'pos_x': dtype('float32'),
+         'pos_y': dtype('float32'),
+         'pos_z': dtype('float32'),
+         'rot_x': dtype('float32'),
+         'rot_y': dtype('float32'),
+         'rot_z': dtype('float32'),
+         'steer': dtype('float32'),
+         'throttle': dtype('float32'),
+         'vel_x': dtype('float32'),
+         'vel_y': dtype('float32'),
+         'vel_z': dtype('float32'),
+         'power_up': CategoricalDtype(),
+         'power_up_active': dtype('float16')}
+
+        With full_precision the numbers are float64 and the flags and power_up are objects.
 
-        :param _dict:
+        :param frame_data: The player's frame-by-frame data collected by the FrameParser.
+        :param full_precision: Keep every number as float64 instead of applying the compact schema.
         :return:
         """
-        self.data = pd.DataFrame.from_dict(_dict, orient='index')
+        self.data = frame_data.to_data_frame()
+        if not full_precision:
+            self.data = apply_compact_schema(self.data)
 
     def get_data_from_car(self, car_data):
         if car_data is None:
@@ -0,0 +1,110 @@
+"""
+Reads the header of a replay file (its versions and properties) without the network frames.
+
+The result has the same keys and values as the header of the json from boxcars (decompile_replay),
+e.g. the QWord properties (like the OnlineID of a player) are strings and the Byte properties are dicts of kind and value,
+so Game can be initialized from it with parse_replay=False.
+"""
+import struct
+from typing import Dict
+
+# the properties (and the items of the array properties) end with a property of this name
+_END_KEYS = ('None', '\0\0\0None')
+# the one byte property that is stored without its enum name
+_UNNAMED_BYTE_PROPERTIES = ('OnlinePlatform_Steam', 'OnlinePlatform_PS4')
+
+
+class ReplayHeaderError(ValueError):
+    pass
+
+
+class _HeaderReader:
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def read(self, fmt: str):
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values[0]
+
+    def read_string(self) -> str:
+        size = self.read('<i')
+        if size == 0x05000000:
+            # some replays store the end key as "\0\0\0None" with a broken size
+            size = 8
+        if size < 0:
+            data = self._take(-size * 2)
+            text = data.decode('utf-16-le')
+        else:
+            data = self._take(size)
+            try:
+                text = data.decode('windows-1252')
+            except UnicodeDecodeError:
+                text = data.decode('latin-1')
+        # the size includes the null at the end
+        return text[:-1] if text.endswith('\0') else text
+
+    def read_properties(self) -> Dict:
+        properties = {}
+        while True:
+            key = self.read_string()
+            if key in _END_KEYS:
+                return properties
+            kind = self.read_string()
+            size = self.read('<Q')
+            properties[key] = self.read_property(kind, size)
+
+    def read_property(self, kind: str, size: int):
+        if kind == 'ArrayProperty':
+            return [self.read_properties() for _ in range(self.read('<i'))]
+        if kind == 'BoolProperty':
+            return self.read('<B') != 0
+        if kind == 'ByteProperty':
+            name = self.read_string()
+            if name in _UNNAMED_BYTE_PROPERTIES:
+                return {'kind': 'OnlinePlatform', 'value': name}
+            return {'kind': name, 'value': self.read_string()}
+        if kind == 'FloatProperty':
+            return self.read('<f')
+        if kind == 'IntProperty':
+            return self.read('<i')
+        if kind in ('NameProperty', 'StrProperty'):
+            return self.read_string()
+        if kind == 'QWordProperty':
+            return str(self.read('<Q'))
+        if kind == 'StructProperty':
+            return {'name': self.read_string(), 'fields': self.read_properties()}
+        raise ReplayHeaderError("Unknown property type %s" % kind)
+
+    def _take(self, size: int) -> bytes:
+        if size < 0 or self.offset + size > len(self.data):
+            raise ReplayHeaderError("Replay header is truncated")
+        data = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return data
+
+
+def parse_replay_header(data: bytes) -> Dict:
+    """
+    :param data: The contents of the replay file, only the header is read.
+    :return: A dict with the header_size, header_crc, major_version, minor_version, net_version (if the replay has it),
+        game_type and properties of the replay.
+    :raises ReplayHeaderError: if the header can not be read.
+    """
+    reader = _HeaderReader(data)
+    try:
+        header = {
+            'header_size': reader.read('<i'),
+            'header_crc': reader.read('<I'),
+            'major_version': reader.read('<i'),
+            'minor_version': reader.read('<i'),
+        }
+        if header['major_version'] > 865 and header['minor_version'] > 17:
+            header['net_version'] = reader.read('<i')
+        header['game_type'] = reader.read_string()
+        header['properties'] = reader.read_properties()
+    except struct.error as e:
+        raise ReplayHeaderError("Replay header is truncated") from e
+    return header
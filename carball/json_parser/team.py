@@ -15,7 +15,8 @@ class Team:
         self.score = None
         self.actor_id = None
 
-        self.players = set()
+        # a list, so the players of the team are always in the order they were found in
+        self.players = []
 
     def __repr__(self):
         if self.is_orange is not None:
@@ -37,5 +38,6 @@ class Team:
         return self
 
     def add_player(self, player: 'Player'):
-        self.players.add(player)
+        if player not in self.players:
+            self.players.append(player)
         player.team = self
@@ -0,0 +1,75 @@
+import os
+from contextlib import nullcontext
+from tempfile import TemporaryDirectory
+
+from carball.analysis.analysis_manager import BaseAnalysisManager
+from carball.analysis_cache import AnalysisCache, CachedAnalysisManager, PROTO_EXTENSION
+from carball.decompile_replays import analyze_replay_file
+from carball.generated.api import game_pb2
+from carball.tests.utils import get_replay_path, get_raw_replays
+
+
+class Test_AnalysisCache():
+
+    def test_cached_analysis_matches(self):
+        replay_path = get_replay_path(get_raw_replays()["1_DEMO"][0])
+        with TemporaryDirectory() as directory:
+            cache = AnalysisCache(directory)
+            analysis_manager = analyze_replay_file(replay_path, cache=cache)
+            assert not isinstance(analysis_manager, CachedAnalysisManager)
+
+            cached_analysis_manager = analyze_replay_file(replay_path, cache=cache)
+            assert isinstance(cached_analysis_manager, CachedAnalysisManager)
+            # the stats can be NaN, which is never equal to itself
+            assert cached_analysis_manager.get_protobuf_data().SerializeToString() == \
+                analysis_manager.get_protobuf_data().SerializeToString()
+            assert cached_analysis_manager.df_bytes == analysis_manager.df_bytes
+            assert cached_analysis_manager.get_data_frame().shape == analysis_manager.get_data_frame().shape
+
+            # different options must not share an entry
+            analysis_manager = analyze_replay_file(replay_path, cache=cache, clean=False)
+            assert not isinstance(analysis_manager, CachedAnalysisManager)
+
+    def test_evicts_all_entries_if_too_big(self):
+        with TemporaryDirectory() as directory:
+            cache = AnalysisCache(directory, max_size=0)
+            replay_path = get_replay_path(get_raw_replays()["1_DEMO"][0])
+            analyze_replay_file(replay_path, cache=cache)
+            assert os.listdir(directory) == []
+
+    def test_evicts_least_recently_used(self):
+        with TemporaryDirectory() as directory:
+            cache = AnalysisCache(directory)
+            for index, key in enumerate(['first', 'second', 'third']):
+                protobuf_game = game_pb2.Game()
+                protobuf_game.game_metadata.id = key
+                cache.store(key, BaseAnalysisManager(protobuf_game))
+                # the modification time is the last use, spaced out as file times may only have a precision of seconds
+                os.utime(os.path.join(directory, key + PROTO_EXTENSION), (1000 * (index + 1), 1000 * (index + 1)))
+            entry_size = os.path.getsize(os.path.join(directory, 'first' + PROTO_EXTENSION))
+
+            assert cache.load('first').get_protobuf_data().game_metadata.id == 'first'
+            cache.max_size = 2 * entry_size
+            cache.evict()
+
+            assert cache.load('second') is None
+            assert cache.load('first') is not None
+            assert cache.load('third') is not None
+
+    def test_evict_skips_removed_files(self, monkeypatch):
+        with TemporaryDirectory() as directory:
+            cache = AnalysisCache(directory)
+            cache.store('first', BaseAnalysisManager(game_pb2.Game()))
+            scandir = os.scandir
+
+            def scandir_then_remove(path):
+                # another process evicts the entry after the directory was listed
+                files = list(scandir(path))
+                for file in files:
+                    os.remove(file.path)
+                return nullcontext(files)
+
+            monkeypatch.setattr(os, 'scandir', scandir_then_remove)
+            cache.max_size = 0
+            cache.evict()
+            assert cache.load('first') is None
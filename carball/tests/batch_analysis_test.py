@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import shutil
+import time
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from carball import batch_analysis
+from carball.batch_analysis import analyze_replay_directory, analyze_replay_files
+from carball.generated.api import game_pb2
+from carball.tests.utils import get_replay_path, get_raw_replays
+
+# the workers only see a patched analyze_replay_file if they are forked from the test process
+requires_fork = pytest.mark.skipif(multiprocessing.get_context().get_start_method() != 'fork',
+                                   reason="the workers are not forked")
+
+
+class _FakeAnalysis:
+
+    def __init__(self, replay_path: str):
+        self.proto_game = game_pb2.Game()
+        self.proto_game.game_metadata.id = os.path.basename(replay_path)
+
+    def get_protobuf_data(self) -> game_pb2.Game:
+        return self.proto_game
+
+
+def _fake_analyze_replay_file(replay_path: str, **kwargs):
+    if 'SLOW' in replay_path:
+        time.sleep(60)
+    if 'CRASH' in replay_path:
+        os._exit(3)
+    return _FakeAnalysis(replay_path)
+
+
+class Test_BatchAnalysis():
+
+    def test_analyze_replay_directory(self):
+        replays = get_raw_replays()["KICKOFF_NO_TOUCH"] + get_raw_replays()["1_DEMO"]
+        with TemporaryDirectory() as directory:
+            for replay in replays:
+                shutil.copy(get_replay_path(replay), directory)
+            with open(os.path.join(directory, 'BROKEN.replay'), 'wb') as f:
+                f.write(b'not a replay')
+
+            results = {os.path.basename(result.replay_path): result
+                       for result in analyze_replay_directory(directory, max_workers=2, include_data_frame=True)}
+
+        assert sorted(results.keys()) == sorted(replays + ['BROKEN.replay'])
+        assert results['BROKEN.replay'].error is not None
+        for replay in replays:
+            result = results[replay]
+            assert result.error is None
+            assert result.data_frame_bytes is not None
+            proto_game = game_pb2.Game()
+            proto_game.ParseFromString(result.proto_bytes)
+            assert len(proto_game.players) > 0
+
+    @requires_fork
+    def test_timed_out_worker_is_replaced(self, monkeypatch):
+        monkeypatch.setattr(batch_analysis, 'analyze_replay_file', _fake_analyze_replay_file)
+        start = time.monotonic()
+        results = list(analyze_replay_files(['SLOW.replay', 'NEXT.replay'], max_workers=1, timeout=1))
+
+        assert time.monotonic() - start < 30
+        assert [result.replay_path for result in results] == ['SLOW.replay', 'NEXT.replay']
+        assert 'Timed out' in results[0].error
+        assert results[1].error is None
+        proto_game = game_pb2.Game()
+        proto_game.ParseFromString(results[1].proto_bytes)
+        assert proto_game.game_metadata.id == 'NEXT.replay'
+
+    @requires_fork
+    def test_crashed_worker_is_replaced(self, monkeypatch):
+        monkeypatch.setattr(batch_analysis, 'analyze_replay_file', _fake_analyze_replay_file)
+        results = list(analyze_replay_files(['CRASH.replay', 'NEXT.replay'], max_workers=1))
+
+        assert [result.replay_path for result in results] == ['CRASH.replay', 'NEXT.replay']
+        assert 'crashed' in results[0].error
+        assert '3' in results[0].error
+        assert results[1].error is None
+        proto_game = game_pb2.Game()
+        proto_game.ParseFromString(results[1].proto_bytes)
+        assert proto_game.game_metadata.id == 'NEXT.replay'
@@ -1,5 +1,7 @@
+from carball.json_parser.frame_parser import parse_frames
+from carball.json_parser.game import Game
 from carball.tests.utils import get_replay_path
-from carball.decompile_replays import analyze_replay_file
+from carball.decompile_replays import analyze_replay_file, decompile_replay
 
 """
 This file is doing benchmarking for the main replay varieties. The tests are run via the benchmarking GitHub action.
@@ -43,3 +45,12 @@ def test_intensive_oce_rlcs(benchmark):
 
     benchmark.pedantic(analyze_replay_file,
                        kwargs={"replay_path":replay_path, "calculate_intensive_events":True}, rounds=5, iterations=1)
+
+
+def test_oce_rlcs_frame_parsing(benchmark):
+    replay_path = get_replay_path("OCE_RLCS_7_CARS.replay")
+    game = Game()
+    game.initialize(loaded_json=decompile_replay(replay_path), parse_replay=False)
+
+    benchmark.pedantic(parse_frames,
+                       args=(game,), rounds=10, iterations=1)
@@ -0,0 +1,274 @@
+"""
+Times each stage of the pipeline on every replay in carball/tests/replays, and compares the results to a baseline.
+
+    python -m carball.tests.benchmarking.stage_benchmark run --output baseline.json
+    python -m carball.tests.benchmarking.stage_benchmark run --output current.json
+    python -m carball.tests.benchmarking.stage_benchmark compare baseline.json current.json --threshold 0.25
+
+The stages are named like the stages of AnalysisProfiler, e.g. 'decompile_replay', 'initialize', 'create_data_frame',
+'events/hits', 'stats/player/BoostStat', 'write_json'.
+run keeps the fastest wall and cpu time of each stage over --rounds runs. It then runs each replay once more with the
+memory traced to get the peak memory of each stage. Tracing slows everything down, so that run is not timed.
+compare lists every stage that got slower or used more memory by more than the threshold and exits with 1
+if there are any.
+"""
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import platform
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from carball.analysis.analysis_manager import AnalysisManager, PROTOBUF_VERSION
+from carball.analysis.utils.profiler import AnalysisProfiler
+from carball.decompile_replays import decompile_replay
+from carball.json_parser.game import Game
+from carball.tests.utils import REPLAYS_FOLDER
+
+BASELINE_VERSION = 1
+TOTAL = 'total'
+# differences below these are noise
+MIN_TIME_MS = 5.0
+MIN_MEMORY = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class Regression(NamedTuple):
+    replay: str
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else float('inf')
+
+
+class MemoryTracingError(RuntimeError):
+    pass
+
+
+class _BinaryBuffer(io.BytesIO):
+    mode = 'wb'
+
+
+class _TextBuffer(io.StringIO):
+    mode = 'w'
+
+
+def profile_replay(replay_path: str, profiler: AnalysisProfiler, calculate_intensive_events: bool = True):
+    """
+    Runs every stage of the pipeline on the replay, each one recorded by the profiler.
+    """
+    with profiler.stage('decompile_replay'):
+        loaded_json = decompile_replay(replay_path)
+    game = Game()
+    with profiler.stage('initialize'):
+        game.initialize(loaded_json=loaded_json)
+    del loaded_json
+    analysis = AnalysisManager(game, profiler)
+    analysis.create_analysis(calculate_intensive_events=calculate_intensive_events)
+
+    with profiler.stage('write_proto'):
+        analysis.write_proto_out_to_file(_BinaryBuffer())
+    with profiler.stage('write_json'):
+        analysis.write_json_out_to_file(_TextBuffer())
+    with profiler.stage('write_frames'):
+        with gzip.GzipFile(fileobj=io.BytesIO(), mode='wb') as file:
+            analysis.write_pandas_out_to_file(file)
+    with profiler.stage('write_columnar_frames'):
+        analysis.write_pandas_out_to_file(_BinaryBuffer(), columnar=True)
+
+
+def benchmark_replay(replay_path: str, rounds: int = 3, trace_memory: bool = True,
+                     calculate_intensive_events: bool = True) -> Dict[str, dict]:
+    """
+    :return: The calls, fastest wall_time_ms and cpu_time_ms, and peak_memory (None if not traced) of each stage.
+    :raises MemoryTracingError: if trace_memory is set but no peak memory was recorded.
+    """
+    stages: Dict[str, dict] = {}
+    for _ in range(rounds):
+        profiler = AnalysisProfiler()
+        profile_replay(replay_path, profiler, calculate_intensive_events)
+        for stage in profiler.get_report():
+            result = stages.setdefault(stage.name, {'calls': stage.calls, 'wall_time_ms': stage.wall_time_ms,
+                                                    'cpu_time_ms': stage.cpu_time_ms, 'peak_memory': None})
+            result['wall_time_ms'] = min(result['wall_time_ms'], stage.wall_time_ms)
+            result['cpu_time_ms'] = min(result['cpu_time_ms'], stage.cpu_time_ms)
+
+    if trace_memory:
+        profiler = AnalysisProfiler(trace_memory=True)
+        profile_replay(replay_path, profiler, calculate_intensive_events)
+        for stage in profiler.get_report():
+            if stage.name in stages:
+                stages[stage.name]['peak_memory'] = stage.peak_memory
+        # a baseline without the memory would silently skip every memory regression
+        if all(stage['peak_memory'] is None for stage in stages.values()):
+            raise MemoryTracingError("The peak memory of the stages was not recorded, run with --no-memory to skip it")
+    return stages
+
+
+def benchmark_replays(replay_paths: List[str], rounds: int = 3, trace_memory: bool = True,
+                      calculate_intensive_events: bool = True) -> dict:
+    """
+    :return: The results of benchmark_replay for each replay (by file name) and the environment they were run in,
+        replays that could not be analysed have an error instead.
+    :raises MemoryTracingError: if trace_memory is set but no peak memory was recorded.
+    """
+    replays = {}
+    for replay_path in replay_paths:
+        name = os.path.basename(replay_path)
+        logger.info("Benchmarking %s", name)
+        try:
+            replays[name] = {'stages': benchmark_replay(replay_path, rounds, trace_memory,
+                                                        calculate_intensive_events)}
+        except MemoryTracingError:
+            raise
+        except Exception as e:
+            logger.warning("Could not benchmark %s: %s", name, e)
+            replays[name] = {'error': str(e)}
+    return {
+        'version': BASELINE_VERSION,
+        'protobuf_version': PROTOBUF_VERSION,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'rounds': rounds,
+        'calculate_intensive_events': calculate_intensive_events,
+        'replays': replays,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.25,
+                    memory_threshold: Optional[float] = None) -> List[Regression]:
+    """
+    Compares each stage of each replay that is in both results, and the total of each stage over those replays.
+
+    :param threshold: The fraction a stage may get slower by, e.g. 0.25 allows it to take 1.25 times as long.
+    :param memory_threshold: The fraction the peak memory of a stage may grow by, defaults to threshold.
+    :return: The stages that got worse by more than the threshold, ignoring differences below MIN_TIME_MS and
+        MIN_MEMORY.
+    """
+    if memory_threshold is None:
+        memory_threshold = threshold
+    metrics = [('wall_time_ms', threshold, MIN_TIME_MS), ('peak_memory', memory_threshold, MIN_MEMORY)]
+
+    regressions = []
+    # the metrics of the stages that are only in one of the results, e.g. peak_memory of a run with --no-memory
+    skipped_metrics: Dict[str, int] = {}
+    # the sum of each metric of each stage over the replays
+    baseline_totals: Dict[str, Dict[str, float]] = {}
+    current_totals: Dict[str, Dict[str, float]] = {}
+    for replay, baseline_replay in baseline['replays'].items():
+        current_replay = current['replays'].get(replay, {})
+        if 'stages' not in baseline_replay or 'stages' not in current_replay:
+            continue
+        for stage, baseline_stage in baseline_replay['stages'].items():
+            current_stage = current_replay['stages'].get(stage)
+            if current_stage is None:
+                continue
+            for metric, metric_threshold, minimum in metrics:
+                baseline_value, current_value = baseline_stage.get(metric), current_stage.get(metric)
+                if baseline_value is None or current_value is None:
+                    if baseline_value is not None or current_value is not None:
+                        skipped_metrics[metric] = skipped_metrics.get(metric, 0) + 1
+                    continue
+                baseline_total = baseline_totals.setdefault(stage, {})
+                baseline_total[metric] = baseline_total.get(metric, 0) + baseline_value
+                current_total = current_totals.setdefault(stage, {})
+                current_total[metric] = current_total.get(metric, 0) + current_value
+                if _is_regression(baseline_value, current_value, metric_threshold, minimum):
+                    regressions.append(Regression(replay, stage, metric, baseline_value, current_value))
+
+    for stage, baseline_total in baseline_totals.items():
+        for metric, metric_threshold, minimum in metrics:
+            if metric in baseline_total and _is_regression(baseline_total[metric], current_totals[stage][metric],
+                                                           metric_threshold, minimum):
+                regressions.append(Regression(TOTAL, stage, metric, baseline_total[metric],
+                                              current_totals[stage][metric]))
+    for metric, count in skipped_metrics.items():
+        logger.warning("%s is not compared for %d stages as it is missing from the baseline or the current results",
+                       metric, count)
+    return regressions
+
+
+def _is_regression(baseline_value: float, current_value: float, threshold: float, minimum: float) -> bool:
+    return current_value - baseline_value > minimum and current_value > baseline_value * (1 + threshold)
+
+
+def get_replay_paths(directory: str = REPLAYS_FOLDER, name_filter: str = None) -> List[str]:
+    """
+    :param name_filter: Only the replays with this in their file name.
+    """
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.endswith('.replay') and (name_filter is None or name_filter in name)]
+
+
+def main(program_args=None):
+    parser = argparse.ArgumentParser(description='Benchmarks each stage of the replay analysis.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser('run', help='Benchmark the replays and save the results.')
+    run_parser.add_argument('-o', '--output', type=str, required=True,
+                            help='The results are saved to this file in json format.')
+    run_parser.add_argument('--replays', type=str, default=REPLAYS_FOLDER,
+                            help='Directory of the replays, defaults to carball/tests/replays.')
+    run_parser.add_argument('-k', '--filter', type=str, required=False,
+                            help='Only benchmark the replays with this in their file name.')
+    run_parser.add_argument('--rounds', type=int, default=3,
+                            help='Number of timed runs of each replay, the fastest is kept.')
+    run_parser.add_argument('--no-memory', action='store_true', default=False,
+                            help='Do not trace the peak memory of the stages.')
+    run_parser.add_argument('--no-intensive', action='store_true', default=False,
+                            help='Do not calculate the intensive events (hit pressure and fifty fifties).')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare results to a baseline.')
+    compare_parser.add_argument('baseline', type=str, help='Results of the run to compare to.')
+    compare_parser.add_argument('current', type=str, help='Results of the run to check.')
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help='Fraction a stage may get slower by before it is a regression.')
+    compare_parser.add_argument('--memory-threshold', type=float, required=False,
+                                help='Fraction the peak memory of a stage may grow by, defaults to --threshold.')
+
+    args = parser.parse_args(program_args)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == 'run':
+        try:
+            results = benchmark_replays(get_replay_paths(args.replays, args.filter), args.rounds,
+                                        trace_memory=not args.no_memory,
+                                        calculate_intensive_events=not args.no_intensive)
+        except MemoryTracingError as e:
+            print(e)
+            return 1
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r') as f:
+        current = json.load(f)
+    regressions = compare_results(baseline, current, args.threshold, args.memory_threshold)
+    for regression in regressions:
+        print('%s %s %s: %.6g -> %.6g (%.2fx)' % (regression.replay, regression.stage, regression.metric,
+                                                 regression.baseline, regression.current, regression.ratio))
+    if len(regressions) > 0:
+        print('%d regressions' % len(regressions))
+        return 1
+    print('No regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
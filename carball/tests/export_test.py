@@ -1,10 +1,22 @@
-from tempfile import NamedTemporaryFile
+from io import BytesIO, StringIO
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 
 import gzip
+import json
+import os
+import tracemalloc
+import pandas as pd
 import pytest
+from google.protobuf.json_format import MessageToDict
 
 from carball.analysis.analysis_manager import AnalysisManager
-from carball.tests.utils import run_analysis_test_on_replay, get_raw_replays
+from carball.analysis.utils.pandas_manager import PandasManager
+from carball.analysis.utils.profiler import AnalysisProfiler
+from carball.analysis.utils.parquet_manager import get_event_table, read_frames_from_parquet
+from carball.decompile_replays import analyze_replay_file
+from carball.generated.api import game_pb2
+from carball.generated.api.stats.rumble_pb2 import BALL_FREEZE
+from carball.tests.utils import run_analysis_test_on_replay, get_raw_replays, get_replay_path
 
 
 class TestExport:
@@ -16,6 +28,23 @@ class TestExport:
 
         run_analysis_test_on_replay(test, get_raw_replays()["DEFAULT_3_ON_3_AROUND_58_HITS"], cache=replay_cache)
 
+    def test_json_export_matches_json_format(self, replay_cache):
+        def test(analysis: AnalysisManager):
+            js = MessageToDict(analysis.get_protobuf_data())
+            assert analysis.get_json_data() == js
+
+            text = StringIO()
+            text.mode = 'w'
+            analysis.write_json_out_to_file(text)
+            assert text.getvalue() == json.dumps(js, indent=2)
+
+            text = StringIO()
+            text.mode = 'w'
+            analysis.write_json_out_to_file(text, compact=True)
+            assert text.getvalue() == json.dumps(js, separators=(',', ':'))
+
+        run_analysis_test_on_replay(test, get_raw_replays()["DEFAULT_3_ON_3_AROUND_58_HITS"], cache=replay_cache)
+
     def test_proto_export(self, replay_cache):
         def test(analysis: AnalysisManager):
             with NamedTemporaryFile(mode='wb') as f:
@@ -31,6 +60,108 @@ class TestExport:
 
         run_analysis_test_on_replay(test, get_raw_replays()["DEFAULT_3_ON_3_AROUND_58_HITS"], cache=replay_cache)
 
+    def test_columnar_export(self, replay_cache):
+        def test(analysis: AnalysisManager):
+            with NamedTemporaryFile(mode='wb') as f:
+                analysis.write_pandas_out_to_file(f, columnar=True)
+                f.flush()
+                data_frame = analysis.get_data_frame()
+                pd.testing.assert_frame_equal(PandasManager.read_columnar_from_file(f.name), data_frame)
+                ball = PandasManager.read_columnar_from_file(f.name, columns=['ball'])
+                pd.testing.assert_frame_equal(ball, data_frame[['ball']])
+
+        run_analysis_test_on_replay(test, get_raw_replays()["UNICODE_ERROR"], cache=replay_cache)
+
+    def test_parquet_export(self, replay_cache):
+        pq = pytest.importorskip('pyarrow.parquet')
+
+        def test(analysis: AnalysisManager):
+            with TemporaryDirectory() as directory:
+                analysis.write_parquet_out_to_directory(directory)
+                hits = pq.read_table(os.path.join(directory, 'hits.parquet'))
+                assert hits.num_rows == len(analysis.get_protobuf_data().game_stats.hits)
+                assert 'ball_data.pos_x' in hits.column_names
+
+                data_frame = analysis.get_data_frame()
+                frames = read_frames_from_parquet(os.path.join(directory, 'frames.parquet'))
+                assert frames.shape == data_frame.shape
+                ball = read_frames_from_parquet(os.path.join(directory, 'frames.parquet'), columns=['ball'])
+                pd.testing.assert_frame_equal(ball, data_frame[['ball']], check_dtype=False)
+
+                analysis.write_parquet_out_to_directory(directory, partition_by_replay=True)
+                replay_id = analysis.get_protobuf_data().game_metadata.id
+                assert os.listdir(os.path.join(directory, 'hits')) == ['replay_id=' + replay_id]
+
+        run_analysis_test_on_replay(test, get_raw_replays()["DEFAULT_3_ON_3_AROUND_58_HITS"], cache=replay_cache)
+
+    def test_parquet_event_table(self):
+        pytest.importorskip('pyarrow')
+        proto_game = game_pb2.Game()
+        hit = proto_game.game_stats.hits.add()
+        hit.frame_number = 10
+        hit.player_id.id = '1'
+        hit.ball_data.pos_x = 100
+        hit.shot = True
+        proto_game.game_stats.hits.add().frame_number = 20
+        proto_game.game_stats.rumble_items.add().item = BALL_FREEZE
+
+        hits = get_event_table(proto_game, 'hits').to_pydict()
+        assert hits['frame_number'] == [10, 20]
+        assert hits['player_id.id'] == ['1', None]
+        assert hits['ball_data.pos_x'] == [100, None]
+        assert hits['ball_data.pos_y'] == [None, None]
+        assert hits['shot'] == [True, None]
+        assert get_event_table(proto_game, 'rumble_items').to_pydict()['item'] == ['BALL_FREEZE']
+        bumps = get_event_table(proto_game, 'bumps')
+        assert bumps.num_rows == 0
+        assert 'attacker_id.id' in bumps.column_names
+
+    def test_frames_are_serialized_lazily(self):
+        analysis = analyze_replay_file(get_replay_path(get_raw_replays()["1_DEMO"][0]))
+        assert analysis._df_bytes is None
+        with NamedTemporaryFile(mode='wb') as f:
+            analysis.write_pandas_out_to_file(f, columnar=True)
+        assert analysis._df_bytes is None
+
+        data_frame = PandasManager.read_numpy_from_memory(BytesIO(analysis.df_bytes))
+        assert data_frame.shape == analysis.get_data_frame().shape
+        assert analysis.df_bytes is analysis.df_bytes
+
+    def test_profile_export(self, replay_cache):
+        def test(analysis: AnalysisManager):
+            stage_names = [stage.name for stage in analysis.get_profile()]
+            for stage_name in ['create_data_frame', 'events/hits', 'stats/player/BoostStat', 'stats/hit/HitCountStat']:
+                assert stage_name in stage_names
+            with NamedTemporaryFile(mode='w') as f:
+                analysis.write_profile_out_to_file(f)
+
+        run_analysis_test_on_replay(test, get_raw_replays()["DEFAULT_3_ON_3_AROUND_58_HITS"], cache=replay_cache)
+
+    @pytest.mark.parametrize('can_reset_peak', [True, False])
+    def test_profile_peak_memory(self, can_reset_peak, monkeypatch):
+        if not hasattr(tracemalloc, 'reset_peak'):
+            if can_reset_peak:
+                pytest.skip("tracemalloc can not reset its peak before python 3.9")
+        elif not can_reset_peak:
+            monkeypatch.delattr(tracemalloc, 'reset_peak')
+
+        profiler = AnalysisProfiler(trace_memory=True)
+        with profiler.stage('analysis'):
+            with profiler.stage('large'):
+                assert len(bytearray(10 * 1024 ** 2)) > 0
+            with profiler.stage('small'):
+                assert len(bytearray(1024 ** 2)) > 0
+        assert not tracemalloc.is_tracing()
+
+        peak_memory = {stage.name: stage.peak_memory for stage in profiler.get_report()}
+        assert peak_memory['analysis'] >= 10 * 1024 ** 2
+        assert peak_memory['analysis/large'] >= 10 * 1024 ** 2
+        if can_reset_peak:
+            assert 1024 ** 2 <= peak_memory['analysis/small'] < 10 * 1024 ** 2
+        else:
+            # below the earlier peak, only the memory at its start and end is known
+            assert 0 <= peak_memory['analysis/small'] < 1024 ** 2
+
     def test_unicode_names(self, replay_cache):
         def test(analysis: AnalysisManager):
             with NamedTemporaryFile(mode='wb') as f:
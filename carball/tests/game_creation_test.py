@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+
 from carball.analysis.analysis_manager import AnalysisManager
 
 from carball.json_parser.game import Game
@@ -19,6 +22,49 @@ class Test_OverallFunctionality():
 
         run_tests_on_list(test, get_raw_replays()["0_JUMPS"])
 
+    def test_release_and_stream_frames(self):
+
+        def test(replay):
+            game = Game()
+            game.initialize(loaded_json=decompile_replays.decompile_replay(replay))
+
+            json_object = decompile_replays.decompile_replay(replay)
+            released_game = Game()
+            released_game.initialize(loaded_json=json_object, release_frames=True)
+            assert len(json_object['network_frames']['frames']) == 0
+
+            json_object = decompile_replays.decompile_replay(replay)
+            json_object['network_frames']['frames'] = iter(json_object['network_frames']['frames'])
+            streamed_game = Game()
+            streamed_game.initialize(loaded_json=json_object)
+
+            for other_game in [released_game, streamed_game]:
+                pd.testing.assert_frame_equal(game.frames, other_game.frames)
+                pd.testing.assert_frame_equal(game.ball, other_game.ball)
+                for player, other_player in zip(game.players, other_game.players):
+                    pd.testing.assert_frame_equal(player.data, other_player.data)
+
+        run_tests_on_list(test, get_raw_replays()["0_JUMPS"])
+
+    def test_compact_and_full_precision_frames(self):
+
+        def test(replay):
+            game = Game()
+            game.initialize(loaded_json=decompile_replays.decompile_replay(replay))
+            precise_game = Game()
+            precise_game.initialize(loaded_json=decompile_replays.decompile_replay(replay), full_precision=True)
+
+            assert game.ball.pos_x.dtype == np.float32
+            assert precise_game.ball.pos_x.dtype == np.float64
+            for player, precise_player in zip(game.players, precise_game.players):
+                assert player.data.pos_x.dtype == np.float32
+                assert precise_player.data.pos_x.dtype == np.float64
+                pd.testing.assert_series_equal(player.data.pos_x, precise_player.data.pos_x.astype(np.float32))
+                assert player.data.memory_usage(deep=True).sum() < \
+                    precise_player.data.memory_usage(deep=True).sum()
+
+        run_tests_on_list(test, get_raw_replays()["0_JUMPS"])
+
     def test_full_replays(self, replay_cache):
 
         def test(analysis: AnalysisManager):
@@ -0,0 +1,20 @@
+from carball.analysis.events.hit_detection.hitbox.car import read_xl
+from carball.analysis.events.hit_detection.hitbox.hitbox import Hitbox, OCTANE_ITEM_ID
+from carball.analysis.events.hit_detection.hitbox.hitbox_table import HITBOXES
+
+
+class Test_Hitbox():
+
+    def test_hitbox_table_matches_spreadsheet(self):
+        xl = read_xl()
+        column_names = ['Length', 'Width', 'Height', 'Offset', 'Elevation']
+        assert sorted(HITBOXES.keys()) == sorted(xl.index)
+        for car_item_id, row in xl.iterrows():
+            assert HITBOXES[car_item_id] == tuple(row[column_names])
+
+    def test_unknown_car_falls_back_onto_octane(self):
+        hitbox = Hitbox(-1)
+        octane = Hitbox(OCTANE_ITEM_ID)
+        assert hitbox.car_x_lims == octane.car_x_lims
+        assert hitbox.car_y_lims == octane.car_y_lims
+        assert hitbox.car_z_lims == octane.car_z_lims
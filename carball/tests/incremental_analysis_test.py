@@ -0,0 +1,61 @@
+import pytest
+
+from carball import decompile_replays
+from carball.analysis.saltie_game.saltie_game import SaltieGame
+from carball.extras.incremental_analysis import IncrementalAnalysisManager
+from carball.json_parser.game import Game
+from carball.tests.utils import run_tests_on_list, get_raw_replays
+
+
+def analyze_in_chunks(replay, chunk_size: int) -> IncrementalAnalysisManager:
+    game = Game()
+    game.initialize(loaded_json=decompile_replays.decompile_replay(replay))
+    data_frame = SaltieGame.create_data_df(game)
+    analysis = IncrementalAnalysisManager(game)
+    for start in range(0, len(data_frame), chunk_size):
+        analysis.add_frames(data_frame.iloc[start:start + chunk_size])
+    analysis.finish()
+    return analysis
+
+
+class Test_IncrementalAnalysis():
+
+    def test_chunks_match_single_chunk(self):
+
+        def test(replay):
+            proto_game = analyze_in_chunks(replay, 1000000).get_protobuf_data()
+            chunked_proto_game = analyze_in_chunks(replay, 150).get_protobuf_data()
+
+            assert len(proto_game.game_stats.hits) > 0
+            assert len(proto_game.game_stats.kickoffs) == len(chunked_proto_game.game_stats.kickoffs)
+            assert [hit.frame_number for hit in proto_game.game_stats.hits] == \
+                [hit.frame_number for hit in chunked_proto_game.game_stats.hits]
+            assert chunked_proto_game.game_metadata.length == pytest.approx(proto_game.game_metadata.length)
+            for player, chunked_player in zip(proto_game.players, chunked_proto_game.players):
+                boost, chunked_boost = player.stats.boost, chunked_player.stats.boost
+                assert chunked_boost.num_large_boosts == boost.num_large_boosts
+                assert chunked_boost.num_small_boosts == boost.num_small_boosts
+                assert chunked_boost.boost_usage == pytest.approx(boost.boost_usage)
+                assert chunked_boost.average_boost_level == pytest.approx(boost.average_boost_level)
+                assert chunked_player.stats.positional_tendencies.time_on_ground == \
+                    pytest.approx(player.stats.positional_tendencies.time_on_ground)
+                assert chunked_player.stats.averages.average_speed == \
+                    pytest.approx(player.stats.averages.average_speed)
+            for team, chunked_team in zip(proto_game.teams, chunked_proto_game.teams):
+                assert chunked_team.stats.possession.possession_time == \
+                    pytest.approx(team.stats.possession.possession_time)
+
+        run_tests_on_list(test, get_raw_replays()["0_JUMPS"])
+
+    def test_skips_frames_already_added(self):
+
+        def test(replay):
+            game = Game()
+            game.initialize(loaded_json=decompile_replays.decompile_replay(replay))
+            data_frame = SaltieGame.create_data_df(game)
+            analysis = IncrementalAnalysisManager(game)
+            analysis.add_frames(data_frame.iloc[:200])
+            analysis.add_frames(data_frame.iloc[:400])
+            assert analysis.get_data_frame().index.equals(data_frame.index[:400])
+
+        run_tests_on_list(test, get_raw_replays()["0_JUMPS"])
@@ -0,0 +1,54 @@
+from carball.analysis.analysis_manager import AnalysisManager
+from carball.decompile_replays import analyze_replay_file, decompile_replay
+from carball.json_parser.replay_header import parse_replay_header
+from carball.tests.utils import run_analysis_test_on_replay, get_raw_replays, get_replay_path
+
+
+class Test_MetadataOnly():
+
+    def test_header_matches_boxcars(self):
+        replay_path = get_replay_path(get_raw_replays()["DEFAULT_3_ON_3_AROUND_58_HITS"][0])
+        with open(replay_path, 'rb') as f:
+            header = parse_replay_header(f.read())
+        full_json = decompile_replay(replay_path)
+
+        assert header['properties'] == full_json['properties']
+        for key in ['major_version', 'minor_version', 'game_type']:
+            assert header[key] == full_json[key]
+
+    def test_metadata_matches_full_analysis(self, replay_cache):
+        def test(analysis: AnalysisManager):
+            full_proto = analysis.get_protobuf_data()
+            metadata_analysis = analyze_replay_file(replay_path, metadata_only=True)
+            proto_game = metadata_analysis.get_protobuf_data()
+            assert metadata_analysis.get_data_frame() is None
+
+            metadata, full_metadata = proto_game.game_metadata, full_proto.game_metadata
+            assert metadata.id == full_metadata.id
+            assert metadata.map == full_metadata.map
+            assert metadata.time == full_metadata.time
+            assert metadata.team_size == full_metadata.team_size
+            assert metadata.score == full_metadata.score
+            assert [goal.frame_number for goal in metadata.goals] == [goal.frame_number for goal in full_metadata.goals]
+            for goal, full_goal in zip(metadata.goals, full_metadata.goals):
+                # the scorer is only set if the header lists them
+                if goal.HasField('player_id'):
+                    assert goal.player_id == full_goal.player_id
+
+            # the header can miss players, only those it lists are checked
+            full_players = {player.id.id: player for player in full_proto.players}
+            assert len(proto_game.players) > 0
+            for player in proto_game.players:
+                full_player = full_players[player.id.id]
+                assert (player.name, player.is_orange, player.score, player.goals) == \
+                       (full_player.name, full_player.is_orange, full_player.score, full_player.goals)
+            assert [(team.is_orange, team.score) for team in proto_game.teams] == \
+                   [(team.is_orange, team.score) for team in full_proto.teams]
+            for team, full_team in zip(proto_game.teams, full_proto.teams):
+                assert set(player_id.id for player_id in team.player_ids) <= \
+                       set(player_id.id for player_id in full_team.player_ids)
+            assert len(proto_game.game_stats.hits) == 0
+
+        replay_list = get_raw_replays()["DEFAULT_3_ON_3_AROUND_58_HITS"]
+        replay_path = get_replay_path(replay_list[0])
+        run_analysis_test_on_replay(test, replay_list, cache=replay_cache)
@@ -0,0 +1,66 @@
+import logging
+
+import pytest
+
+from carball.analysis.utils.profiler import AnalysisProfiler
+from carball.tests.benchmarking import stage_benchmark
+from carball.tests.benchmarking.stage_benchmark import benchmark_replay, compare_results, MemoryTracingError, TOTAL
+
+
+def create_results(stages):
+    return {'replays': {replay: {'stages': replay_stages} for replay, replay_stages in stages.items()}}
+
+
+class Test_StageBenchmark():
+
+    def test_flags_slower_stages(self):
+        baseline = create_results({
+            'A.replay': {'initialize': {'wall_time_ms': 100.0, 'peak_memory': 10000000},
+                         'stats/player/BoostStat': {'wall_time_ms': 1.0, 'peak_memory': None}},
+            'B.replay': {'initialize': {'wall_time_ms': 100.0, 'peak_memory': 10000000}},
+        })
+        current = create_results({
+            'A.replay': {'initialize': {'wall_time_ms': 200.0, 'peak_memory': 10000000},
+                         # slower, but by less than MIN_TIME_MS
+                         'stats/player/BoostStat': {'wall_time_ms': 3.0, 'peak_memory': None}},
+            'B.replay': {'initialize': {'wall_time_ms': 110.0, 'peak_memory': 30000000}},
+        })
+
+        regressions = compare_results(baseline, current, threshold=0.25)
+        assert {(regression.replay, regression.stage, regression.metric) for regression in regressions} == {
+            ('A.replay', 'initialize', 'wall_time_ms'),
+            ('B.replay', 'initialize', 'peak_memory'),
+            (TOTAL, 'initialize', 'wall_time_ms'),
+            (TOTAL, 'initialize', 'peak_memory'),
+        }
+        assert compare_results(baseline, current, threshold=1.5, memory_threshold=3) == []
+
+    def test_ignores_missing_replays_and_stages(self):
+        baseline = create_results({'A.replay': {'initialize': {'wall_time_ms': 100.0}}})
+        current = create_results({'B.replay': {'initialize': {'wall_time_ms': 1000.0}}})
+        current['replays']['A.replay'] = {'error': 'Could not parse the replay'}
+        assert compare_results(baseline, current) == []
+
+    def test_warns_about_metrics_missing_from_one_side(self, caplog):
+        baseline = create_results({'A.replay': {'initialize': {'wall_time_ms': 100.0, 'peak_memory': None}}})
+        current = create_results({'A.replay': {'initialize': {'wall_time_ms': 100.0, 'peak_memory': 30000000}}})
+        with caplog.at_level(logging.WARNING):
+            assert compare_results(baseline, current) == []
+        assert 'peak_memory is not compared for 1 stages' in caplog.text
+
+    def test_fails_without_peak_memory(self, monkeypatch):
+        def profile_replay(replay_path, profiler: AnalysisProfiler, calculate_intensive_events=True):
+            with profiler.stage('initialize'):
+                pass
+
+        def profile_replay_without_memory(replay_path, profiler: AnalysisProfiler, calculate_intensive_events=True):
+            # stages timed elsewhere have no peak memory
+            profiler.record('initialize', 1.0, 1.0)
+
+        monkeypatch.setattr(stage_benchmark, 'profile_replay', profile_replay)
+        assert benchmark_replay('A.replay', rounds=1)['initialize']['peak_memory'] is not None
+
+        monkeypatch.setattr(stage_benchmark, 'profile_replay', profile_replay_without_memory)
+        with pytest.raises(MemoryTracingError):
+            stage_benchmark.benchmark_replays(['A.replay'], rounds=1)
+        assert benchmark_replay('A.replay', rounds=1, trace_memory=False)['initialize']['peak_memory'] is None
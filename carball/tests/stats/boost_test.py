@@ -1,6 +1,9 @@
 import unittest
 
+import numpy as np
+
 from carball.analysis.analysis_manager import AnalysisManager
+from carball.analysis.events.boost_pad_detection.pickup_analysis import PickupAnalysis
 
 from carball.tests.utils import run_analysis_test_on_replay, get_specific_replays, get_specific_answers, \
     assertNearlyEqual, get_raw_replays
@@ -133,3 +136,22 @@ class Test_Boost():
 
         run_analysis_test_on_replay(test, get_specific_replays()["0_BOOST_USED"],
                                     answers=get_specific_answers()["0_BOOST_USED"], cache=replay_cache)
+
+    def test_pad_grid_matches_pad_distances(self):
+        random = np.random.RandomState(0)
+        big_pad_grid, small_pad_grid = PickupAnalysis.get_pad_grids()
+        for pad_grid in [big_pad_grid, small_pad_grid]:
+            # positions all over the field and right at the edge of the range of each pad
+            angles = random.uniform(0, 2 * np.pi, (len(pad_grid.pads), 500))
+            distances = pad_grid.radius + random.uniform(-0.01, 0.01, angles.shape)
+            edges = pad_grid.pads[:, np.newaxis, :2] + np.stack([np.cos(angles), np.sin(angles)], axis=-1) * \
+                distances[:, :, np.newaxis]
+            positions = np.concatenate([random.uniform(-6000, 6000, (10000, 2)),
+                                        edges.reshape(-1, 2)]).astype(np.float32)
+
+            labels = np.zeros(len(positions))
+            for pad in pad_grid.pads:
+                pad_distances = np.sqrt(np.square(positions - pad[:2]).sum(axis=1, dtype=np.float32))
+                labels += pad[2] * (pad_distances <= pad_grid.radius)
+            assert (labels > 0).any()
+            assert np.array_equal(pad_grid.get_labels(positions), labels)
@@ -1,4 +1,8 @@
+import numpy as np
+
 from carball.analysis.analysis_manager import AnalysisManager
+from carball.analysis.events.hit_pressure.pressure_analysis import PressureAnalysis
+from carball.analysis.simulator.ball_simulator import BallSimulator, BatchBallSimulator
 
 from carball.tests.utils import run_analysis_test_on_replay, get_specific_replays, get_specific_answers, get_raw_replays
 
@@ -45,6 +49,30 @@ class Test_Hits():
                                     answers=get_specific_answers()["SHOTS"],
                                     cache=replay_cache)
 
+    def test_batch_simulation_matches_single(self, replay_cache):
+        def test(analysis: AnalysisManager):
+            proto_game = analysis.get_protobuf_data()
+            frames = analysis.get_data_frame()
+            hits = proto_game.game_stats.hits
+            player_teams = {player.id.id: player.is_orange for player in proto_game.players}
+            ball_data = frames.ball.loc[[hit.frame_number for hit in hits], :]
+            is_orange = np.array([player_teams[hit.player_id.id] for hit in hits])
+
+            is_shot = BatchBallSimulator(ball_data, is_orange).get_is_shot()
+            for i in range(len(hits)):
+                assert is_shot[i] == BallSimulator(ball_data.iloc[i], is_orange[i]).get_is_shot()
+
+        run_analysis_test_on_replay(test, replay_list=get_specific_replays()["SHOTS"], cache=replay_cache)
+
+    def test_shots_without_ball_velocity(self, replay_cache):
+        # the ball never moves in these replays, so the frames have no ball velocity columns
+        def test(analysis: AnalysisManager):
+            proto_game = analysis.get_protobuf_data()
+            assert not any(hit.shot for hit in proto_game.game_stats.hits)
+
+        run_analysis_test_on_replay(test, replay_list=["NO_ONE_FOR_KICKOFF.replay", "1_100_1_12_0_BOOST_168_ALT.replay"],
+                                    cache=replay_cache)
+
     def test_num_passes_detected(self, replay_cache):
         def test(analysis: AnalysisManager, answer):
             proto_game = analysis.get_protobuf_data()
@@ -146,3 +174,37 @@ class Test_Hits():
         run_analysis_test_on_replay(test, replay_list=get_raw_replays()["OCE_RLCS_7_CARS"],
                             answers=get_specific_answers()["CLEARS"],
                             calculate_intensive_events=True)
+
+    def test_pressures_match_single_hit(self):
+        def get_pressure(ball_position, player_position, player_velocity):
+            # the pressure of one player on one hit, checked frame by frame
+            analysis = PressureAnalysis(None, None, None)
+            original_distance = analysis.get_distance(ball_position, player_position)
+            if not original_distance < 2000:
+                return 0
+            for i in range(100):
+                frame = i / 10
+                estimated_player_position = [player_position[x] + frame * player_velocity[x] for x in range(3)]
+                new_distance = analysis.get_distance(estimated_player_position, ball_position)
+                if new_distance > original_distance and new_distance > 500:
+                    return 0
+                if new_distance < 500:
+                    return int((10 - frame) * 10)
+            return 0
+
+        random = np.random.RandomState(0)
+        ball_positions = random.uniform(-1000, 1000, (200, 3))
+        player_positions = ball_positions + random.uniform(-1500, 1500, (200, 3))
+        player_velocities = random.uniform(-100, 100, (200, 3))
+        # within 500uu at the hit, reaching the ball, moving away from it, too far away and unknown positions
+        ball_positions[:6] = 0
+        player_positions[:6] = [[300, 0, 0], [1000, 0, 0], [1000, 0, 0], [2500, 0, 0], [np.nan] * 3, [300, 0, 0]]
+        player_velocities[:6] = [[0, 0, 0], [-100, 0, 0], [100, 0, 0], [-100, 0, 0], [0, 0, 0], [np.nan] * 3]
+
+        with np.errstate(invalid='ignore'):
+            pressures = PressureAnalysis._get_pressures(ball_positions, player_positions, player_velocities)
+        expected_pressures = [get_pressure(ball_position, player_position, player_velocity)
+                              for ball_position, player_position, player_velocity
+                              in zip(ball_positions, player_positions, player_velocities)]
+        assert list(pressures[:6]) == [100, 49, 0, 0, 0, 0]
+        assert list(pressures) == expected_pressures
@@ -0,0 +1,28 @@
+import pytest
+
+from carball.analysis.stats.rumble.goals import PreRumbleGoals
+from carball.analysis.stats.rumble.rumble import RumbleItemStat
+from carball.analysis.stats.stats_list import StatsList
+from carball.analysis.stats.stats_manager import PLAYER, TEAM, GAME, StatsManager
+from carball.decompile_replays import analyze_replay_file
+from carball.tests.utils import get_replay_path, get_raw_replays
+
+
+class Test_ParallelStats():
+
+    @pytest.mark.parametrize("replay_name", ["1_DEMO", "RUMBLE_FULL"])
+    def test_parallel_stats_match_serial(self, replay_name):
+        replay_path = get_replay_path(get_raw_replays()[replay_name][0])
+        serial = analyze_replay_file(replay_path, calculate_intensive_events=True)
+        parallel = analyze_replay_file(replay_path, calculate_intensive_events=True, stats_workers=4)
+        assert parallel.get_protobuf_data().SerializeToString() == serial.get_protobuf_data().SerializeToString()
+
+    def test_rumble_team_stats_wait_for_player_stats(self):
+        waves = StatsManager.get_execution_plan([(PLAYER, stat) for stat in StatsList.get_player_stats()] +
+                                                [(TEAM, stat) for stat in StatsList.get_team_stats()] +
+                                                [(GAME, stat) for stat in StatsList.get_general_stats()])
+        wave_numbers = {(category, type(stat)): wave_number
+                        for wave_number, wave in enumerate(waves) for category, stat in wave}
+        player_wave = wave_numbers[PLAYER, RumbleItemStat]
+        assert wave_numbers[TEAM, RumbleItemStat] > player_wave
+        assert wave_numbers[TEAM, PreRumbleGoals] > player_wave
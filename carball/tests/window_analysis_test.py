@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from carball.analysis.saltie_game.saltie_game import SaltieGame
+
+from carball.decompile_replays import analyze_replay_file, analyze_replay_window
+from carball.json_parser.frame_data import FrameDataTable
+from carball.tests.utils import run_tests_on_list, get_raw_replays
+
+
+class Test_WindowAnalysis():
+
+    def test_goal_window_matches_full_analysis(self):
+
+        def test(replay):
+            proto_game = analyze_replay_file(replay).get_protobuf_data()
+            goal = proto_game.game_metadata.goals[-1]
+            analysis = analyze_replay_window(replay, goal_index=-1, seconds_before=10, seconds_after=2)
+            window_proto_game = analysis.get_protobuf_data()
+            start_frame, end_frame = analysis.start_frame, analysis.end_frame
+
+            assert start_frame <= goal.frame_number <= end_frame
+            assert analysis.get_data_frame().index[0] >= start_frame
+            assert analysis.get_data_frame().index[-1] <= end_frame
+            assert [goal.frame_number for goal in window_proto_game.game_metadata.goals] == [goal.frame_number]
+
+            hits = [(hit.frame_number, hit.player_id.id, hit.goal) for hit in proto_game.game_stats.hits
+                    if start_frame <= hit.frame_number <= end_frame]
+            window_hits = [(hit.frame_number, hit.player_id.id, hit.goal) for hit in window_proto_game.game_stats.hits]
+            assert len(window_hits) > 0
+            assert window_hits == hits
+            assert window_proto_game.game_metadata.length < proto_game.game_metadata.length
+
+        run_tests_on_list(test, get_raw_replays()["DEFAULT_3_ON_3_AROUND_58_HITS"])
+
+    def test_window_by_frames(self):
+
+        def test(replay):
+            analysis = analyze_replay_window(replay, start_frame=100, end_frame=400)
+            data_frame = analysis.get_data_frame()
+            assert data_frame.index[0] >= 100
+            assert data_frame.index[-1] <= 400
+            for hit in analysis.get_protobuf_data().game_stats.hits:
+                assert 100 <= hit.frame_number <= 400
+
+        run_tests_on_list(test, get_raw_replays()["3_KICKOFFS"])
+
+    def test_window_is_given_once(self):
+        with pytest.raises(ValueError):
+            analyze_replay_window('', start_frame=0, goal_index=0)
+
+    def test_players_are_kept_from_first_frame(self):
+        tables = [FrameDataTable(10), FrameDataTable(10, first_frame=4)]
+        for table in tables:
+            for frame_number in range(10):
+                table.new_row(frame_number)
+                table.set(frame_number, 'pos_x', frame_number * 1.5)
+                if frame_number != 2:
+                    table.set(frame_number, 'jump_active', frame_number % 3 == 0)
+                if frame_number < 3:
+                    table.set(frame_number, 'power_up', 'ball_freeze')
+                if frame_number > 6:
+                    table.set(frame_number, 'ping', frame_number)
+
+        assert tables[1].get_last_value('pos_x', 5) == 6
+        data_frame = tables[1].to_data_frame()
+        assert list(data_frame.index) == list(range(4, 10))
+        # the columns are ordered and typed as if all of the frames were kept
+        pd.testing.assert_frame_equal(data_frame, tables[0].to_data_frame().loc[4:])
+
+    def test_window_reads_the_frames_of_the_full_game(self):
+        # the frames start at 1, as in a replay
+        game = SimpleNamespace(frames=pd.DataFrame({'time': range(10)}, index=range(1, 11)))
+        full_rows = SaltieGame.get_frame_rows(game, game.frames, [3, 5, 9, 10])
+        window_rows = SaltieGame.get_frame_rows(game, game.frames.loc[4:], [3, 5, 9, 10])
+        assert list(full_rows) == [3, 5, 9, -1]
+        assert list(game.frames.index[full_rows[:3]]) == list(game.frames.loc[4:].index[window_rows[:3]])
+        assert window_rows[3] == -1
@@ -47,7 +47,8 @@ setup(
     version=version_string,
     packages=setuptools.find_packages(),
     include_package_data=True,
-    install_requires=['pandas==1.0.3', 'protobuf==3.6.1', 'xlrd==1.1.0', 'numpy==1.18.2', 'boxcars-py==0.1.*'],
+    install_requires=['pandas==1.0.3', 'protobuf==3.6.1', 'numpy==1.18.2', 'boxcars-py==0.1.*'],
+    extras_require={'parquet': ['pyarrow']},
     url='https://github.com/SaltieRL/carball',
     keywords=['rocket-league'],
     license='Apache 2.0',
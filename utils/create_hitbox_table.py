@@ -0,0 +1,46 @@
+"""
+Compiles the hitbox spreadsheet into carball/analysis/events/hit_detection/hitbox/hitbox_table.py,
+so carball does not need to read the spreadsheet (or have xlrd installed) at runtime.
+
+Run from the root of the repository whenever the spreadsheet is updated:
+    python -m utils.create_hitbox_table
+"""
+import os
+import re
+
+from carball.analysis.events.hit_detection.hitbox import car
+
+hitbox_dir = os.path.dirname(os.path.realpath(car.__file__))
+table_path = os.path.join(hitbox_dir, 'hitbox_table.py')
+
+column_names = ['Length', 'Width', 'Height', 'Offset', 'Elevation']
+
+
+def get_spreadsheet_name():
+    return [i for i in os.listdir(hitbox_dir) if i.endswith('xlsx')][0]
+
+
+def create_hitbox_table():
+    spreadsheet_name = get_spreadsheet_name()
+    version = re.search(r'v[\d.]+\d', spreadsheet_name).group(0)
+    xl = car.read_xl()
+
+    lines = [
+        '# Generated by utils/create_hitbox_table.py from "%s", do not edit.' % spreadsheet_name,
+        '',
+        'HITBOX_TABLE_VERSION = %r' % version,
+        '',
+        '# car item id: (%s)' % ', '.join(column_name.lower() for column_name in column_names),
+        'HITBOXES = {',
+    ]
+    for car_item_id, row in xl.sort_index().iterrows():
+        values = ', '.join(repr(float(row[column_name])) for column_name in column_names)
+        lines.append('    %d: (%s),  # %s' % (car_item_id, values, row['Car']))
+    lines.append('}')
+
+    with open(table_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+if __name__ == "__main__":
+    create_hitbox_table()